@@ -0,0 +1,46 @@
+"""Compares JSON backends and selective decoding on the recorded Buienradar feed.
+
+Usage:
+    python -m benchmarks.bench_feed_decoder [--repeat 200]
+"""
+import argparse
+import time
+
+from utils.feed_decoder import FeedDecoder
+
+FIXTURE = "data/fixtures/buienradar_feed.json"
+
+
+def per_call(repeat: int, func, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--fixture', default=FIXTURE)
+    args = parser.parse_args()
+
+    with open(args.fixture, 'rb') as f:
+        raw = f.read()
+    print(f"{args.fixture}: {len(raw) / 1024:.0f} KiB")
+
+    reference = per_call(args.repeat, FeedDecoder('json').loads, raw)
+    for backend in FeedDecoder.available_backends():
+        decoder = FeedDecoder(backend)
+        cases = [
+            ('full document', decoder.loads),
+            ('actual section only', lambda data: decoder.decode_sections(data, ['actual'])),
+            ('station records', decoder.decode_stations),
+        ]
+        for label, func in cases:
+            elapsed = per_call(args.repeat, func, raw)
+            print(f"{backend:<8} {label:<22} {elapsed * 1e6:8.1f} us"
+                  f"  ({reference / elapsed:.1f}x vs json full)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Compares the typed KNMI reader with the original read_csv + to_datetime path.
+
+Usage:
+    python -m benchmarks.bench_knmi_reader [--years 50] [--repeat 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.knmi_reader import KNMIReader
+
+
+def write_sample_file(path: str, years: int, seed: int = 42):
+    """Writes a CSV in the application's format with one row per day"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('1950-01-01', periods=int(years * 365.25), freq='D')
+    df = pd.DataFrame({
+        'DATE': dates.strftime('%Y-%m-%d'),
+        'TEMP': np.round(rng.normal(10, 6, len(dates)), 1),
+        'PRECIPITATION': np.round(rng.exponential(2, len(dates)), 1),
+        'AIRPRESSURE': np.round(rng.normal(1013, 8, len(dates)), 1),
+    })
+    df.to_csv(path, index=False)
+
+
+def baseline(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df['DATE'] = pd.to_datetime(df['DATE'])
+    return df
+
+
+def best_of(repeat: int, func, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'knmi.csv')
+        write_sample_file(path, args.years)
+        print(f"{args.years} years, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        reference = best_of(args.repeat, baseline, path)
+        print(f"{'read_csv + to_datetime':<40} {reference * 1000:8.1f} ms")
+
+        cases = [('typed, all columns', {}),
+                 ('typed, TEMP+PRECIPITATION', {'columns': ['TEMP', 'PRECIPITATION']})]
+        engines = ['c', 'python']
+        try:
+            import pyarrow  # noqa: F401
+            engines.append('pyarrow')
+        except ImportError:
+            pass
+
+        for engine in engines:
+            for label, options in cases:
+                elapsed = best_of(args.repeat, KNMIReader.read, path, engine=engine, **options)
+                print(f"{label + f' [{engine}]':<40} {elapsed * 1000:8.1f} ms"
+                      f"  ({reference / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Deterministic generator for KNMI-shaped daily data files.
+
+Files are reproducible for a given seed, so benchmark runs on different
+machines measure the same input. Values follow a seasonal cycle with
+noise; missing days (scattered and in multi-week blocks) and blank
+values are injected at configurable rates.
+
+Usage:
+    python -m benchmarks.knmi_generator out.txt --years 100 --stations 10
+    python -m benchmarks.knmi_generator out.csv --layout csv --years 30
+"""
+import argparse
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Station numbers of KNMI automatic weather stations, used in order
+STATIONS = (260, 240, 344, 370, 380, 235, 270, 280, 290, 310,
+            215, 225, 249, 251, 257, 267, 269, 273, 275, 277,
+            278, 279, 283, 286, 319, 323, 330, 340, 348, 350,
+            356, 375, 377, 391)
+LAST_YEAR = 2023
+KNMI_HEADER = """BRON / SOURCE: KONINKLIJK NEDERLANDS METEOROLOGISCH INSTITUUT (KNMI)
+Synthetic benchmark data generated by benchmarks/knmi_generator.py (seed {seed})
+
+STN,YYYYMMDD,   TG,   RH,   PG
+"""
+
+
+def station_frame(station: int, years: int, start_year: int, rng: np.random.Generator,
+                  gap_rate: float, gap_blocks: int, nan_rate: float) -> pd.DataFrame:
+    """Returns one station's daily series with gaps and NaNs already applied"""
+    dates = pd.date_range(f"{start_year}-01-01", periods=int(round(years * 365.25)), freq='D')
+    n = len(dates)
+    season = np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - 200) / 365.25)
+    temp = 10 + 7 * season + rng.normal(0, 3, n)
+    wet = rng.random(n) < 0.45
+    precipitation = np.where(wet, rng.gamma(0.8, 4, n), 0.0)
+    # Smoothed noise, so pressure drifts over a few days like weather systems do
+    pressure = 1013 + np.convolve(rng.normal(0, 12, n), np.ones(5) / 5, mode='same') + rng.normal(0, 2, n)
+    frame = pd.DataFrame({
+        'DATE': dates,
+        'TEMP': np.round(temp, 1),
+        # Rounded when written, so trace amounts (< 0.05 mm) survive until then
+        'PRECIPITATION': precipitation,
+        'AIRPRESSURE': np.round(pressure, 1),
+    })
+
+    keep = rng.random(n) >= gap_rate
+    for _ in range(gap_blocks):
+        # Multi-week outages, as when a station is moved or out of service
+        start = int(rng.integers(0, n))
+        keep[start:start + int(rng.integers(7, 60))] = False
+    frame = frame[keep].reset_index(drop=True)
+
+    for column in ('TEMP', 'PRECIPITATION', 'AIRPRESSURE'):
+        blank = rng.random(len(frame)) < nan_rate
+        frame.loc[blank, column] = np.nan
+    frame.insert(0, 'STATION', station)
+    return frame
+
+
+def generate(years: int = 30, stations: int = 1, seed: int = 42, start_year: Optional[int] = None,
+             gap_rate: float = 0.002, gap_blocks: Optional[int] = None,
+             nan_rate: float = 0.005) -> pd.DataFrame:
+    """Returns the generated data for all stations, station by station.
+
+    By default the series end in 2023, so every date passes the app's
+    "not in the future" validation.
+    """
+    if start_year is None:
+        start_year = LAST_YEAR + 1 - years
+    if not 1 <= stations <= len(STATIONS):
+        raise ValueError(f"stations must be between 1 and {len(STATIONS)}")
+    rng = np.random.default_rng(seed)
+    blocks = gap_blocks if gap_blocks is not None else max(1, years // 10)
+    return pd.concat([station_frame(station, years, start_year, rng, gap_rate, blocks, nan_rate)
+                      for station in STATIONS[:stations]], ignore_index=True)
+
+
+def write_csv(frame: pd.DataFrame, path: str):
+    """Writes the application's CSV layout (DATE,TEMP,PRECIPITATION,AIRPRESSURE)"""
+    columns = ['DATE', 'TEMP', 'PRECIPITATION', 'AIRPRESSURE']
+    frame[columns].to_csv(path, index=False, date_format='%Y-%m-%d', float_format='%.1f')
+
+
+def write_knmi(frame: pd.DataFrame, path: str, seed: int = 42):
+    """Writes the raw KNMI daily layout: padded fields in tenths, RH -1 for trace amounts"""
+    tenths = {column: (frame[column] * 10).round() for column in ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')}
+    # KNMI writes precipitation below 0.05 mm as -1
+    trace = (frame['PRECIPITATION'] > 0) & (frame['PRECIPITATION'] < 0.05)
+    tenths['PRECIPITATION'] = tenths['PRECIPITATION'].mask(trace, -1)
+    fields = {
+        'STN': frame['STATION'].map('{:>5}'.format),
+        'YYYYMMDD': frame['DATE'].dt.strftime('%Y%m%d'),
+        'TG': _padded(tenths['TEMP']),
+        'RH': _padded(tenths['PRECIPITATION']),
+        'PG': _padded(tenths['AIRPRESSURE']),
+    }
+    with open(path, 'w', encoding='latin-1', newline='\n') as f:
+        f.write(KNMI_HEADER.format(seed=seed) + "\n")
+        lines = fields['STN'].str.cat([fields['YYYYMMDD'], fields['TG'], fields['RH'], fields['PG']], sep=',')
+        f.write("\n".join(lines) + "\n")
+
+
+def _padded(values: pd.Series) -> pd.Series:
+    # Missing values are blank, padded to the column width like KNMI does
+    return values.map(lambda v: '     ' if pd.isna(v) else f"{int(v):>5}")
+
+
+def write(path: str, layout: str = 'knmi', **options) -> pd.DataFrame:
+    """Generates a file in the given layout and returns the generated data"""
+    frame = generate(**options)
+    if layout == 'csv':
+        write_csv(frame, path)
+    else:
+        write_knmi(frame, path, seed=options.get('seed', 42))
+    return frame
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Generates KNMI-shaped benchmark data")
+    parser.add_argument('path')
+    parser.add_argument('--layout', choices=['knmi', 'csv'], default='knmi')
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--stations', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--gap-rate', type=float, default=0.002)
+    parser.add_argument('--nan-rate', type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    frame = write(args.path, args.layout, years=args.years, stations=args.stations, seed=args.seed,
+                  gap_rate=args.gap_rate, nan_rate=args.nan_rate)
+    print(f"{args.path}: {len(frame)} rows, {args.stations} station(s), {args.years} years")
+
+
+if __name__ == '__main__':
+    main()
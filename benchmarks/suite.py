@@ -0,0 +1,224 @@
+"""Benchmark suite for reading, filtering, aggregating, saving and the live feed.
+
+Data files come from benchmarks.knmi_generator (fixed seed) and the feed
+from data/fixtures/buienradar_feed.json served by a local StubFeedServer,
+so runs are reproducible and need no network. Results are compared with
+benchmarks/baseline.json; a case slower than the baseline by more than
+the tolerance is reported as a regression and the exit status is 1.
+
+Usage:
+    python -m benchmarks.suite [--quick] [--filter read] [--tolerance 0.25]
+    python -m benchmarks.suite --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import knmi_generator
+from modules.current_weather import CurrentWeather
+from modules.renderer import WeatherRenderer
+from modules.weather_forecast import WeatherForecast
+from modules.weather_statistics import WeatherStatistics
+from utils.aggregate_index import AggregateIndex
+from utils.api_handler import BuienradarAPI
+from utils.data_processor import KNMIDataProcessor
+from utils.knmi_dataset import KNMIDataset
+from utils.knmi_reader import KNMIReader
+from utils.station_snapshot import StationSnapshot
+from utils.temporal_pyramid import TemporalPyramid
+from utils.stub_server import StubFeedServer
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+FIXTURE = "data/fixtures/buienradar_feed.json"
+
+# (name, function, calls per timing); reported time is per call
+Case = Tuple[str, Callable[[], object], int]
+
+
+def per_call(func: Callable, number: int, repeat: int) -> float:
+    """Best time per call over ``repeat`` rounds of ``number`` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def random_periods(dataset: KNMIDataset, count: int, seed: int = 7) -> List[Tuple[str, str]]:
+    """Deterministic periods of 1 day to 5 years inside the dataset"""
+    rng = np.random.default_rng(seed)
+    first, last = dataset.dates[0], dataset.dates[-1]
+    span = int((last - first) / np.timedelta64(1, 'D'))
+    starts = rng.integers(0, span, count)
+    lengths = rng.integers(0, 5 * 365, count)
+    periods = []
+    for start, length in zip(starts, lengths):
+        begin = pd.Timestamp(first) + pd.Timedelta(days=int(start))
+        end = min(begin + pd.Timedelta(days=int(length)), pd.Timestamp(last))
+        periods.append((begin.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')))
+    return periods
+
+
+def statistics_cases(workdir: str, years: int, stations: int) -> List[Case]:
+    csv_path = os.path.join(workdir, f"knmi-{years}y.csv")
+    knmi_path = os.path.join(workdir, f"etmgeg-{stations}x{years}y.txt")
+    knmi_generator.write(csv_path, 'csv', years=years)
+    knmi_generator.write(knmi_path, 'knmi', years=years, stations=stations)
+
+    columns = WeatherStatistics.STATS_COLUMNS
+    frame = KNMIDataset.normalize(KNMIReader.read(csv_path, columns=columns))
+    dataset = KNMIDataset(frame)
+    index = AggregateIndex(dataset, columns)
+    periods = random_periods(dataset, 100)
+    start, end = periods[0]
+    monthly = WeatherStatistics.generate_periods(str(dataset.dates[0])[:10],
+                                                 str(dataset.dates[-1])[:10], 'month')
+
+    statistics = WeatherStatistics(use_cache=False)
+    statistics.output_dir = workdir
+    streaming = WeatherStatistics(use_cache=False, streaming=True)
+    stats = index.query(start, end)
+    pyramid = TemporalPyramid.build(dataset, columns)
+    pyramid_path = os.path.join(workdir, "pyramid")
+    pyramid.save(pyramid_path)
+    # Whole record but the first and last few days
+    long_start = str(dataset.dates[0] + np.timedelta64(3, 'D'))[:10]
+    long_end = str(dataset.dates[-1] - np.timedelta64(3, 'D'))[:10]
+
+    def cold_period():
+        WeatherStatistics._pyramid_cache.clear()
+        return statistics.process_period(csv_path, start, end, save=False)
+
+    return [
+        (f"read.csv.{years}y", lambda: KNMIReader.read(csv_path, columns=columns), 1),
+        (f"read.knmi.{stations}x{years}y", lambda: KNMIReader.read(knmi_path, columns=columns), 1),
+        (f"read.data_processor.{years}y", lambda: KNMIDataProcessor.read_knmi_file(csv_path), 1),
+        ("filter.bounds", lambda: [dataset.bounds(s, e) for s, e in periods], 1),
+        ("filter.slice", lambda: [dataset.slice(s, e) for s, e in periods], 1),
+        ("aggregate.index_build", lambda: AggregateIndex(dataset, columns), 1),
+        ("aggregate.index_query", lambda: [index.query(s, e) for s, e in periods], 1),
+        ("aggregate.pyramid_build", lambda: TemporalPyramid.build(dataset, columns), 1),
+        ("aggregate.pyramid_query", lambda: [pyramid.query(s, e) for s, e in periods], 1),
+        ("aggregate.pyramid_long_range", lambda: pyramid.query(long_start, long_end), 100),
+        ("aggregate.pyramid_load_query",
+         lambda: TemporalPyramid.load(pyramid_path)[0].query(long_start, long_end), 20),
+        ("aggregate.data_processor", lambda: [KNMIDataProcessor.calculate_statistics(dataset, s, e)
+                                              for s, e in periods[:10]], 1),
+        ("aggregate.streaming", lambda: streaming.stream_period(csv_path, start, end), 1),
+        ("aggregate.batch_monthly", lambda: statistics.process_periods(csv_path, monthly, save=False), 1),
+        ("period.cold", cold_period, 1),
+        ("period.warm", lambda: statistics.process_period(csv_path, start, end, save=False), 20),
+        ("save.results", lambda: statistics._save_results(
+            os.path.join(workdir, "result.txt"), stats, start, end), 20),
+    ]
+
+
+def feed_cases(stub: StubFeedServer) -> List[Case]:
+    with open(FIXTURE, encoding='utf-8') as f:
+        feed = json.load(f)
+    BuienradarAPI.configure_cache(ttl=3600, base_url=stub.url)
+    snapshot = BuienradarAPI.get_snapshot()
+    station = snapshot.measurements[0]
+    names = [name for name, _ in snapshot.stations]
+    forecast = BuienradarAPI.get_forecast()
+
+    return [
+        ("feed.fetch_decode", lambda: BuienradarAPI.get_weather_data(force_refresh=True), 5),
+        ("feed.snapshot_build", lambda: StationSnapshot.from_feed(feed), 20),
+        ("feed.station_lookup", lambda: [BuienradarAPI.get_station_data(name) for name in names], 20),
+        ("format.station", lambda: CurrentWeather.format_station_data(station), 1000),
+        ("format.forecast", lambda: WeatherForecast.format_forecast_data(forecast), 1000),
+        ("format.station_cached", lambda: WeatherRenderer.render_station(station, snapshot.version), 1000),
+    ]
+
+
+def compare(results: Dict[str, float], baseline: Dict, tolerance: float) -> List[str]:
+    """Returns the names of cases slower than the baseline by more than ``tolerance``"""
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            print(f"{name:<32} {seconds * 1000:10.3f} ms  (no baseline)")
+            continue
+        ratio = seconds / reference
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<32} {seconds * 1000:10.3f} ms  {ratio:5.2f}x baseline{flag}")
+    return regressions
+
+
+def metadata() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=100)
+    parser.add_argument('--stations', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help="10 years, 2 stations, 2 rounds")
+    parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+    if args.quick:
+        args.years, args.stations, args.repeat = 10, 2, 2
+
+    with open(FIXTURE, encoding='utf-8') as f:
+        feed = json.load(f)
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as workdir, StubFeedServer(feed) as stub:
+        cases = statistics_cases(workdir, args.years, args.stations) + feed_cases(stub)
+        for name, func, number in cases:
+            if args.filter in name:
+                func()  # warm-up
+                results[name] = per_call(func, number, args.repeat)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {**metadata(), 'years': args.years, 'stations': args.stations},
+                       'results': results}, f, indent=2)
+            f.write("\n")
+        for name, seconds in results.items():
+            print(f"{name:<32} {seconds * 1000:10.3f} ms")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        meta = baseline.get('meta', {})
+        if (meta.get('years'), meta.get('stations')) != (args.years, args.stations):
+            print(f"note: baseline was recorded with {meta.get('years')} years, "
+                  f"{meta.get('stations')} stations")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""Command-line interface for statistics and station snapshots, without the GUI.
+
+Usage:
+    python cli.py stats data/knmi.csv 2023-01-01 2023-12-31
+    python cli.py stats "data/knmi/*.txt" 2023-01-01 2023-12-31 --format json
+    python cli.py stats data/knmi.csv 2023-01-01 2023-12-31 --every month
+    python cli.py stats data/knmi.csv 2023-01-01 2023-12-31 --extended
+    python cli.py ingest data/knmi/etmgeg_260.txt
+    python cli.py climatology data/knmi/etmgeg_260.txt
+    python cli.py anomaly data/knmi/etmgeg_260.txt 2023-07-01 2023-07-31
+    python cli.py stations --format csv --output stations.csv
+    python cli.py --profile stats data/knmi.csv 2023-01-01 2023-12-31
+    python cli.py --metrics --capture knmi.read_csv stats data/knmi.csv 2023-01-01 2023-12-31
+
+Heavy modules (pandas, requests) are imported by the command that needs
+them, so start-up stays fast for cron jobs.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+
+
+def write_rows(rows, fields, fmt: str, out):
+    """Writes dict rows to ``out`` as CSV or JSON lines, one row at a time.
+
+    Missing values (NaN) are written as empty CSV fields and JSON nulls.
+    """
+    from utils.json_safe import json_safe
+
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(json_safe(row))
+    else:
+        for row in rows:
+            out.write(json.dumps(json_safe(row), ensure_ascii=False, allow_nan=False) + "\n")
+
+
+def format_value(value) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def write_table(rows, fields, out):
+    """Writes dict rows as a plain-text table with aligned columns"""
+    cells = [[format_value(row[field]) for field in fields] for row in rows]
+    widths = [max([len(field)] + [len(line[k]) for line in cells]) for k, field in enumerate(fields)]
+    out.write("  ".join(field.ljust(width) for field, width in zip(fields, widths)).rstrip() + "\n")
+    for line in cells:
+        out.write("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() + "\n")
+
+
+def run_stats(args, out) -> int:
+    from modules.weather_statistics import WeatherStatistics
+    from utils.validators import DateValidator
+
+    is_valid, error = DateValidator.validate_date_range(args.start, args.end)
+    if not is_valid:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+
+    statistics = WeatherStatistics(engine=args.engine)
+    if args.every:
+        if WeatherStatistics.is_multi_file(args.source) or \
+                args.source.startswith((WeatherStatistics.STORE_PREFIX, WeatherStatistics.LOG_PREFIX)):
+            print("error: --every needs a single data file", file=sys.stderr)
+            return 2
+        periods = WeatherStatistics.generate_periods(args.start, args.end, args.every)
+        results, error = statistics.process_periods(args.source, periods, save=args.save,
+                                                    extended=args.extended)
+        if results is None:
+            print(f"error: {error}", file=sys.stderr)
+            return 1
+        rows = results.to_dict('records')
+        if args.format == 'text':
+            write_table(rows, list(results.columns), out)
+        else:
+            write_rows(rows, list(results.columns), args.format, out)
+        return 0
+
+    if WeatherStatistics.is_multi_file(args.source):
+        progress = lambda done, total, path: print(f"[{done}/{total}] {path}", file=sys.stderr)
+        stats, error = statistics.process_files(args.source, args.start, args.end,
+                                                workers=args.workers, progress=progress,
+                                                extended=args.extended)
+        for path, file_error in statistics.file_errors.items():
+            print(f"warning: skipped {path}: {file_error}", file=sys.stderr)
+    else:
+        stats, error = statistics.process_period(args.source, args.start, args.end, save=args.save,
+                                                 extended=args.extended)
+    if stats is None:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+    row = {'source': args.source, 'start_date': args.start, 'end_date': args.end, **stats}
+    write_record(row, args.format, out)
+    return 0
+
+
+def write_record(row, fmt: str, out):
+    """Writes one result as ``name: value`` lines, CSV or a JSON line"""
+    if fmt == 'text':
+        for name, value in row.items():
+            out.write(f"{name}: {format_value(value)}\n")
+    else:
+        write_rows([row], list(row), fmt, out)
+
+
+def run_ingest(args, out) -> int:
+    from modules.weather_statistics import WeatherStatistics
+
+    statistics = WeatherStatistics(engine=args.engine)
+    progress = lambda done, total, path: print(f"[{done}/{total}] {path}", file=sys.stderr)
+    written, error = statistics.ingest_store(args.source, args.station, progress=progress)
+    if written is None:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    store = statistics.get_store()
+    out.write(f"{written} station-days written\n")
+    if store.origin is not None:
+        out.write(f"store: {store.origin} to {store.origin + (store.days - 1)}, "
+                  f"stations {', '.join(store.stations)}\n")
+    return 0
+
+
+def run_climatology(args, out) -> int:
+    from modules.weather_statistics import WeatherStatistics
+
+    statistics = WeatherStatistics(engine=args.engine)
+    progress = lambda done, total, path: print(f"[{done}/{total}] {path}", file=sys.stderr)
+    added, error = statistics.build_climatology(args.source, args.station, progress=progress)
+    if added is None:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    climatology = statistics.get_climatology()
+    out.write(f"{added} new station-days\n")
+    for station in climatology.stations:
+        coverage = climatology.coverage(station)
+        gaps = len(coverage['ranges']) - 1
+        out.write(f"{station}: {coverage['first']} to {coverage['last']} ({coverage['days']} days"
+                  f"{f', {gaps} gaps' if gaps else ''})\n")
+    return 0
+
+
+def run_anomaly(args, out) -> int:
+    from modules.weather_statistics import WeatherStatistics
+    from utils.validators import DateValidator
+
+    is_valid, error = DateValidator.validate_date_range(args.start, args.end)
+    if not is_valid:
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    statistics = WeatherStatistics(engine=args.engine)
+    anomalies, error = statistics.anomaly_period(args.source, args.start, args.end, args.station)
+    if anomalies is None:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    write_record({'source': args.source, 'start_date': args.start, 'end_date': args.end, **anomalies},
+                 args.format, out)
+    return 0
+
+
+def run_stations(args, out) -> int:
+    from utils.api_handler import BuienradarAPI
+    from utils.models import StationMeasurement
+
+    stub = None
+    if args.stub:
+        from utils.stub_server import StubFeedServer
+        with open(args.stub, encoding='utf-8') as f:
+            stub = StubFeedServer(json.load(f)).start()
+    try:
+        if stub is not None or args.feed_url:
+            BuienradarAPI.configure_cache(base_url=stub.url if stub else args.feed_url)
+        snapshot = BuienradarAPI.get_snapshot()
+    finally:
+        if stub is not None:
+            stub.stop()
+    if snapshot is None:
+        print("error: weather feed unavailable", file=sys.stderr)
+        return 1
+
+    stations = snapshot.measurements
+    if args.region:
+        stations = snapshot.in_region(args.region)
+    rows = (station.as_dict() for station in stations)
+    if args.format == 'json':
+        from utils.json_safe import json_safe
+        # One document, so the dump can be loaded with a single json.load
+        json.dump(json_safe({'version': snapshot.version, 'stations': list(rows)}), out,
+                  ensure_ascii=False, indent=2, allow_nan=False)
+        out.write("\n")
+    else:
+        write_rows(rows, list(StationMeasurement.FIELD_NAMES), 'csv', out)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Weather statistics and station snapshots")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile the command and print the top functions to stderr")
+    parser.add_argument('--metrics', action='store_true',
+                        help="print hot-path timings and counters as JSON to stderr")
+    parser.add_argument('--capture', metavar='OPERATIONS',
+                        help="comma-separated timer names (e.g. knmi.read_csv) to profile; implies --metrics")
+    parser.add_argument('--capture-mode', choices=['cprofile', 'tracemalloc'], default='cprofile')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stats = commands.add_parser('stats', help="statistics for a period")
+    stats.add_argument('source', help="data file, directory, glob, store:<station> or log:<station id>")
+    stats.add_argument('start', help="start date (YYYY-MM-DD)")
+    stats.add_argument('end', help="end date (YYYY-MM-DD)")
+    stats.add_argument('--every', choices=['day', 'week', 'month', 'year'],
+                       help="one row per day/week/month/year instead of one total")
+    stats.add_argument('--format', choices=['text', 'json', 'csv'], default='text')
+    stats.add_argument('--engine', choices=['c', 'python', 'pyarrow'], default='c')
+    stats.add_argument('--workers', type=int, help="processes for directories and globs")
+    stats.add_argument('--extended', action='store_true',
+                       help="add percentiles, degree days, dry/wet days, rolling means and pressure")
+    stats.add_argument('--save', action='store_true', help="also write the result file to data/output")
+    stats.add_argument('--output', help="write to this file instead of stdout")
+    stats.set_defaults(run=run_stats)
+
+    ingest = commands.add_parser('ingest', help="add data files to the time-series store")
+    ingest.add_argument('source', help="data file, directory or glob")
+    ingest.add_argument('--station', help="station key for files without a station column")
+    ingest.add_argument('--engine', choices=['c', 'python', 'pyarrow'], default='c')
+    ingest.add_argument('--output', help="write to this file instead of stdout")
+    ingest.set_defaults(run=run_ingest)
+
+    climatology = commands.add_parser('climatology', help="build or extend the day-of-year climatology")
+    climatology.add_argument('source', help="data file, directory, glob or store:<station>")
+    climatology.add_argument('--station', help="station key for files without a station column")
+    climatology.add_argument('--engine', choices=['c', 'python', 'pyarrow'], default='c')
+    climatology.add_argument('--output', help="write to this file instead of stdout")
+    climatology.set_defaults(run=run_climatology)
+
+    anomaly = commands.add_parser('anomaly', help="compare a period with the climatology")
+    anomaly.add_argument('source', help="data file, store:<station> or log:<station id>")
+    anomaly.add_argument('start', help="start date (YYYY-MM-DD)")
+    anomaly.add_argument('end', help="end date (YYYY-MM-DD)")
+    anomaly.add_argument('--station', help="station in a multi-station file, or the climatology key")
+    anomaly.add_argument('--format', choices=['text', 'json', 'csv'], default='text')
+    anomaly.add_argument('--engine', choices=['c', 'python', 'pyarrow'], default='c')
+    anomaly.add_argument('--output', help="write to this file instead of stdout")
+    anomaly.set_defaults(run=run_anomaly)
+
+    stations = commands.add_parser('stations', help="dump the current station snapshot")
+    stations.add_argument('--format', choices=['json', 'csv'], default='json')
+    stations.add_argument('--region', help="only stations in this region")
+    stations.add_argument('--feed-url', help="feed URL to use instead of the Buienradar API")
+    stations.add_argument('--stub', metavar='FEED_JSON', help="read the feed from a local stub")
+    stations.add_argument('--output', help="write to this file instead of stdout")
+    stations.set_defaults(run=run_stations)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+
+    if args.metrics or args.capture:
+        from utils.instrumentation import Metrics
+        Metrics.enable()
+        if args.capture:
+            Metrics.capture(args.capture.split(','), args.capture_mode)
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if not args.profile:
+            return args.run(args, out)
+
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(args.run, args, out)
+        finally:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+    except BrokenPipeError:
+        # Output piped into e.g. head; stop quietly
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+    finally:
+        if args.output:
+            out.close()
+        if args.metrics or args.capture:
+            print(Metrics.to_json(), file=sys.stderr)
+            for name, report in Metrics.captures.items():
+                print(f"--- {name} ({args.capture_mode}) ---\n{report}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
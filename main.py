@@ -1,7 +1,10 @@
+import time
 import tkinter as tk
 from ttkthemes import ThemedTk
 from modules.gui import WeatherApp
+from utils.instrumentation import Metrics
 import logging
+import os
 
 # Logging configuration
 logging.basicConfig(
@@ -10,13 +13,26 @@ logging.basicConfig(
     filename='weather_app.log'
 )
 
+def report_first_frame(started: float):
+    """Logs the time from startup until the first frame has been drawn"""
+    elapsed = time.perf_counter() - started
+    logging.info(f"Time to first frame: {elapsed * 1000:.0f} ms")
+
 def main():
+    started = time.perf_counter()
+    # WEATHER_APP_METRICS=1 collects hot-path timings and logs them on exit
+    if os.environ.get('WEATHER_APP_METRICS'):
+        Metrics.enable()
     root = ThemedTk(theme="arc")
     root.title("Weather Application")
     root.geometry("900x600")
     
     app = WeatherApp(root)
+    # Idle callbacks run once the initial layout and redraw are done
+    root.after_idle(report_first_frame, started)
     root.mainloop()
+    if Metrics.enabled:
+        logging.info(f"Metrics:\n{Metrics.to_json()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,124 @@
+import asyncio
+import queue
+import threading
+import logging
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class BackgroundWorker:
+    """Runs coroutines on a private event loop and hands results back to Tk.
+
+    Work is submitted under a key (e.g. ``'current'`` or ``'forecast'``).
+    Submitting again under the same key cancels the previous job, and any
+    result that still arrives for it is dropped, so the UI only ever shows
+    the answer to the latest request. Results are queued by the loop thread
+    and delivered on the Tk thread by an ``after()`` poll; post() uses the
+    same queue for progress updates from worker threads.
+    """
+
+    def __init__(self, widget, poll_interval: int = 50):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self._results: "queue.Queue" = queue.Queue()
+        self._jobs: Dict[str, Future] = {}
+        self._generations: Dict[str, int] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="background-worker", daemon=True)
+        self._after_id: Optional[str] = None
+        self._running = False
+
+    def start(self) -> "BackgroundWorker":
+        self._running = True
+        self._thread.start()
+        self._after_id = self.widget.after(self.poll_interval, self._drain)
+        return self
+
+    def stop(self):
+        self._running = False
+        for future in self._jobs.values():
+            future.cancel()
+        self._jobs.clear()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def submit(self, key: str, coroutine: Awaitable,
+               on_success: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_done: Optional[Callable[[], None]] = None):
+        """Schedules a coroutine, replacing any pending job with the same key.
+
+        ``on_success``/``on_error`` run on the Tk thread for the latest job
+        only; ``on_done`` runs for every job once it finishes or is cancelled.
+        """
+        self.cancel(key)
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        self._jobs[key] = future
+        future.add_done_callback(
+            lambda f: self._results.put(
+                lambda: self._deliver(key, generation, f, on_success, on_error, on_done)
+            )
+        )
+
+    def post(self, callback: Callable, *args):
+        """Runs ``callback(*args)`` on the Tk thread; safe to call from any thread"""
+        self._results.put(lambda: callback(*args))
+
+    def cancel(self, key: str):
+        """Cancels the pending job for ``key``, if any"""
+        future = self._jobs.pop(key, None)
+        if future is not None:
+            future.cancel()
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def is_busy(self, key: Optional[str] = None) -> bool:
+        if key is not None:
+            return key in self._jobs
+        return bool(self._jobs)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        self._loop.close()
+
+    def _drain(self):
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Error in background callback: {e}")
+
+        if self._running:
+            self._after_id = self.widget.after(self.poll_interval, self._drain)
+
+    def _deliver(self, key, generation, future, on_success, on_error, on_done):
+        if self._jobs.get(key) is future:
+            del self._jobs[key]
+
+        try:
+            if generation == self._generations.get(key) and not future.cancelled():
+                try:
+                    result = future.result()
+                except CancelledError:
+                    pass
+                except Exception as e:
+                    logging.error(f"Background job '{key}' failed: {e}")
+                    if on_error is not None:
+                        on_error(e)
+                else:
+                    on_success(result)
+        finally:
+            if on_done is not None:
+                on_done()
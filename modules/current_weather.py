@@ -1,17 +1,9 @@
-from utils.api_handler import BuienradarAPI
-from datetime import datetime
+from typing import Union
+from utils.models import StationMeasurement
 import logging
 
 class CurrentWeather:
-    @staticmethod
-    def format_station_data(station_data: dict) -> str:
-        """Formats weather station data into readable text"""
-        if not station_data:
-            return "No data available"
-        
-        try:
-            # Check if all required fields exist and handle potential None values
-            template = """
+    TEMPLATE = """
 Station: {stationname}
 Region: {regio}
 Temperature: {temperature:.1f}°C
@@ -23,29 +15,50 @@ Precipitation: {precipitation:.1f} mm
 Weather Description: {weatherdescription}
 Measured at: {timestamp}
 """
-            # Handle potential None or missing values
-            safe_data = {
-                'stationname': station_data.get('stationname', 'N/A'),
-                'regio': station_data.get('regio', 'N/A'),
-                'temperature': station_data.get('temperature', 0.0) or 0.0,
-                'groundtemperature': station_data.get('groundtemperature', 0.0) or 0.0,
-                'windspeed': station_data.get('windspeed', 0.0) or 0.0,
-                'winddirection': station_data.get('winddirection', 'N/A'),
-                'airpressure': station_data.get('airpressure', 'N/A'),  # Remove formatting for airpressure
-                'precipitation': station_data.get('precipitation', 0.0) or 0.0,
-                'weatherdescription': station_data.get('weatherdescription', 'N/A'),
-                'timestamp': station_data.get('timestamp', 'N/A')
-            }
 
-            # Format timestamp if it exists
-            if safe_data['timestamp'] != 'N/A':
-                try:
-                    timestamp = datetime.fromisoformat(safe_data['timestamp'].replace('Z', '+00:00'))
-                    safe_data['timestamp'] = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                except (ValueError, AttributeError):
-                    safe_data['timestamp'] = 'N/A'
+    # Fields shown for a station, in display order
+    FIELDS = ('stationid', 'stationname', 'regio', 'temperature', 'groundtemperature',
+              'windspeed', 'winddirection', 'airpressure', 'precipitation', 'weatherdescription')
+
+    @staticmethod
+    def to_measurement(station_data: Union[StationMeasurement, dict]) -> StationMeasurement:
+        """Returns station data as a StationMeasurement, validating raw feed dicts"""
+        if isinstance(station_data, StationMeasurement):
+            return station_data
+        return StationMeasurement.from_dict(station_data)
+
+    @staticmethod
+    def station_fields(station_data: Union[StationMeasurement, dict]) -> dict:
+        """Returns the displayed station values as a JSON-ready dict (None when missing)"""
+        station = CurrentWeather.to_measurement(station_data)
+        fields = {name: getattr(station, name) for name in CurrentWeather.FIELDS}
+        measured_at = station.measured_at
+        fields['measured_at'] = measured_at.isoformat() if measured_at else None
+        return fields
+
+    @staticmethod
+    def format_station_data(station_data: Union[StationMeasurement, dict]) -> str:
+        """Formats weather station data into readable text"""
+        if not station_data:
+            return "No data available"
+        
+        try:
+            station = CurrentWeather.to_measurement(station_data)
 
-            return template.format(**safe_data)
+            # Missing numbers show as 0.0, other missing values as N/A
+            measured_at = station.measured_at
+            return CurrentWeather.TEMPLATE.format(
+                stationname=station.get('stationname', 'N/A'),
+                regio=station.get('regio', 'N/A'),
+                temperature=station.get('temperature', 0.0),
+                groundtemperature=station.get('groundtemperature', 0.0),
+                windspeed=station.get('windspeed', 0.0),
+                winddirection=station.get('winddirection', 'N/A'),
+                airpressure=station.get('airpressure', 'N/A'),
+                precipitation=station.get('precipitation', 0.0),
+                weatherdescription=station.get('weatherdescription', 'N/A'),
+                timestamp=measured_at.strftime("%Y-%m-%d %H:%M:%S") if measured_at else 'N/A'
+            )
             
         except Exception as e:
             logging.error(f"Error formatting station data: {e}")
@@ -1,18 +1,35 @@
+import asyncio
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from utils.api_handler import BuienradarAPI
-from modules.current_weather import CurrentWeather
-from modules.weather_forecast import WeatherForecast
+from utils.async_api import AsyncBuienradarAPI
+from utils.station_snapshot import StationSnapshot
+from modules.background import BackgroundWorker
+from modules.observation_recorder import ObservationRecorder
+from modules.renderer import WeatherRenderer
 from modules.weather_statistics import WeatherStatistics
 from utils.validators import DateValidator
+from utils.station_store import StationListStore
+from utils.instrumentation import Metrics
 import logging
 
 class WeatherApp(tk.Frame):
+    # Keep a local history of live observations while the app runs
+    RECORD_OBSERVATIONS = True
+
     def __init__(self, master):
         super().__init__(master)
         self.master = master
         self.pack(fill=tk.BOTH, expand=True)
+        self._loading_count = 0
+        self.worker = BackgroundWorker(self).start()
+        self.station_store = StationListStore()
         self.create_widgets()
+        self.load_stations()
+        self.recorder = ObservationRecorder().start() if self.RECORD_OBSERVATIONS else None
+        self._current_station_key = None
+        BuienradarAPI.subscribe(self.on_snapshot_delta)
         
     def create_widgets(self):
         # Create main container with tabs
@@ -48,8 +65,9 @@ class WeatherApp(tk.Frame):
         station_frame = ttk.LabelFrame(controls_frame, text="Weather Station", padding="10")
         station_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Get stations list
-        self.stations = BuienradarAPI.get_stations()
+        # Start from the persisted station list; the live list is loaded
+        # in the background by load_stations()
+        self.stations = self.station_store.load()
         station_names = [f"{station[0]} ({station[1]})" for station in self.stations]
         
         self.station_combo = ttk.Combobox(station_frame, 
@@ -57,6 +75,7 @@ class WeatherApp(tk.Frame):
                                         width=40,
                                         font=('Helvetica', 10))
         self.station_combo.pack(side=tk.LEFT, padx=10, pady=5, expand=True)
+        self.station_combo.bind('<<ComboboxSelected>>', self.on_station_selected)
         
         refresh_btn = ttk.Button(station_frame, 
                                text="Refresh Data", 
@@ -113,6 +132,7 @@ class WeatherApp(tk.Frame):
         self.file_path = tk.StringVar()
         ttk.Entry(file_frame, textvariable=self.file_path).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         ttk.Button(file_frame, text="Browse", command=self.browse_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Browse Folder", command=self.browse_folder).pack(side=tk.LEFT, padx=5)
 
         # Date selection with validation
         date_frame = ttk.Frame(frame)
@@ -128,6 +148,10 @@ class WeatherApp(tk.Frame):
         self.end_date.pack(side=tk.LEFT, padx=5)
         self.end_date.bind('<KeyRelease>', self.validate_date_entry)
 
+        self.extended_stats = tk.BooleanVar(value=False)
+        ttk.Checkbutton(date_frame, text="Extended statistics",
+                        variable=self.extended_stats).pack(side=tk.LEFT, padx=10)
+
         # Calculate button
         ttk.Button(frame, text="Calculate Statistics", 
                    command=self.calculate_statistics).pack(pady=10)
@@ -136,83 +160,115 @@ class WeatherApp(tk.Frame):
         self.stats_result = tk.Text(frame, height=15, width=50, state='disabled')
         self.stats_result.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
+    def load_stations(self):
+        """Refreshes the station list from the live feed in the background"""
+        self.worker.submit('stations',
+                           AsyncBuienradarAPI.get_snapshot(),
+                           on_success=self._update_stations)
+
+    def _update_stations(self, snapshot):
+        if snapshot is None:
+            if not self.stations:
+                self._set_text(self.current_result, "Could not load the station list.")
+            return
+        
+        if snapshot.stations != self.stations:
+            self.stations = snapshot.stations
+            self.station_combo.configure(values=snapshot.display_names)
+            self.station_store.save(self.stations)
+        logging.info(f"Station list refreshed ({len(self.stations)} stations)")
+
     def get_current_weather(self):
         if not self.station_combo.get():
             messagebox.showwarning("Warning", "Please select a station first!")
             return
         
-        try:
-            station_name = self.station_combo.get().split(" (")[0]
-            
-            # Enable text widget temporarily to update content
-            self.current_result.configure(state='normal')
-            self.current_result.delete(1.0, tk.END)
-            self.current_result.insert(tk.END, "Fetching data...")
-            self.current_result.configure(state='disabled')  # Disable again
-            self.update()
-            
-            station_data = BuienradarAPI.get_station_data(station_name)
-            
-            if not station_data:
-                self.current_result.configure(state='normal')
-                self.current_result.delete(1.0, tk.END)
-                self.current_result.insert(tk.END, "Failed to fetch data for selected station.")
-                self.current_result.configure(state='disabled')
-                return
-            
-            # Display data
-            self.current_result.configure(state='normal')
-            self.current_result.delete(1.0, tk.END)
-            formatted_data = CurrentWeather.format_station_data(station_data)
-            self.current_result.insert(tk.END, formatted_data)
-            self.current_result.configure(state='disabled')
-            
-        except Exception as e:
-            self.current_result.configure(state='normal')
-            self.current_result.delete(1.0, tk.END)
-            error_message = f"An error occurred while fetching data:\n{str(e)}"
-            self.current_result.insert(tk.END, error_message)
-            self.current_result.configure(state='disabled')
-            logging.error(f"Error in get_current_weather: {e}")
+        station_name = self.station_combo.get().split(" (")[0]
+        self._set_text(self.current_result, "Fetching data...")
+        
+        # A newer request for the 'current' tab cancels the previous one
+        self.show_loading("Fetching current weather...")
+        self.worker.submit('current',
+                           self._fetch_station(station_name),
+                           on_success=lambda result: self._show_current_weather(*result),
+                           on_error=self._show_current_weather_error,
+                           on_done=self.hide_loading)
+
+    @staticmethod
+    async def _fetch_station(station_name):
+        """Returns (station, snapshot version) for the selected station"""
+        snapshot = await AsyncBuienradarAPI.get_snapshot()
+        if snapshot is None:
+            return None, None
+        return snapshot.get(station_name), snapshot.version
+
+    def on_station_selected(self, event=None):
+        """Refreshes current weather when the user picks another station"""
+        self.get_current_weather()
+
+    def on_snapshot_delta(self, delta):
+        """Called from the fetching thread when a new feed version changes stations"""
+        self.worker.post(self._apply_snapshot_delta, delta)
+
+    def _apply_snapshot_delta(self, delta):
+        # Only the station on screen is redrawn, and only if it changed
+        key = self._current_station_key
+        if key is None or not delta.touches(key):
+            return
+        if key in delta.removed:
+            self._current_station_key = None
+            self._set_text(self.current_result, "The selected station is no longer reporting.")
+        else:
+            self._show_current_weather(delta.stations[key], delta.version)
+
+    def _show_current_weather(self, station_data, version):
+        if not station_data:
+            self._current_station_key = None
+            self._set_text(self.current_result, "Failed to fetch data for selected station.")
+            return
+        
+        self._current_station_key = StationSnapshot.station_key(station_data)
+        # Display data
+        formatted_data = WeatherRenderer.render_station(station_data, version)
+        self._set_text(self.current_result, formatted_data)
+
+    def _show_current_weather_error(self, e):
+        error_message = f"An error occurred while fetching data:\n{str(e)}"
+        self._set_text(self.current_result, error_message)
+        logging.error(f"Error in get_current_weather: {e}")
 
     def get_forecast(self):
         """Fetches and displays weather forecast"""
-        try:
-            # Enable text widget for updating
-            self.forecast_result.configure(state='normal')
-            
-            # Show loading message
-            self.forecast_result.delete(1.0, tk.END)
-            self.forecast_result.insert(tk.END, "Fetching forecast...")
-            self.forecast_result.configure(state='disabled')
-            self.update()
-            
-            # Get forecast data
-            forecast_data = BuienradarAPI.get_forecast()
-            
-            # Enable text widget for updating
-            self.forecast_result.configure(state='normal')
-            
-            if not forecast_data:
-                self.forecast_result.delete(1.0, tk.END)
-                self.forecast_result.insert(tk.END, "Failed to fetch forecast data.")
-            else:
-                # Display forecast
-                self.forecast_result.delete(1.0, tk.END)
-                formatted_data = WeatherForecast.format_forecast_data(forecast_data)
-                self.forecast_result.insert(tk.END, formatted_data)
-            
-            # Disable text widget again
-            self.forecast_result.configure(state='disabled')
-            
-        except Exception as e:
-            # Enable text widget for error message
-            self.forecast_result.configure(state='normal')
-            self.forecast_result.delete(1.0, tk.END)
-            error_message = f"An error occurred while fetching forecast:\n{str(e)}"
-            self.forecast_result.insert(tk.END, error_message)
-            self.forecast_result.configure(state='disabled')
-            logging.error(f"Error in get_forecast: {e}")
+        # Show loading message
+        self._set_text(self.forecast_result, "Fetching forecast...")
+        
+        self.show_loading("Fetching forecast...")
+        self.worker.submit('forecast',
+                           AsyncBuienradarAPI.get_forecast(),
+                           on_success=self._show_forecast,
+                           on_error=self._show_forecast_error,
+                           on_done=self.hide_loading)
+
+    def _show_forecast(self, forecast_data):
+        if not forecast_data:
+            self._set_text(self.forecast_result, "Failed to fetch forecast data.")
+        else:
+            # Display forecast
+            formatted_data = WeatherRenderer.render_forecast(forecast_data)
+            self._set_text(self.forecast_result, formatted_data)
+
+    def _show_forecast_error(self, e):
+        error_message = f"An error occurred while fetching forecast:\n{str(e)}"
+        self._set_text(self.forecast_result, error_message)
+        logging.error(f"Error in get_forecast: {e}")
+
+    def _set_text(self, text_widget, content):
+        """Replaces the content of a read-only text widget"""
+        with Metrics.timer('gui.render_text'):
+            text_widget.configure(state='normal')
+            text_widget.delete(1.0, tk.END)
+            text_widget.insert(tk.END, content)
+            text_widget.configure(state='disabled')
 
     def browse_file(self):
         """Opens file dialog for selecting KNMI data file"""
@@ -244,6 +300,25 @@ class WeatherApp(tk.Frame):
                 self.stats_result.insert(tk.END, error_message)
                 logging.error(f"Error in browse_file: {e}")
 
+    def browse_folder(self):
+        """Opens folder dialog for selecting a directory of KNMI data files"""
+        folder = filedialog.askdirectory(
+            title='Select KNMI Data Folder',
+            initialdir='./data'
+        )
+        
+        if folder:
+            self.file_path.set(folder)
+            files = WeatherStatistics.expand_source(folder)
+            self._set_text(self.stats_result,
+                           f"Selected folder: {folder} ({len(files)} data files)\n"
+                           "Enter date range and click 'Calculate Statistics'")
+
+    def _show_statistics_progress(self, done, total, file_path):
+        self._set_text(self.stats_result,
+                       f"Calculating statistics... {done}/{total} files\n"
+                       f"Last processed: {os.path.basename(file_path)}")
+
     def calculate_statistics(self):
         """Calculates weather statistics for selected file and date range"""
         # Validate file selection
@@ -261,31 +336,39 @@ class WeatherApp(tk.Frame):
             messagebox.showwarning("Warning", error_message)
             return
         
-        try:
-            # Enable text widget for updating
-            self.stats_result.configure(state='normal')
-            
-            # Show loading message
-            self.stats_result.delete(1.0, tk.END)
-            self.stats_result.insert(tk.END, "Calculating statistics...")
-            self.update()
-            
-            # Create WeatherStatistics instance and process data
-            stats_processor = WeatherStatistics()
-            stats, output_file = stats_processor.process_period(
-                self.file_path.get(),
-                start_date,
-                end_date
-            )
-            
-            # Clear previous results
-            self.stats_result.delete(1.0, tk.END)
-            
-            if stats is None:
-                self.stats_result.insert(tk.END, f"Error: {output_file}")
-            else:
-                # Display results
-                result_text = f"""
+        # Show loading message
+        self._set_text(self.stats_result, "Calculating statistics...")
+        
+        # Create WeatherStatistics instance and process data off the Tk thread
+        stats_processor = WeatherStatistics()
+        source = self.file_path.get()
+        extended = self.extended_stats.get()
+        if WeatherStatistics.is_multi_file(source):
+            # Directory or glob: files are fanned out to a process pool
+            progress = lambda *args: self.worker.post(self._show_statistics_progress, *args)
+            job = asyncio.to_thread(stats_processor.process_files,
+                                    source, start_date, end_date,
+                                    progress=progress, extended=extended)
+        else:
+            job = asyncio.to_thread(stats_processor.process_period,
+                                    source, start_date, end_date, extended=extended)
+        
+        self.show_loading("Calculating statistics...")
+        self.worker.submit('statistics',
+                           job,
+                           on_success=lambda result: self._show_statistics(result, start_date, end_date,
+                                                                           stats_processor.file_errors),
+                           on_error=self._show_statistics_error,
+                           on_done=self.hide_loading)
+
+    def _show_statistics(self, result, start_date, end_date, file_errors=None):
+        stats, output_file = result
+        
+        if stats is None:
+            self._set_text(self.stats_result, f"Error: {output_file}")
+        else:
+            # Display results
+            result_text = f"""
 Statistics calculated successfully!
 
 Period: {start_date} to {end_date}
@@ -294,21 +377,20 @@ Maximum Temperature: {stats['max_temp']:.1f}°C
 Minimum Temperature: {stats['min_temp']:.1f}°C
 Average Temperature: {stats['avg_temp']:.1f}°C
 Total Precipitation: {stats['total_precipitation']:.1f}mm
-
-Results saved to: {output_file}
 """
-                self.stats_result.insert(tk.END, result_text)
-            
-            # Disable text widget again
-            self.stats_result.configure(state='disabled')
-            
-        except Exception as e:
-            self.stats_result.configure(state='normal')
-            self.stats_result.delete(1.0, tk.END)
-            error_message = f"An error occurred while calculating statistics:\n{str(e)}"
-            self.stats_result.insert(tk.END, error_message)
-            self.stats_result.configure(state='disabled')
-            logging.error(f"Error in calculate_statistics: {e}")
+            if 'p50_temp' in stats:
+                result_text += "\n" + WeatherStatistics.format_extended(stats)
+            if file_errors:
+                result_text += f"\nSkipped {len(file_errors)} unreadable file(s):\n"
+                result_text += "".join(f"  {os.path.basename(path)}: {error}\n"
+                                       for path, error in file_errors.items())
+            result_text += f"\nResults saved to: {output_file}\n"
+            self._set_text(self.stats_result, result_text)
+
+    def _show_statistics_error(self, e):
+        error_message = f"An error occurred while calculating statistics:\n{str(e)}"
+        self._set_text(self.stats_result, error_message)
+        logging.error(f"Error in calculate_statistics: {e}")
 
     def validate_date_entry(self, event):
         """Validates date entry as user types"""
@@ -354,6 +436,11 @@ Results saved to: {output_file}
         self.wind_label.pack(pady=10)
 
     def show_loading(self, text="Loading..."):
+        # Several background jobs can run at once; keep one indicator for all
+        self._loading_count += 1
+        if self._loading_count > 1:
+            self.loading_label.configure(text=text)
+            return
         self.progress = ttk.Progressbar(self, 
                                       mode='indeterminate', 
                                       length=300)
@@ -363,10 +450,18 @@ Results saved to: {output_file}
                                      text=text,
                                      font=('Helvetica', 10))
         self.loading_label.pack()
-        self.update()
 
     def hide_loading(self):
-        if hasattr(self, 'progress'):
+        self._loading_count = max(0, self._loading_count - 1)
+        if self._loading_count == 0 and hasattr(self, 'progress'):
             self.progress.stop()
             self.progress.destroy()
-            self.loading_label.destroy()
\ No newline at end of file
+            self.loading_label.destroy()
+            del self.progress
+
+    def destroy(self):
+        BuienradarAPI.unsubscribe(self.on_snapshot_delta)
+        if self.recorder is not None:
+            self.recorder.stop()
+        self.worker.stop()
+        super().destroy()
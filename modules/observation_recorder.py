@@ -0,0 +1,88 @@
+import threading
+import logging
+from typing import Dict, Optional
+
+from utils.api_handler import BuienradarAPI
+from utils.observation_log import ObservationLog
+from utils.snapshot_diff import SnapshotDelta
+
+
+class ObservationRecorder:
+    """Polls the Buienradar feed in the background and logs new readings.
+
+    The recorder subscribes to BuienradarAPI snapshot deltas, so it only
+    ever looks at stations that were added or changed since the previous
+    feed version, whoever fetched it. A changed station is logged when it
+    reports a timestamp that has not been logged yet.
+    """
+
+    def __init__(self, log: Optional[ObservationLog] = None, interval: float = 600.0):
+        self.log = log or ObservationLog()
+        self.interval = interval
+        self.polls = 0
+        self.recorded = 0
+        self._last_seen: Dict[int, int] = self.log.latest_times()
+        self._pending: Dict = {}
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ObservationRecorder":
+        BuienradarAPI.subscribe(self.on_delta)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="observation-recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        BuienradarAPI.unsubscribe(self.on_delta)
+        self._stop.set()
+
+    def on_delta(self, delta: SnapshotDelta):
+        """Queues added and changed stations for the next flush"""
+        with self._pending_lock:
+            self._pending.update(delta.stations)
+
+    def poll_once(self) -> int:
+        """Fetches the feed once and logs changed readings; returns how many"""
+        self.polls += 1
+        BuienradarAPI.get_snapshot()
+        return self.flush()
+
+    def flush(self) -> int:
+        """Logs the queued station readings that are new; returns how many"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        records = self.log.records_from_feed(pending.values())
+        if not len(records):
+            return 0
+        changed = [i for i, (station, time) in enumerate(zip(records['station'].tolist(),
+                                                             records['time'].tolist()))
+                   if self._last_seen.get(station) != time]
+        if not changed:
+            return 0
+
+        records = records[changed]
+        self.log.append(records)
+        self._last_seen.update(zip(records['station'].tolist(), records['time'].tolist()))
+        self.recorded += len(records)
+        return len(records)
+
+    def _run(self):
+        # Readings already in the current snapshot predate the subscription
+        snapshot = BuienradarAPI.get_snapshot()
+        if snapshot is not None:
+            with self._pending_lock:
+                for key, station in snapshot.by_key.items():
+                    self._pending.setdefault(key, station)
+        while not self._stop.is_set():
+            try:
+                count = self.poll_once()
+                if count:
+                    logging.debug(f"Recorded {count} new observations")
+            except Exception as e:
+                logging.error(f"Error recording observations: {e}")
+            self._stop.wait(self.interval)
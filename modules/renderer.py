@@ -0,0 +1,98 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Union
+
+from modules.current_weather import CurrentWeather
+from modules.weather_forecast import WeatherForecast
+from utils.models import StationMeasurement
+from utils.station_snapshot import StationSnapshot
+
+
+class WeatherRenderer:
+    """Memoized text and JSON rendering of station readings and forecasts.
+
+    Station output is cached per station and snapshot version, forecast
+    output per ``published`` stamp, in one LRU cache shared by all callers
+    (GUI, HTTP server, CLI). A new feed version gets new cache entries and
+    the old ones age out. Forecasts without a readable ``published`` stamp
+    are rendered every time, since there is nothing to key them on.
+    """
+
+    FORMATS = ('text', 'json')
+    CACHE_SIZE = 256
+
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def render_station(station: Union[StationMeasurement, Dict], version: int,
+                       fmt: str = 'text') -> str:
+        """Renders one station reading from snapshot ``version``"""
+        key = ('station', StationSnapshot.station_key(station), version, fmt)
+        if fmt == 'json':
+            render = lambda: WeatherRenderer._to_json(CurrentWeather.station_fields(station))
+        else:
+            WeatherRenderer._check_format(fmt)
+            render = lambda: CurrentWeather.format_station_data(station)
+        return WeatherRenderer._cached(key, render)
+
+    @staticmethod
+    def render_forecast(forecast: Dict, fmt: str = 'text') -> str:
+        """Renders a forecast as returned by BuienradarAPI.get_forecast()"""
+        if fmt == 'json':
+            render = lambda: WeatherRenderer._to_json(dict(forecast))
+        else:
+            WeatherRenderer._check_format(fmt)
+            render = lambda: WeatherForecast.format_forecast_data(forecast)
+
+        published = (forecast or {}).get('published')
+        try:
+            WeatherForecast.parse_published(published)
+        except ValueError:
+            return render()
+        return WeatherRenderer._cached(('forecast', published, fmt), render)
+
+    @staticmethod
+    def stats() -> Dict:
+        with WeatherRenderer._lock:
+            return {
+                'entries': len(WeatherRenderer._cache),
+                'hits': WeatherRenderer._hits,
+                'misses': WeatherRenderer._misses,
+            }
+
+    @staticmethod
+    def clear():
+        with WeatherRenderer._lock:
+            WeatherRenderer._cache.clear()
+
+    @staticmethod
+    def _cached(key, render: Callable[[], str]) -> str:
+        cache = WeatherRenderer._cache
+        with WeatherRenderer._lock:
+            output: Optional[str] = cache.get(key)
+            if output is not None:
+                cache.move_to_end(key)
+                WeatherRenderer._hits += 1
+                return output
+            WeatherRenderer._misses += 1
+
+        # Rendering happens outside the lock; a concurrent miss renders twice
+        output = render()
+        with WeatherRenderer._lock:
+            cache[key] = output
+            while len(cache) > WeatherRenderer.CACHE_SIZE:
+                cache.popitem(last=False)
+        return output
+
+    @staticmethod
+    def _to_json(fields: Dict) -> str:
+        return json.dumps(fields, ensure_ascii=False)
+
+    @staticmethod
+    def _check_format(fmt: str):
+        if fmt not in WeatherRenderer.FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
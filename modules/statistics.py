@@ -10,7 +10,7 @@ class WeatherStatistics:
         """Processes weather data for given period and returns statistics"""
         try:
             # Read data
-            df = self.processor.read_knmi_file(file_path)
+            df = self.processor.load_dataset(file_path)
             if df is None:
                 return None, "Failed to read KNMI data file"
 
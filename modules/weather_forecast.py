@@ -2,14 +2,7 @@ from datetime import datetime
 import logging
 
 class WeatherForecast:
-    @staticmethod
-    def format_forecast_data(forecast_data: dict) -> str:
-        """Formats forecast data into readable text"""
-        if not forecast_data:
-            return "No forecast data available"
-        
-        try:
-            template = """
+    TEMPLATE = """
 Forecast Title: {title}
 Published: {published}
 
@@ -18,15 +11,36 @@ Weather Report:
 
 Author: {author}
 """
-            # Format the published date if possible
-            if 'published' in forecast_data:
-                try:
-                    timestamp = datetime.fromisoformat(forecast_data['published'].replace('Z', '+00:00'))
-                    forecast_data['published'] = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-                except (ValueError, AttributeError):
-                    pass  # Keep original format if parsing fails
-                    
-            return template.format(**forecast_data)
+
+    @staticmethod
+    def parse_published(published) -> datetime:
+        """Parses a forecast ``published`` stamp; raises ValueError if it is not one"""
+        try:
+            return datetime.fromisoformat(published.replace('Z', '+00:00'))
+        except AttributeError:
+            raise ValueError(f"Not a timestamp: {published!r}")
+
+    @staticmethod
+    def forecast_fields(forecast_data: dict) -> dict:
+        """Returns the display values of a forecast, leaving the input untouched"""
+        fields = dict(forecast_data)
+        # Format the published date if possible
+        if 'published' in fields:
+            try:
+                timestamp = WeatherForecast.parse_published(fields['published'])
+                fields['published'] = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                pass  # Keep original format if parsing fails
+        return fields
+
+    @staticmethod
+    def format_forecast_data(forecast_data: dict) -> str:
+        """Formats forecast data into readable text"""
+        if not forecast_data:
+            return "No forecast data available"
+        
+        try:
+            return WeatherForecast.TEMPLATE.format(**WeatherForecast.forecast_fields(forecast_data))
             
         except Exception as e:
             logging.error(f"Error formatting forecast data: {e}")
@@ -1,38 +1,309 @@
 import pandas as pd
 import os
+import hashlib
 from datetime import datetime
+import glob
 import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.frame_cache import ParsedFrameCache
+from utils.instrumentation import Metrics
+from utils.knmi_reader import KNMIReader
+from utils.knmi_dataset import KNMIDataset
+from utils.aggregate_index import AggregateIndex
+from utils.temporal_pyramid import TemporalPyramid
+from utils.streaming_stats import PeriodAccumulator, drop_duplicates, filter_period
+from utils.extended_stats import ExtendedAccumulator, extended_statistics
+from utils.timeseries_store import TimeSeriesStore
+from utils.climatology import Climatology, daily_values
+from utils.observation_log import ObservationLog
+
+
+def _accumulate_file(file_path: str, start_date: str, end_date: str, columns: tuple,
+                     engine: str, sorted_input: bool, chunksize: int,
+                     extended: bool = False):
+    """Partial statistics of one file; module-level so process pools can pickle it.
+
+    Duplicate dates are skipped per station with the same rule as loaded
+    files (KNMIDataset.normalize), so both give the same result.
+    """
+    chunks = KNMIReader.iter_chunks(file_path, columns=columns, chunksize=chunksize, engine=engine,
+                                    include_station=KNMIReader.has_station(file_path))
+    if extended:
+        accumulator = ExtendedAccumulator(start_date, end_date)
+    else:
+        accumulator = PeriodAccumulator(columns)
+    for rows in drop_duplicates(filter_period(chunks, start_date, end_date, sorted_input)):
+        accumulator.update(rows)
+    return accumulator
+
 
 class WeatherStatistics:
-    def __init__(self):
+    # Columns needed to compute the period statistics
+    STATS_COLUMNS = ('TEMP', 'PRECIPITATION')
+    # Columns needed for the extended statistics (extended=True)
+    EXTENDED_COLUMNS = ExtendedAccumulator.COLUMNS
+    # Reported statistics are rounded to this many decimals, far below the
+    # data's resolution, so they do not depend on how rows were chunked
+    REPORT_DECIMALS = 9
+    # Bumped whenever _parse_file() output changes, so cached frames and
+    # persisted pyramids from older versions are rebuilt
+    PARSE_VERSION = 3
+    # Number of files whose aggregate index / pyramid is kept in memory
+    INDEX_CACHE_SIZE = 4
+    # Persisted week/month/year pyramids of data files (use_cache=True)
+    PYRAMID_DIR = "data/cache/pyramids"
+    # generate_periods() frequency names -> pandas period frequencies
+    PERIOD_FREQUENCIES = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'year': 'Y'}
+    # Files larger than this are streamed instead of loaded (streaming=None)
+    STREAMING_THRESHOLD = 512 * 1024 * 1024
+    STREAMING_CHUNKSIZE = 500_000
+    # File types picked up when a directory is given
+    DATA_EXTENSIONS = ('.csv', '.txt')
+    # Sources starting with this prefix are read from the time-series store,
+    # e.g. "store:260" for De Bilt
+    STORE_PREFIX = 'store:'
+    # Sources starting with this prefix are read from the live observation
+    # log, e.g. "log:6260" for Buienradar station 6260
+    LOG_PREFIX = 'log:'
+    _frame_cache = None
+    _index_cache = OrderedDict()
+    _pyramid_cache = OrderedDict()
+    # Guards both caches; the GUI and the web service query from several threads
+    _cache_lock = threading.Lock()
+    _store = None
+    _observation_log = None
+    _climatology = None
+
+    def __init__(self, use_cache: bool = True, engine: str = 'c',
+                 streaming: bool = None, sorted_input: bool = False):
         self.output_dir = "data/output"
         os.makedirs(self.output_dir, exist_ok=True)
+        self.use_cache = use_cache
+        self.engine = engine
+        # None picks streaming mode by file size
+        self.streaming = streaming
+        # Set for files sorted by date, so streaming stops after the end date
+        self.sorted_input = sorted_input
+        # Files that process_files() could not read in its last run -> error
+        self.file_errors = {}
+
+    def use_streaming(self, file_path: str) -> bool:
+        """Returns True if a file should be processed in streaming mode"""
+        if self.streaming is not None:
+            return self.streaming
+        return os.path.getsize(file_path) > self.STREAMING_THRESHOLD
+
+    @staticmethod
+    def get_frame_cache() -> ParsedFrameCache:
+        """Returns the on-disk cache of parsed data files"""
+        if WeatherStatistics._frame_cache is None:
+            WeatherStatistics._frame_cache = ParsedFrameCache()
+        return WeatherStatistics._frame_cache
+
+    def _parse_file(self, file_path: str, columns: tuple = None) -> pd.DataFrame:
+        """Reads the columns needed for statistics, sorted by date with unique dates per station"""
+        df = KNMIReader.read(file_path, columns=columns or self.STATS_COLUMNS, engine=self.engine,
+                             include_station=KNMIReader.has_station(file_path))
+        return KNMIDataset.normalize(df)
+
+    def load_data(self, file_path: str, columns: tuple = None) -> pd.DataFrame:
+        """Returns the parsed data file, from the conversion cache when possible"""
+        columns = columns or self.STATS_COLUMNS
+        if not self.use_cache:
+            return self._parse_file(file_path, columns)
+        parser = lambda path: self._parse_file(path, columns)
+        variant = f"{','.join(columns)}|v{self.PARSE_VERSION}"
+        return self.get_frame_cache().load(file_path, parser, variant=variant)
+
+    def load_dataset(self, file_path: str, columns: tuple = None) -> KNMIDataset:
+        """Returns the data file as a date-indexed dataset"""
+        return KNMIDataset(self.load_data(file_path, columns))
+
+    @staticmethod
+    def get_store() -> TimeSeriesStore:
+        """Returns the station-by-day archive under data/store"""
+        if WeatherStatistics._store is None:
+            WeatherStatistics._store = TimeSeriesStore()
+        return WeatherStatistics._store
+
+    def store_period(self, station: str, start_date: str, end_date: str) -> dict:
+        """Computes period statistics straight from the memory-mapped archive"""
+        frame = self.get_store().read(station, start_date, end_date, self.STATS_COLUMNS)
+        # Days without any observation are empty slots, not data
+        frame = frame.dropna(how='all', subset=list(self.STATS_COLUMNS))
+        accumulator = PeriodAccumulator(self.STATS_COLUMNS)
+        accumulator.update(frame)
+        return accumulator.result()
 
-    def process_period(self, file_path: str, start_date: str, end_date: str) -> tuple:
-        """Process weather data for the given period"""
+    def ingest_store(self, source: str, station: str = None, progress=None) -> tuple:
+        """Adds a data file, directory or glob to the time-series store.
+
+        Files with a station column are split per station; others are
+        stored under ``station``. Duplicate dates follow the same rule as
+        statistics (KNMIDataset.normalize). Returns (rows written, None) or
+        (None, error message).
+        """
+        store = self.get_store()
         try:
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            
-            # Convert dates to datetime for comparison
-            df['DATE'] = pd.to_datetime(df['DATE'])
-            start = pd.to_datetime(start_date)
-            end = pd.to_datetime(end_date)
-            
-            # Filter data for the specified period
-            mask = (df['DATE'] >= start) & (df['DATE'] <= end)
-            period_data = df.loc[mask]
-            
-            if period_data.empty:
+            files = self.expand_source(source) if self.is_multi_file(source) else [source]
+            if not files:
+                return None, "No data files found"
+            written = 0
+            for done, file_path in enumerate(files, 1):
+                has_station = KNMIReader.has_station(file_path)
+                if not has_station and station is None:
+                    return None, f"{file_path} has no station column; give a station"
+                frame = KNMIReader.read(file_path, columns=TimeSeriesStore.VARIABLES, engine=self.engine,
+                                        include_station=has_station)
+                written += store.ingest_frame(KNMIDataset.normalize(frame), station)
+                if progress is not None:
+                    progress(done, len(files), file_path)
+            return written, None
+
+        except FileNotFoundError:
+            logging.error(f"File not found: {source}")
+            return None, "The specified file was not found"
+        except Exception as e:
+            logging.error(f"Error adding {source} to the store: {e}")
+            return None, f"Error processing data: {str(e)}"
+
+    @staticmethod
+    def get_observation_log() -> ObservationLog:
+        """Returns the log of recorded live observations"""
+        if WeatherStatistics._observation_log is None:
+            WeatherStatistics._observation_log = ObservationLog()
+        return WeatherStatistics._observation_log
+
+    def log_daily(self, station: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Returns recorded live observations of one station as one row per day.
+
+        Temperature and pressure are daily means. Precipitation readings are
+        running 24-hour totals, so each day keeps its last one, which is
+        what the store holds for that day as well.
+        """
+        frame = self.get_observation_log().read_frame(station, start_date, end_date)
+        return daily_values(frame, ObservationLog.VARIABLES, precipitation='last')
+
+    def log_period(self, station: str, start_date: str, end_date: str) -> dict:
+        """Computes period statistics over recorded live observations, per day"""
+        frame = self.log_daily(station, start_date, end_date)
+        accumulator = PeriodAccumulator(self.STATS_COLUMNS)
+        accumulator.update(frame)
+        return accumulator.result()
+
+    def extended_period(self, file_path: str, start_date: str, end_date: str) -> dict:
+        """Computes the extended statistics for any supported source.
+
+        Loaded files and archives get exact percentiles; streamed files use
+        the quantile sketch.
+        """
+        columns = self.EXTENDED_COLUMNS
+        if file_path.startswith(self.STORE_PREFIX):
+            station = file_path[len(self.STORE_PREFIX):]
+            frame = self.get_store().read(station, start_date, end_date, columns)
+            frame = frame.dropna(how='all', subset=list(columns))
+        elif file_path.startswith(self.LOG_PREFIX):
+            station = file_path[len(self.LOG_PREFIX):]
+            frame = self.log_daily(station, start_date, end_date)
+        elif self.use_streaming(file_path):
+            return _accumulate_file(file_path, start_date, end_date, columns, self.engine,
+                                    self.sorted_input, self.STREAMING_CHUNKSIZE, extended=True).result()
+        else:
+            frame = self.load_dataset(file_path, columns).slice(start_date, end_date)
+        return extended_statistics(frame, start_date, end_date)
+
+    def get_aggregate_index(self, file_path: str) -> AggregateIndex:
+        """Returns the aggregate index for a data file, building it once per file version"""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        cache = WeatherStatistics._index_cache
+        with WeatherStatistics._cache_lock:
+            index = cache.get(key)
+            if index is not None:
+                cache.move_to_end(key)
+                return index
+
+        # Built outside the lock; two threads may both build the same index
+        index = AggregateIndex(self.load_dataset(file_path), self.STATS_COLUMNS)
+        self._remember(cache, key, index)
+        return index
+
+    def get_pyramid(self, file_path: str) -> TemporalPyramid:
+        """Returns the week/month/year pyramid of a data file.
+
+        Pyramids are kept in memory per file version and, with use_cache,
+        persisted under PYRAMID_DIR, so a later run answers queries without
+        parsing the file again.
+        """
+        stat = os.stat(file_path)
+        source = os.path.abspath(file_path)
+        key = (source, stat.st_size, stat.st_mtime_ns)
+        cache = WeatherStatistics._pyramid_cache
+        with WeatherStatistics._cache_lock:
+            pyramid = cache.get(key)
+            if pyramid is not None:
+                cache.move_to_end(key)
+                return pyramid
+
+        version = {'source': source, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                   'parse_version': self.PARSE_VERSION}
+        path = os.path.join(self.PYRAMID_DIR, hashlib.sha1(source.encode('utf-8')).hexdigest()[:16])
+        if self.use_cache:
+            pyramid, meta = TemporalPyramid.load(path)
+            if pyramid is not None and any(meta.get(name) != value for name, value in version.items()):
+                pyramid = None
+        if pyramid is None:
+            pyramid = TemporalPyramid.build(self.load_dataset(file_path), self.STATS_COLUMNS)
+            if self.use_cache:
+                try:
+                    pyramid.save(path, version)
+                except OSError as e:
+                    logging.warning(f"Could not save pyramid for {file_path}: {e}")
+        self._remember(cache, key, pyramid)
+        return pyramid
+
+    def _remember(self, cache: OrderedDict, key: tuple, value):
+        """Adds an entry to an LRU cache, dropping the oldest beyond INDEX_CACHE_SIZE"""
+        with WeatherStatistics._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.INDEX_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @Metrics.timed('stats.process_period')
+    def process_period(self, file_path: str, start_date: str, end_date: str,
+                       save: bool = True, extended: bool = False) -> tuple:
+        """Process weather data for the given period; with save=False no file is written.
+
+        With ``extended`` the result also has percentiles, degree days,
+        dry/wet days, the longest dry spell, rolling means and pressure
+        statistics (see ExtendedAccumulator).
+        """
+        try:
+            if extended:
+                period_stats = self.extended_period(file_path, start_date, end_date)
+            elif file_path.startswith(self.STORE_PREFIX):
+                station = file_path[len(self.STORE_PREFIX):]
+                period_stats = self.store_period(station, start_date, end_date)
+            elif file_path.startswith(self.LOG_PREFIX):
+                station = file_path[len(self.LOG_PREFIX):]
+                period_stats = self.log_period(station, start_date, end_date)
+            elif self.use_streaming(file_path):
+                # Bounded memory: only running accumulators are kept
+                period_stats = self.stream_period(file_path, start_date, end_date)
+            else:
+                # Whole years/months/weeks from the persisted pyramid, raw
+                # rows only at the edges of the period
+                period_stats = self.get_pyramid(file_path).query(start_date, end_date)
+            if period_stats is None:
                 return None, "No data found for the specified period"
             
-            # Calculate statistics
-            stats = {
-                'max_temp': float(period_data['TEMP'].max()),
-                'min_temp': float(period_data['TEMP'].min()),
-                'avg_temp': float(period_data['TEMP'].mean()),
-                'total_precipitation': float(period_data['PRECIPITATION'].sum())
-            }
+            stats = self._report(period_stats)
+            if not save:
+                return stats, None
             
             # Create output filename
             filename = f"weerstatistieken-{start_date}-{end_date}.txt"
@@ -53,6 +324,274 @@ class WeatherStatistics:
             logging.error(f"Error processing weather statistics: {e}")
             return None, f"Error processing data: {str(e)}"
 
+    def stream_period(self, file_path: str, start_date: str, end_date: str) -> dict:
+        """Computes period statistics chunk by chunk without loading the file"""
+        return _accumulate_file(file_path, start_date, end_date, self.STATS_COLUMNS,
+                                self.engine, self.sorted_input, self.STREAMING_CHUNKSIZE).result()
+
+    @staticmethod
+    def is_multi_file(source: str) -> bool:
+        """Returns True if ``source`` is a directory or a glob pattern"""
+        return os.path.isdir(source) or glob.has_magic(source)
+
+    @staticmethod
+    def expand_source(source: str) -> list:
+        """Returns the data files in a directory or matching a glob pattern"""
+        if os.path.isdir(source):
+            patterns = [os.path.join(source, f"*{ext}") for ext in WeatherStatistics.DATA_EXTENSIONS]
+        else:
+            patterns = [source]
+        files = {path for pattern in patterns for path in glob.glob(pattern) if os.path.isfile(path)}
+        return sorted(files)
+
+    def process_files(self, source: str, start_date: str, end_date: str,
+                      workers: int = None, progress=None, extended: bool = False) -> tuple:
+        """Process a directory or glob of data files for the given period.
+
+        Files are processed in parallel by a pool of ``workers`` processes
+        (one per CPU by default); their partial aggregates are merged into
+        one result. ``progress(done, total, file_path)`` is called after
+        each file, from the calling thread. A file that cannot be read is
+        logged and left out; ``file_errors`` maps it to its error.
+        """
+        self.file_errors = {}
+        try:
+            files = self.expand_source(source)
+            if not files:
+                return None, "No data files found"
+
+            columns = self.EXTENDED_COLUMNS if extended else self.STATS_COLUMNS
+            args = (start_date, end_date, columns, self.engine,
+                    self.sorted_input, self.STREAMING_CHUNKSIZE, extended)
+            if extended:
+                total = ExtendedAccumulator(start_date, end_date)
+            else:
+                total = PeriodAccumulator(self.STATS_COLUMNS)
+            workers = min(workers or os.cpu_count() or 1, len(files))
+            if workers == 1:
+                for done, file_path in enumerate(files, 1):
+                    try:
+                        total.merge(_accumulate_file(file_path, *args))
+                    except Exception as e:
+                        self._file_failed(file_path, e)
+                    if progress is not None:
+                        progress(done, len(files), file_path)
+            else:
+                # Spawned workers do not inherit the caller's threads and
+                # locks (the GUI calls this from a worker thread)
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn')) as pool:
+                    futures = {pool.submit(_accumulate_file, file_path, *args): file_path
+                               for file_path in files}
+                    for done, future in enumerate(as_completed(futures), 1):
+                        try:
+                            total.merge(future.result())
+                        except Exception as e:
+                            self._file_failed(futures[future], e)
+                        if progress is not None:
+                            progress(done, len(files), futures[future])
+
+            if len(self.file_errors) == len(files):
+                return None, f"None of the {len(files)} files could be read: {next(iter(self.file_errors.values()))}"
+            period_stats = total.result()
+            if period_stats is None:
+                return None, "No data found for the specified period"
+
+            stats = self._report(period_stats)
+            filename = f"weerstatistieken-{start_date}-{end_date}.txt"
+            output_path = os.path.join(self.output_dir, filename)
+            self._save_results(output_path, stats, start_date, end_date)
+            return stats, output_path
+
+        except Exception as e:
+            logging.error(f"Error processing weather statistics for {source}: {e}")
+            return None, f"Error processing data: {str(e)}"
+
+    @staticmethod
+    def _report(period_stats: dict) -> dict:
+        """Returns statistics as plain ints and floats rounded to REPORT_DECIMALS"""
+        return {name: value if isinstance(value, int) else round(float(value), WeatherStatistics.REPORT_DECIMALS)
+                for name, value in period_stats.items()}
+
+    def _file_failed(self, file_path: str, error: Exception):
+        logging.error(f"Skipping {file_path}: {error}")
+        self.file_errors[file_path] = str(error) or type(error).__name__
+
+    @staticmethod
+    def generate_periods(start_date: str, end_date: str, freq: str = 'month') -> list:
+        """Splits a date range into consecutive periods.
+
+        ``freq`` is 'day', 'week' (ISO weeks, Monday to Sunday), 'month' or
+        'year'. Periods at the edges are clipped to the requested range.
+        Returns a list of (label, start_date, end_date) tuples.
+        """
+        pandas_freq = WeatherStatistics.PERIOD_FREQUENCIES.get(freq)
+        if pandas_freq is None:
+            raise ValueError(f"Unknown period frequency: {freq}")
+
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        periods = []
+        for period in pd.period_range(start, end, freq=pandas_freq):
+            period_start = max(period.start_time.normalize(), start)
+            period_end = min(period.end_time.normalize(), end)
+            if freq == 'week':
+                year, week, _ = period.start_time.isocalendar()
+                label = f"{year}-W{week:02d}"
+            else:
+                label = str(period)
+            periods.append((label, period_start.strftime('%Y-%m-%d'), period_end.strftime('%Y-%m-%d')))
+        return periods
+
+    def process_periods(self, file_path: str, periods: list, save: bool = True,
+                        extended: bool = False) -> tuple:
+        """Computes statistics for many periods in one vectorised pass.
+
+        ``periods`` holds (start_date, end_date) or (label, start_date,
+        end_date) tuples, e.g. from generate_periods(). Returns a DataFrame
+        with one row per period and the path of the consolidated CSV file,
+        or (None, error message). With ``extended`` every row also holds
+        the extended statistics, computed per period from its rows.
+        """
+        try:
+            if not periods:
+                return None, "No periods given"
+            rows = [p if len(p) == 3 else (f"{p[0]}/{p[1]}", p[0], p[1]) for p in periods]
+            labels, starts, ends = (list(column) for column in zip(*rows))
+
+            index = self.get_aggregate_index(file_path)
+            i, j = index.dataset.bounds_many(starts, ends)
+
+            results = pd.DataFrame({'period': labels, 'start_date': starts, 'end_date': ends})
+            results['days'] = index.dataset.day_counts(i, j)
+            for name, values in index.stats(i, j).items():
+                results[name] = values
+            if extended:
+                # Percentiles and day-based statistics need each period's rows
+                dataset = self.load_dataset(file_path, self.EXTENDED_COLUMNS)
+                with Metrics.timer('stats.extended_periods'):
+                    rows = [extended_statistics(dataset.slice(start, end), start, end) or {}
+                            for start, end in zip(starts, ends)]
+                extra = pd.DataFrame(rows, index=results.index)
+                results = pd.concat([results.drop(columns=[c for c in extra.columns if c in results]), extra],
+                                    axis=1)
+            results = results.round(self.REPORT_DECIMALS)
+            if not save:
+                return results, None
+
+            filename = f"weerstatistieken-batch-{min(starts)}-{max(ends)}.csv"
+            output_path = os.path.join(self.output_dir, filename)
+            with Metrics.timer('stats.save'):
+                results.to_csv(output_path, index=False, float_format='%.2f')
+            return results, output_path
+
+        except FileNotFoundError:
+            logging.error(f"File not found: {file_path}")
+            return None, "The specified file was not found"
+        except Exception as e:
+            logging.error(f"Error processing batch statistics: {e}")
+            return None, f"Error processing data: {str(e)}"
+
+    @staticmethod
+    def get_climatology() -> Climatology:
+        """Returns the day-of-year climatology tables under data/climatology"""
+        if WeatherStatistics._climatology is None:
+            WeatherStatistics._climatology = Climatology()
+        return WeatherStatistics._climatology
+
+    def build_climatology(self, source: str, station: str = None, progress=None) -> tuple:
+        """Builds or extends the climatology from a file, directory, glob or ``store:<station>``.
+
+        Days already in the tables are skipped, so the same history can be
+        passed again after new years were appended. Returns (number of new
+        station-days, None) or (None, error message).
+        """
+        climatology = self.get_climatology()
+        try:
+            if source.startswith(self.STORE_PREFIX):
+                store_station = source[len(self.STORE_PREFIX):]
+                store = self.get_store()
+                if store.slot(store_station) is None:
+                    return None, f"Station {store_station} is not in the store"
+                end = store.origin + (store.days - 1)
+                frame = store.read(store_station, str(store.origin), str(end), Climatology.VARIABLES)
+                return climatology.update(frame, station or store_station), None
+
+            files = self.expand_source(source) if self.is_multi_file(source) else [source]
+            if not files:
+                return None, "No data files found"
+            added = 0
+            for done, file_path in enumerate(files, 1):
+                added += climatology.update_from_file(file_path, station, self.STREAMING_CHUNKSIZE, self.engine)
+                if progress is not None:
+                    progress(done, len(files), file_path)
+            return added, None
+
+        except FileNotFoundError:
+            logging.error(f"File not found: {source}")
+            return None, "The specified file was not found"
+        except Exception as e:
+            logging.error(f"Error building climatology from {source}: {e}")
+            return None, f"Error processing data: {str(e)}"
+
+    def period_daily_values(self, file_path: str, start_date: str, end_date: str,
+                            station: str = None) -> tuple:
+        """Returns (daily DATE/TEMP/PRECIPITATION/AIRPRESSURE frame, station) for a period"""
+        columns = Climatology.VARIABLES
+        if file_path.startswith(self.STORE_PREFIX):
+            station = station or file_path[len(self.STORE_PREFIX):]
+            frame = self.get_store().read(file_path[len(self.STORE_PREFIX):], start_date, end_date, columns)
+            return frame.dropna(how='all', subset=list(columns)), station
+        if file_path.startswith(self.LOG_PREFIX):
+            log_station = file_path[len(self.LOG_PREFIX):]
+            return self.log_daily(log_station, start_date, end_date), station or log_station
+
+        if not KNMIReader.has_station(file_path):
+            frame = self.load_dataset(file_path, columns).slice(start_date, end_date)
+            return daily_values(frame, columns), station
+
+        chunks = KNMIReader.iter_chunks(file_path, columns=columns, chunksize=self.STREAMING_CHUNKSIZE,
+                                        engine=self.engine, include_station=True)
+        parts = list(drop_duplicates(filter_period(chunks, start_date, end_date, self.sorted_input)))
+        if not parts:
+            return pd.DataFrame(columns=['DATE', *columns]), station
+        frame = pd.concat(parts, ignore_index=True)
+        stations = frame['STATION'].unique()
+        if station is None:
+            if len(stations) > 1:
+                raise ValueError(f"The file holds {len(stations)} stations; choose one")
+            station = stations[0]
+        frame = frame[frame['STATION'] == Climatology.station_key(station)].drop(columns='STATION')
+        return daily_values(frame, columns), station
+
+    @Metrics.timed('stats.anomaly_period')
+    def anomaly_period(self, file_path: str, start_date: str, end_date: str,
+                       station: str = None) -> tuple:
+        """Compares a period with the climatology of its station.
+
+        Returns (anomalies, None) or (None, error message); see
+        Climatology.anomalies() for the fields.
+        """
+        try:
+            daily, station = self.period_daily_values(file_path, start_date, end_date, station)
+            climatology = self.get_climatology()
+            if climatology.coverage(station) is None:
+                return None, f"No climatology for station {Climatology.station_key(station)}; build it first"
+            anomalies = climatology.anomalies(daily, station)
+            if anomalies is None:
+                return None, "No data found for the specified period"
+            return {'station': Climatology.station_key(station), **anomalies}, None
+
+        except FileNotFoundError:
+            logging.error(f"File not found: {file_path}")
+            return None, "The specified file was not found"
+        except ValueError as e:
+            return None, str(e)
+        except Exception as e:
+            logging.error(f"Error computing anomalies: {e}")
+            return None, f"Error processing data: {str(e)}"
+
+    @Metrics.timed('stats.save')
     def _save_results(self, filepath: str, stats: dict, start_date: str, end_date: str):
         """Save statistics results to a file"""
         content = f"""Weather Statistics
@@ -63,5 +602,20 @@ Minimum Temperature: {stats['min_temp']:.1f}°C
 Average Temperature: {stats['avg_temp']:.1f}°C
 Total Precipitation: {stats['total_precipitation']:.1f}mm
 """
+        if 'p50_temp' in stats:
+            content += "\n" + self.format_extended(stats)
         with open(filepath, 'w') as f:
-            f.write(content) 
\ No newline at end of file
+            f.write(content)
+
+    @staticmethod
+    def format_extended(stats: dict) -> str:
+        """Formats the extended statistics as text lines"""
+        return f"""Temperature Std Deviation: {stats['std_temp']:.1f}°C
+Temperature Percentiles (P10/P50/P90): {stats['p10_temp']:.1f} / {stats['p50_temp']:.1f} / {stats['p90_temp']:.1f}°C
+Warmest / Coldest 7-day Mean: {stats['max_7day_mean_temp']:.1f} / {stats['min_7day_mean_temp']:.1f}°C
+Warmest / Coldest 30-day Mean: {stats['max_30day_mean_temp']:.1f} / {stats['min_30day_mean_temp']:.1f}°C
+Heating / Cooling Degree Days (base {ExtendedAccumulator.DEGREE_DAY_BASE:g}°C): {stats['heating_degree_days']:.0f} / {stats['cooling_degree_days']:.0f}
+Dry / Wet Days: {stats['dry_days']:.0f} / {stats['wet_days']:.0f}
+Longest Dry Spell: {stats['longest_dry_spell']:.0f} days
+Air Pressure (avg/min/max): {stats['avg_pressure']:.1f} / {stats['min_pressure']:.1f} / {stats['max_pressure']:.1f} hPa
+""" 
\ No newline at end of file
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from modules.renderer import WeatherRenderer
+from modules.weather_statistics import WeatherStatistics
+from utils.api_handler import BuienradarAPI
+from utils.async_api import AsyncBuienradarAPI
+from utils.instrumentation import Metrics
+from utils.json_safe import json_safe
+from utils.validators import DateValidator
+
+# (status, content type, body)
+Response = Tuple[int, str, bytes]
+
+JSON_TYPE = 'application/json; charset=utf-8'
+TEXT_TYPE = 'text/plain; charset=utf-8'
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class WeatherService:
+    """Headless asyncio HTTP service for current weather, forecast and statistics.
+
+    Endpoints (all GET):
+        /stations                     station names and regions
+        /stations/<name>              current reading (?format=text for plain text)
+        /forecast                     forecast (?format=text for plain text)
+        /statistics?file=&start=&end= period statistics for a data file,
+                                      ``store:<station>`` or ``log:<station id>``
+                                      (&extended=1 adds percentiles, degree days etc.)
+        /anomaly?file=&start=&end=    period compared with the station's climatology
+                                      (&station= for multi-station files)
+        /metrics                      server, feed cache, HTTP and render counters and
+                                      hot-path timings (?format=prometheus for text)
+
+    Feed data comes from the shared BuienradarAPI cache, which already
+    performs at most one upstream fetch at a time. On top of that,
+    concurrent identical requests are coalesced: the first one computes
+    the response and the others await the same result. Statistics files
+    are resolved inside ``data_dir``.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, data_dir: str = "data",
+                 statistics: Optional[WeatherStatistics] = None):
+        self.host = host
+        self.port = port
+        self.data_dir = os.path.realpath(data_dir)
+        self.statistics = statistics or WeatherStatistics()
+        self.requests = 0
+        self.coalesced = 0
+        self.responses: Dict[int, int] = {}
+        self.started = time.time()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: Dict[str, Callable[..., Awaitable[Response]]] = {
+            'stations': self.stations,
+            'forecast': self.forecast,
+            'statistics': self.period_statistics,
+            'anomaly': self.anomaly,
+            'metrics': self.metrics,
+        }
+
+    async def start(self) -> "WeatherService":
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 picks a free port; report the one actually bound
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Weather service listening on http://{self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # Endpoints
+
+    async def stations(self, query: Dict, name: Optional[str] = None) -> Response:
+        snapshot = await AsyncBuienradarAPI.get_snapshot()
+        if snapshot is None:
+            raise HTTPError(503, "Weather feed unavailable")
+        if name is None:
+            return self._json([{'name': station, 'region': region}
+                               for station, region in snapshot.stations])
+
+        station = snapshot.get(name)
+        if station is None:
+            raise HTTPError(404, f"Station {name} not found")
+        fmt = self._format(query)
+        body = WeatherRenderer.render_station(station, snapshot.version, fmt)
+        return 200, JSON_TYPE if fmt == 'json' else TEXT_TYPE, body.encode('utf-8')
+
+    async def forecast(self, query: Dict) -> Response:
+        forecast = await AsyncBuienradarAPI.get_forecast()
+        if not forecast:
+            raise HTTPError(503, "Forecast unavailable")
+        fmt = self._format(query)
+        body = WeatherRenderer.render_forecast(forecast, fmt)
+        return 200, JSON_TYPE if fmt == 'json' else TEXT_TYPE, body.encode('utf-8')
+
+    async def period_statistics(self, query: Dict) -> Response:
+        source = self._param(query, 'file')
+        start_date = self._param(query, 'start')
+        end_date = self._param(query, 'end')
+        is_valid, error = DateValidator.validate_date_range(start_date, end_date)
+        if not is_valid:
+            raise HTTPError(400, error)
+        if not source.startswith((WeatherStatistics.STORE_PREFIX, WeatherStatistics.LOG_PREFIX)):
+            source = self._resolve(source)
+
+        extended = query.get('extended', ['0'])[0].lower() in ('1', 'true', 'yes')
+        stats, error = await asyncio.to_thread(
+            self.statistics.process_period, source, start_date, end_date, False, extended)
+        if stats is None:
+            raise HTTPError(404, error)
+        return self._json({'file': self._param(query, 'file'), 'start_date': start_date,
+                           'end_date': end_date, 'statistics': stats})
+
+    async def anomaly(self, query: Dict) -> Response:
+        source = self._param(query, 'file')
+        start_date = self._param(query, 'start')
+        end_date = self._param(query, 'end')
+        is_valid, error = DateValidator.validate_date_range(start_date, end_date)
+        if not is_valid:
+            raise HTTPError(400, error)
+        if not source.startswith((WeatherStatistics.STORE_PREFIX, WeatherStatistics.LOG_PREFIX)):
+            source = self._resolve(source)
+
+        station = query.get('station', [None])[0]
+        anomalies, error = await asyncio.to_thread(
+            self.statistics.anomaly_period, source, start_date, end_date, station)
+        if anomalies is None:
+            raise HTTPError(404, error)
+        return self._json({'file': self._param(query, 'file'), 'start_date': start_date,
+                           'end_date': end_date, 'anomaly': anomalies})
+
+    async def metrics(self, query: Dict) -> Response:
+        if query.get('format', ['json'])[0] == 'prometheus':
+            return 200, 'text/plain; version=0.0.4', Metrics.to_prometheus().encode('utf-8')
+        return self._json({
+            'server': {
+                'uptime': time.time() - self.started,
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._inflight),
+                'responses': {str(status): count for status, count in sorted(self.responses.items())},
+            },
+            'feed_cache': BuienradarAPI.get_cache().stats(),
+            'http': BuienradarAPI.get_http_client().metrics(),
+            'renderer': WeatherRenderer.stats(),
+            'timings': Metrics.snapshot(),
+        })
+
+    # Request handling
+
+    async def dispatch(self, method: str, target: str) -> Response:
+        """Routes one request; identical concurrent requests share one response"""
+        if method != 'GET':
+            return self._error(405, f"Method {method} not allowed")
+        parts = urlsplit(target)
+        path = [unquote(part) for part in parts.path.split('/') if part]
+        query = parse_qs(parts.query)
+        handler = self._routes.get(path[0]) if path else None
+        if handler is None or len(path) > (2 if path[0] == 'stations' else 1):
+            return self._error(404, f"Unknown endpoint: {parts.path}")
+        if path[0] == 'metrics':
+            return await self._run(handler, query)
+
+        key = (parts.path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._run(handler, query, *path[1:])
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                future.cancel()
+
+    async def _run(self, handler, query: Dict, *args) -> Response:
+        try:
+            return await handler(query, *args)
+        except HTTPError as e:
+            return self._error(e.status, str(e))
+        except Exception as e:
+            logging.error(f"Error handling request: {e}")
+            return self._error(500, "Internal server error")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, self._error(400, "Malformed request line"), False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                # Request bodies are not used by any endpoint
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._write(writer, self._error(400, "Malformed Content-Length"), False)
+                    break
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                self.requests += 1
+                with Metrics.timer('service.request'):
+                    response = await self.dispatch(method, target)
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+        status, content_type, body = response
+        self.responses[status] = self.responses.get(status, 0) + 1
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    # Helpers
+
+    def _resolve(self, file_path: str) -> str:
+        """Resolves a data file inside data_dir; rejects paths that leave it"""
+        path = os.path.realpath(os.path.join(self.data_dir, file_path))
+        if os.path.commonpath([path, self.data_dir]) != self.data_dir:
+            raise HTTPError(400, "File must be inside the data directory")
+        return path
+
+    @staticmethod
+    def _param(query: Dict, name: str) -> str:
+        values = query.get(name)
+        if not values or not values[0]:
+            raise HTTPError(400, f"Missing query parameter: {name}")
+        return values[0]
+
+    @staticmethod
+    def _format(query: Dict) -> str:
+        fmt = query.get('format', ['json'])[0]
+        if fmt not in WeatherRenderer.FORMATS:
+            raise HTTPError(400, f"Unknown format: {fmt}")
+        return fmt
+
+    @staticmethod
+    def _json(payload) -> Response:
+        # Missing values (NaN) are sent as null
+        body = json.dumps(json_safe(payload), ensure_ascii=False, allow_nan=False)
+        return 200, JSON_TYPE, body.encode('utf-8')
+
+    @staticmethod
+    def _error(status: int, message: str) -> Response:
+        return status, JSON_TYPE, json.dumps({'error': message}).encode('utf-8')
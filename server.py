@@ -0,0 +1,58 @@
+"""Runs the weather service without the GUI.
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8080] [--data-dir data]
+    python server.py --stub data/fixtures/buienradar_feed.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from modules.web_service import WeatherService
+from utils.api_handler import BuienradarAPI
+from utils.instrumentation import Metrics
+from utils.stub_server import StubFeedServer
+
+
+async def serve(args):
+    service = WeatherService(args.host, args.port, args.data_dir)
+    await service.start()
+    print(f"Serving on {service.url}", flush=True)
+    await service.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless weather service")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data-dir', default="data",
+                        help="directory that statistics requests may read files from")
+    parser.add_argument('--feed-url', help="feed URL to use instead of the Buienradar API")
+    parser.add_argument('--stub', metavar='FEED_JSON',
+                        help="serve this feed document from a local stub instead of Buienradar")
+    parser.add_argument('--cache-ttl', type=float, default=BuienradarAPI.CACHE_TTL)
+    args = parser.parse_args()
+    Metrics.enable()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    stub = None
+    base_url = args.feed_url
+    if args.stub:
+        with open(args.stub, encoding='utf-8') as f:
+            stub = StubFeedServer(json.load(f)).start()
+        base_url = stub.url
+    BuienradarAPI.configure_cache(ttl=args.cache_ttl, base_url=base_url)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
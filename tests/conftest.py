@@ -0,0 +1,130 @@
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.api_handler import BuienradarAPI
+from utils.stub_server import StubFeedServer
+
+FEED_FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'data', 'fixtures', 'buienradar_feed.json')
+
+
+class FakeClock:
+    """Monotonic clock the test moves by setting ``now``"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def synthetic_frame(start: str = '2001-01-01', end: Optional[str] = None, periods: Optional[int] = None,
+                    freq: str = 'D', seed: int = 0, missing: Optional[Dict[str, float]] = None,
+                    stations: Optional[Iterable] = None) -> pd.DataFrame:
+    """Seasonal TEMP, PRECIPITATION and AIRPRESSURE at the data's 0.1 resolution.
+
+    ``missing`` maps a column to the share of its values set to NaN. With
+    ``stations`` every station gets its own series in a STATION column and
+    the rows are interleaved by date, as in a multi-station download.
+    """
+    dates = pd.date_range(start, end, periods=periods, freq=freq)
+    frames = []
+    for k, station in enumerate(stations if stations is not None else [None]):
+        rng = np.random.default_rng(seed + k)
+        day = dates.dayofyear.to_numpy() + dates.hour.to_numpy() / 24
+        season = 10 - 7 * np.cos(2 * np.pi * (day - 15) / 365.25)
+        frame = pd.DataFrame({
+            'DATE': dates,
+            'TEMP': np.round(season + rng.normal(0, 3, len(dates)), 1),
+            'PRECIPITATION': np.round(rng.exponential(2, len(dates)), 1),
+            'AIRPRESSURE': np.round(rng.normal(1013, 8, len(dates)), 1),
+        })
+        for column, share in (missing or {}).items():
+            frame.loc[rng.choice(len(frame), int(len(frame) * share), replace=False), column] = np.nan
+        if station is not None:
+            frame['STATION'] = str(station)
+        frames.append(frame)
+    frame = pd.concat(frames, ignore_index=True)
+    if stations is not None:
+        frame = frame.sort_values(['DATE', 'STATION'], kind='mergesort', ignore_index=True)
+    return frame
+
+
+def knmi_text(frame: pd.DataFrame) -> str:
+    """The frame in the KNMI download layout (hourly when any DATE has an hour)"""
+    dates = pd.DatetimeIndex(frame['DATE'])
+    hourly = bool((dates.hour != 0).any())
+    stations = frame['STATION'] if 'STATION' in frame else pd.Series('260', index=frame.index)
+    fields = ('T', 'RH', 'P') if hourly else ('TG', 'RH', 'PG')
+
+    def tenths(column: str) -> pd.Series:
+        values = (frame[column] * 10).round()
+        return values.map(lambda v: '' if np.isnan(v) else str(int(v)))
+
+    columns = {'STN': stations.astype(str), 'YYYYMMDD': dates.strftime('%Y%m%d')}
+    if hourly:
+        columns['HH'] = (dates.hour + 1).astype(str)
+    for field, column in zip(fields, ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')):
+        columns[field] = tenths(column)
+    header = 'STN,YYYYMMDD,' + ('HH,' if hourly else '') + ','.join(fields)
+    lines = [','.join(row) for row in zip(*[values.tolist() for values in columns.values()])]
+    return '# synthetic test data\n\n# ' + header + '\n\n' + '\n'.join(lines) + '\n'
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def make_frame():
+    return synthetic_frame
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Writes a frame in the application's csv layout and returns the path"""
+    def write(frame: pd.DataFrame, name: str = 'data.csv') -> str:
+        path = os.path.join(tmp_path, name)
+        frame.to_csv(path, index=False, date_format='%Y-%m-%d')
+        return path
+    return write
+
+
+@pytest.fixture
+def write_knmi(tmp_path):
+    """Writes a frame in the KNMI download layout and returns the path"""
+    def write(frame: pd.DataFrame, name: str = 'data.txt') -> str:
+        path = os.path.join(tmp_path, name)
+        with open(path, 'w') as f:
+            f.write(knmi_text(frame))
+        return path
+    return write
+
+
+@pytest.fixture
+def feed() -> Dict:
+    """The recorded Buienradar feed document"""
+    with open(FEED_FIXTURE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def feed_server(feed):
+    """A running StubFeedServer serving the recorded feed"""
+    with StubFeedServer(feed) as server:
+        yield server
+
+
+@pytest.fixture
+def feed_api(feed_server, monkeypatch):
+    """BuienradarAPI reading the stub feed, with its shared state restored afterwards"""
+    for name in ('BASE_URL', 'CACHE_TTL', '_cache', '_snapshot', '_last_delta'):
+        monkeypatch.setattr(BuienradarAPI, name, getattr(BuienradarAPI, name))
+    monkeypatch.setattr(BuienradarAPI, '_subscribers', [])
+    BuienradarAPI.configure_cache(ttl=60, base_url=feed_server.url)
+    return BuienradarAPI
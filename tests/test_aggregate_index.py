@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.aggregate_index import AggregateIndex, RangeAggregates
+from utils.knmi_dataset import KNMIDataset
+
+
+@pytest.fixture
+def frame(make_frame):
+    return make_frame('2001-01-01', periods=800, seed=7, missing={'TEMP': 0.05})
+
+
+def test_range_aggregates_match_numpy(frame):
+    values = frame['TEMP'].to_numpy()
+    aggregates = RangeAggregates(values)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        i, j = sorted(rng.integers(0, len(values) + 1, 2))
+        window = values[i:j]
+        window = window[~np.isnan(window)]
+        if len(window) == 0:
+            assert np.isnan(aggregates.max(i, j))
+            assert np.isnan(aggregates.mean(i, j))
+            continue
+        assert aggregates.count(i, j) == len(window)
+        assert aggregates.sum(i, j) == pytest.approx(window.sum())
+        assert aggregates.min(i, j) == window.min()
+        assert aggregates.max(i, j) == window.max()
+        assert aggregates.mean(i, j) == pytest.approx(window.mean())
+        if len(window) > 1:
+            assert aggregates.std(i, j) == pytest.approx(window.std(ddof=1))
+
+
+def test_vectorised_queries_match_scalar_ones(frame):
+    aggregates = RangeAggregates(frame['TEMP'].to_numpy())
+    i = np.array([0, 5, 100, 300, 799])
+    j = np.array([1, 400, 100, 800, 800])
+    for name in ('count', 'sum', 'min', 'max', 'mean', 'std'):
+        many = getattr(aggregates, name)(i, j)
+        one = [getattr(aggregates, name)(a, b) for a, b in zip(i, j)]
+        np.testing.assert_allclose(many, one, equal_nan=True)
+
+
+def test_query_matches_frame_filter(frame):
+    index = AggregateIndex(KNMIDataset(frame))
+    period = frame[(frame['DATE'] >= '2001-03-15') & (frame['DATE'] <= '2002-02-28')]
+    stats = index.query('2001-03-15', '2002-02-28')
+    assert stats['max_temp'] == period['TEMP'].max()
+    assert stats['min_temp'] == period['TEMP'].min()
+    assert stats['avg_temp'] == pytest.approx(period['TEMP'].mean())
+    assert stats['std_temp'] == pytest.approx(period['TEMP'].std())
+    assert stats['total_precipitation'] == pytest.approx(period['PRECIPITATION'].sum())
+    assert index.query('1990-01-01', '1990-12-31') is None
+
+
+def test_index_cache_is_shared_between_threads(frame, write_csv):
+    path = write_csv(frame)
+    WeatherStatistics._index_cache.clear()
+    statistics = WeatherStatistics(use_cache=False)
+    expected = statistics.get_aggregate_index(path).query('2001-01-01', '2001-12-31')
+
+    results, errors = [], []
+
+    def query():
+        try:
+            results.append(statistics.get_aggregate_index(path).query('2001-01-01', '2001-12-31'))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert results == [expected] * 8
+    assert len(WeatherStatistics._index_cache) == 1
@@ -0,0 +1,49 @@
+import copy
+
+from utils.api_handler import FeedData
+from utils.models import StationMeasurement
+
+
+def test_cache_holds_the_parsed_feed(feed_api, feed_server):
+    data = feed_api.get_weather_data()
+    assert isinstance(data, FeedData)
+    assert data.snapshot.version == feed_api.get_cache().version
+    assert all(type(station) is StationMeasurement for station in data.snapshot.measurements)
+    assert feed_api.get_cache()._data is data
+    assert feed_api.get_weather_data() is data
+    assert feed_server.requests == 1
+
+
+def test_forecast_is_a_copy_of_the_weather_report(feed_api, feed):
+    forecast = feed_api.get_forecast()
+    report = feed['forecast']['weatherreport']
+    assert forecast == {'title': report['title'], 'published': report['published'],
+                        'text': report['text'], 'author': report['author']}
+    forecast['title'] = 'changed'
+    assert feed_api.get_forecast()['title'] == report['title']
+
+
+def test_station_lookups(feed_api):
+    assert len(feed_api.get_stations()) == 45
+    assert ('Meetstation Arcen', 'Venlo') in feed_api.get_stations()
+    assert feed_api.get_station_data('meetstation arcen').stationid == 6391
+    assert feed_api.get_station_data('Nowhere') is None
+    assert [station.stationid for station in feed_api.get_stations_in_region('Venlo')] == [6391]
+
+
+def test_malformed_feed_keeps_serving_the_last_parsed_one(feed_api, feed, feed_server, caplog):
+    data = feed_api.get_weather_data()
+    broken = copy.deepcopy(feed)
+    del broken['actual']
+    feed_server.set_feed(broken)
+
+    assert feed_api.get_weather_data(force_refresh=True) is data
+    assert feed_api.get_cache().errors == 1
+    assert 'Error parsing stations data' in caplog.text
+
+
+def test_malformed_first_feed_gives_nothing(feed_api, feed, feed_server):
+    feed_server.set_feed({'forecast': feed['forecast']})
+    assert feed_api.get_weather_data() is None
+    assert feed_api.get_stations() == []
+    assert feed_api.get_forecast() is None
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+
+import cli
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch, make_frame, write_csv):
+    """Three months of daily data with February's temperatures missing"""
+    monkeypatch.chdir(tmp_path)
+    frame = make_frame('2023-01-01', '2023-03-31')
+    frame.loc[frame['DATE'].dt.month == 2, 'TEMP'] = np.nan
+    return write_csv(frame)
+
+
+@pytest.fixture
+def stub_file(tmp_path, feed, feed_api) -> str:
+    """The recorded feed as a --stub file; feed_api restores the API state the command changes"""
+    path = tmp_path / 'feed.json'
+    path.write_text(json.dumps(feed), encoding='utf-8')
+    return str(path)
+
+
+def run(capsys, *argv):
+    code = cli.main(list(argv))
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+@pytest.mark.parametrize('source', ['store:260', 'log:6260', '*.csv'])
+def test_every_needs_a_single_data_file(capsys, data_file, source):
+    code, out, err = run(capsys, 'stats', source, '2023-01-01', '2023-03-31', '--every', 'month')
+    assert code == 2
+    assert out == ''
+    assert 'error: --every needs a single data file' in err
+
+
+def test_invalid_date_range_is_a_usage_error(capsys, data_file):
+    code, out, err = run(capsys, 'stats', data_file, '2023-03-31', '2023-01-01')
+    assert code == 2
+    assert err.startswith('error: ')
+
+
+def test_periods_as_text_table(capsys, data_file):
+    code, out, err = run(capsys, 'stats', data_file, '2023-01-01', '2023-03-31', '--every', 'month')
+    assert code == 0
+    header, *lines = out.splitlines()
+    assert header.split() == ['period', 'start_date', 'end_date', 'days', 'max_temp', 'min_temp',
+                              'avg_temp', 'total_precipitation', 'std_temp']
+    assert [line.split()[0] for line in lines] == ['2023-01', '2023-02', '2023-03']
+    assert lines[1].split()[3] == '28'
+
+
+def test_periods_as_json_lines_with_null_for_missing(capsys, data_file):
+    code, out, err = run(capsys, 'stats', data_file, '2023-01-01', '2023-03-31', '--every', 'month',
+                         '--format', 'json')
+    assert code == 0
+    assert 'NaN' not in out
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert [row['period'] for row in rows] == ['2023-01', '2023-02', '2023-03']
+    assert rows[1]['avg_temp'] is None and rows[1]['days'] == 28
+    assert rows[1]['total_precipitation'] is not None
+    assert isinstance(rows[0]['avg_temp'], float)
+
+
+def test_periods_as_csv_with_empty_fields_for_missing(capsys, data_file):
+    code, out, err = run(capsys, 'stats', data_file, '2023-01-01', '2023-03-31', '--every', 'month',
+                         '--format', 'csv')
+    assert code == 0
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert rows[1]['avg_temp'] == '' and rows[1]['period'] == '2023-02'
+    assert float(rows[0]['avg_temp'])
+
+
+def test_single_period_as_text(capsys, data_file):
+    code, out, err = run(capsys, 'stats', data_file, '2023-01-01', '2023-03-31', '--format', 'text')
+    assert code == 0
+    fields = dict(line.split(': ', 1) for line in out.splitlines())
+    assert fields['source'] == data_file
+    assert fields['start_date'] == '2023-01-01'
+    assert float(fields['min_temp']) < float(fields['avg_temp']) < float(fields['max_temp'])
+    assert len(fields['max_temp'].split('.')[1]) == 2
+
+
+def test_missing_file_fails(capsys, data_file):
+    code, out, err = run(capsys, 'stats', 'missing.csv', '2023-01-01', '2023-03-31')
+    assert code == 1
+    assert err.startswith('error: ')
+
+
+def test_stations_dump_is_one_json_document(capsys, stub_file, tmp_path):
+    output = tmp_path / 'stations.json'
+    code, out, err = run(capsys, 'stations', '--stub', stub_file, '--output', str(output))
+    assert code == 0
+    document = json.loads(output.read_text(encoding='utf-8'))
+    assert document['version'] > 0
+    assert len(document['stations']) == 45
+    assert document['stations'][0]['stationid'] == 6391
+
+
+def test_stations_in_region_as_csv(capsys, stub_file):
+    code, out, err = run(capsys, 'stations', '--stub', stub_file, '--format', 'csv', '--region', 'Venlo')
+    assert code == 0
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert [row['stationname'] for row in rows] == ['Meetstation Arcen']
@@ -0,0 +1,140 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.climatology import Climatology, daily_values, day_slots
+
+
+@pytest.fixture
+def history(make_frame):
+    return make_frame('1991-01-01', '2020-12-31', seed=3)
+
+
+def test_day_slots_give_feb_29_its_own_slot():
+    slots = day_slots(pd.to_datetime(['2023-02-28', '2023-03-01', '2024-02-29', '2024-03-01', '2024-12-31']))
+    assert slots.tolist() == [58, 60, 59, 60, 365]
+
+
+def test_normals_match_pandas(tmp_path, history):
+    frame = history
+    climatology = Climatology(str(tmp_path), window=1)
+    assert climatology.update(frame, station=260) == len(frame)
+
+    normals = climatology.normals(260)
+    july_first = frame[(frame['DATE'].dt.month == 7) & (frame['DATE'].dt.day == 1)]
+    row = normals.iloc[day_slots(pd.to_datetime(['2023-07-01']))[0]]
+    assert row['TEMP_count'] == len(july_first)
+    assert row['TEMP_mean'] == pytest.approx(july_first['TEMP'].mean())
+    assert row['TEMP_std'] == pytest.approx(july_first['TEMP'].std())
+    assert row['TEMP_min'] == july_first['TEMP'].min()
+    assert row['PRECIPITATION_max'] == july_first['PRECIPITATION'].max()
+    for p in Climatology.PERCENTILES:
+        expected = july_first['TEMP'].quantile(p / 100, interpolation='higher')
+        assert row[f'TEMP_p{p}'] == pytest.approx(expected)
+
+
+def test_updates_in_any_order_equal_one_build(tmp_path, history):
+    frame = history
+    full = Climatology(str(tmp_path / 'full'))
+    full.update(frame, station=260)
+
+    parts = Climatology(str(tmp_path / 'parts'))
+    recent = frame['DATE'] >= '2006-01-01'
+    middle = frame['DATE'].between('1996-01-01', '2005-12-31')
+    parts.update(frame[recent], station=260)
+    # Older history back-filled later, then everything passed once more
+    parts.update(frame[middle], station=260)
+    assert parts.update(frame, station=260) == int((frame['DATE'] < '1996-01-01').sum())
+    assert parts.update(frame, station=260) == 0
+
+    assert parts.coverage(260)['ranges'] == [['1991-01-01', '2020-12-31']]
+    assert parts.coverage(260)['days'] == len(frame)
+    pd.testing.assert_frame_equal(parts.normals(260), full.normals(260), rtol=1e-9)
+
+
+def test_gaps_are_recorded_and_filled(tmp_path, make_frame):
+    frame = make_frame('2000-01-01', '2000-12-31')
+    climatology = Climatology(str(tmp_path))
+    gap = frame['DATE'].between('2000-03-01', '2000-03-31')
+    climatology.update(frame[~gap], station=260)
+    assert climatology.coverage(260)['ranges'] == [['2000-01-01', '2000-02-29'], ['2000-04-01', '2000-12-31']]
+    assert climatology.update(frame, station=260) == 31
+    assert climatology.coverage(260)['ranges'] == [['2000-01-01', '2000-12-31']]
+
+
+def test_tables_persist_and_old_meta_is_read(tmp_path, make_frame):
+    frame = make_frame('2000-01-01', '2009-12-31')
+    climatology = Climatology(str(tmp_path))
+    climatology.update(frame, station='6260')
+    reloaded = Climatology(str(tmp_path))
+    assert reloaded.stations == ['260']
+    pd.testing.assert_frame_equal(reloaded.normals(260), climatology.normals(260))
+
+    # Coverage written before date ranges were recorded
+    meta_path = os.path.join(tmp_path, Climatology.META)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    del meta['stations']['260']['ranges']
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    old = Climatology(str(tmp_path))
+    assert old.coverage(260)['ranges'] == [['2000-01-01', '2009-12-31']]
+    assert old.update(frame, station=260) == 0
+
+
+def test_anomalies_of_a_warm_period(tmp_path, history, make_frame):
+    frame = history
+    climatology = Climatology(str(tmp_path))
+    climatology.update(frame, station=260)
+
+    period = make_frame('2023-07-01', '2023-07-31', seed=11)
+    period['TEMP'] += 5
+    anomalies = climatology.anomalies(period, station=260)
+    assert anomalies['days'] == 31
+    assert anomalies['temp_anomaly'] == pytest.approx(5, abs=1.5)
+    assert anomalies['warm_days'] > anomalies['cold_days']
+    assert climatology.anomalies(period, station=999) is None
+
+
+def test_days_split_over_chunks_are_added_once(tmp_path, make_frame, write_knmi):
+    hourly = make_frame('2019-12-25', periods=24 * 20, freq='h', stations=('260', '240'))
+    path = write_knmi(hourly)
+    whole = Climatology(str(tmp_path / 'whole'), window=1)
+    whole.update_from_file(path, chunksize=10 ** 6)
+    chunked = Climatology(str(tmp_path / 'chunked'), window=1)
+    # Fewer rows per chunk than one day has
+    assert chunked.update_from_file(path, chunksize=17) == 2 * 20
+
+    for station in ('260', '240'):
+        assert chunked.coverage(station)['days'] == 20
+        pd.testing.assert_frame_equal(chunked.normals(station), whole.normals(station), rtol=1e-9)
+    december = hourly[(hourly['STATION'] == '260') & (hourly['DATE'].dt.date == pd.Timestamp('2019-12-25').date())]
+    normals = chunked.normals(260).iloc[day_slots(pd.to_datetime(['2019-12-25']))[0]]
+    assert normals['TEMP_count'] == 1
+    assert normals['TEMP_mean'] == pytest.approx(december['TEMP'].mean())
+    assert normals['PRECIPITATION_mean'] == pytest.approx(december['PRECIPITATION'].sum())
+
+
+def test_duplicate_dates_in_a_later_chunk_are_skipped(tmp_path, make_frame, write_knmi):
+    frame = make_frame('2001-01-01', periods=60)
+    repeated = frame.iloc[[10]].assign(TEMP=99.0)
+    path = write_knmi(pd.concat([frame.iloc[:15], repeated, frame.iloc[15:]]))
+    climatology = Climatology(str(tmp_path), window=1)
+    assert climatology.update_from_file(path, chunksize=5) == 60
+    assert climatology.coverage(260)['days'] == 60
+    row = climatology.normals(260).iloc[day_slots(frame['DATE'].iloc[[10]])[0]]
+    assert row['TEMP_count'] == 1
+    assert row['TEMP_mean'] == frame['TEMP'].iloc[10]
+
+
+def test_days_without_precipitation_readings_stay_missing(make_frame):
+    frame = make_frame('2020-01-01', periods=48, freq='h')
+    frame.loc[frame['DATE'].dt.day == 2, 'PRECIPITATION'] = np.nan
+    daily = daily_values(frame, Climatology.VARIABLES)
+    assert daily.columns.tolist() == ['DATE', *Climatology.VARIABLES]
+    assert daily['PRECIPITATION'].iloc[0] == pytest.approx(frame['PRECIPITATION'].iloc[:24].sum())
+    assert np.isnan(daily['PRECIPITATION'].iloc[1])
+    assert not daily['TEMP'].isna().any()
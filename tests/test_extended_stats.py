@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.extended_stats import ExtendedAccumulator, QuantileSketch, extended_statistics
+
+
+@pytest.fixture
+def frame(make_frame):
+    return make_frame('2010-01-01', periods=400, seed=5, missing={'TEMP': 0.05})
+
+
+def test_sketch_matches_exact_percentiles_at_its_resolution(frame):
+    values = frame['TEMP'].to_numpy()
+    sketch = QuantileSketch()
+    sketch.update(values)
+    qs = np.array([0.0, 0.1, 0.25, 0.5, 0.9, 1.0])
+    expected = np.percentile(values[~np.isnan(values)], qs * 100, method='higher')
+    np.testing.assert_array_equal(sketch.quantiles(qs), expected)
+    assert np.isnan(QuantileSketch().quantiles([0.5])).all()
+
+
+def test_result_matches_pandas(frame):
+    stats = extended_statistics(frame, '2010-03-01', '2010-08-31')
+    period = frame[frame['DATE'].between('2010-03-01', '2010-08-31')]
+    temp = period['TEMP']
+
+    assert stats['days'] == len(period)
+    assert stats['max_temp'] == temp.max()
+    assert stats['avg_temp'] == pytest.approx(temp.mean())
+    assert stats['std_temp'] == pytest.approx(temp.std())
+    assert stats['total_precipitation'] == pytest.approx(period['PRECIPITATION'].sum())
+    assert stats['p50_temp'] == temp.quantile(0.5, interpolation='higher')
+    base = ExtendedAccumulator.DEGREE_DAY_BASE
+    assert stats['heating_degree_days'] == pytest.approx((base - temp).clip(lower=0).sum())
+    assert stats['cooling_degree_days'] == pytest.approx((temp - base).clip(lower=0).sum())
+    wet = period['PRECIPITATION'] >= ExtendedAccumulator.WET_DAY_THRESHOLD
+    assert stats['wet_days'] == wet.sum()
+    assert stats['dry_days'] == (~wet).sum()
+    rolling = temp.rolling(7, min_periods=6).mean()
+    assert stats['max_7day_mean_temp'] == pytest.approx(rolling.max())
+    assert stats['min_7day_mean_temp'] == pytest.approx(rolling.min())
+    assert stats['avg_pressure'] == pytest.approx(period['AIRPRESSURE'].mean())
+
+
+def test_merged_chunks_equal_one_pass(frame):
+    whole = ExtendedAccumulator('2010-01-01', '2010-12-31')
+    whole.update(frame)
+    merged = ExtendedAccumulator('2010-01-01', '2010-12-31')
+    for chunk in np.array_split(np.arange(len(frame)), 7):
+        part = ExtendedAccumulator('2010-01-01', '2010-12-31')
+        part.update(frame.iloc[chunk])
+        merged.merge(part)
+    expected, result = whole.result(), merged.result()
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value, nan_ok=True), key
+
+    with pytest.raises(ValueError):
+        merged.merge(ExtendedAccumulator('2011-01-01', '2011-12-31'))
+
+
+def test_hourly_rows_are_folded_into_days():
+    dates = pd.date_range('2020-06-01', periods=48, freq='h')
+    frame = pd.DataFrame({'DATE': dates, 'TEMP': np.r_[np.full(24, 10.0), np.full(24, 20.0)],
+                          'PRECIPITATION': np.full(48, 0.1)})
+    stats = extended_statistics(frame, '2020-06-01', '2020-06-02')
+    assert stats['days'] == 2
+    assert stats['dry_days'] == 0
+    assert stats['wet_days'] == 2
+    assert stats['heating_degree_days'] == pytest.approx(8.0)
+    assert stats['cooling_degree_days'] == pytest.approx(2.0)
+
+
+def test_longest_run_and_empty_period(frame):
+    assert ExtendedAccumulator.longest_run(np.array([1, 1, 0, 1, 1, 1, 0], dtype=bool)) == 3
+    assert ExtendedAccumulator.longest_run(np.zeros(5, dtype=bool)) == 0
+    assert extended_statistics(frame, '1990-01-01', '1990-12-31') is None
@@ -0,0 +1,116 @@
+import threading
+
+import requests
+
+from utils.feed_cache import FeedCache, FeedResponse
+
+
+def http_fetcher(url: str, etag: bool = True):
+    """Fetches the feed like BuienradarAPI._fetch_feed; without ``etag`` the ETag header is ignored"""
+    def fetch(headers):
+        try:
+            response = requests.get(url, headers=headers, timeout=5)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return FeedResponse(response.status_code)
+        return FeedResponse(200, response.json(), response.headers.get('ETag') if etag else None,
+                            response.headers.get('Last-Modified'))
+    return fetch
+
+
+def run_concurrently(count: int, target) -> list:
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def call(k):
+        barrier.wait()
+        results[k] = target()
+
+    threads = [threading.Thread(target=call, args=(k,)) for k in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_fresh_snapshot_is_served_without_a_request(feed_server, clock):
+    cache = FeedCache(http_fetcher(feed_server.url), ttl=60, clock=clock)
+    first = cache.get()
+    clock.now = 59
+    assert cache.get() is first
+    assert feed_server.requests == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert first['actual']['stationmeasurements'][0]['stationid'] == 6391
+
+
+def test_stale_snapshot_is_revalidated(feed_server, feed, clock):
+    cache = FeedCache(http_fetcher(feed_server.url), ttl=60, clock=clock)
+    first = cache.get()
+    version = cache.version
+    clock.now = 60
+    # 304: the same snapshot with a renewed age
+    assert cache.get() is first
+    assert (cache.revalidations, cache.version, cache.age()) == (1, version, 0)
+
+    feed_server.set_feed({**feed, 'buienradar': {'changed': True}})
+    clock.now = 120
+    changed = cache.get()
+    assert changed['buienradar'] == {'changed': True}
+    assert cache.version > version
+    assert (feed_server.requests, feed_server.not_modified) == (3, 1)
+
+
+def test_last_modified_alone_revalidates(feed_server, clock):
+    cache = FeedCache(http_fetcher(feed_server.url, etag=False), ttl=60, clock=clock)
+    first = cache.get()
+    clock.now = 60
+    assert cache.get() is first
+    assert (cache.revalidations, feed_server.not_modified) == (1, 1)
+
+
+def test_concurrent_callers_share_one_fetch(feed_server):
+    feed_server.delay = 0.2
+    parsed = []
+
+    def parse(data, version):
+        parsed.append(version)
+        return object()
+
+    cache = FeedCache(http_fetcher(feed_server.url), parse=parse)
+    results = run_concurrently(8, cache.get)
+    assert feed_server.requests == 1
+    assert len(parsed) == 1
+    assert cache.coalesced == 7
+    assert all(result is results[0] for result in results)
+
+
+def test_followers_get_their_leaders_result(feed_server, clock):
+    cache = FeedCache(http_fetcher(feed_server.url), ttl=60, clock=clock)
+    good = cache.get()
+
+    # A failed refresh without serve_stale answers None to everyone who waited for it
+    feed_server.delay = 0.2
+    feed_server.fail_next = 1
+    clock.now = 60
+    assert run_concurrently(5, cache.get) == [None] * 5
+    assert feed_server.requests == 2
+    assert cache.errors == 1
+
+    # The next refresh starts afresh and serves everyone its own result
+    assert run_concurrently(5, cache.get) == [good] * 5
+    assert feed_server.requests == 3
+
+
+def test_stale_snapshot_is_served_when_upstream_fails(feed_server, clock):
+    cache = FeedCache(http_fetcher(feed_server.url), ttl=60, clock=clock, serve_stale=True)
+    snapshot = cache.get()
+    clock.now = 60
+    feed_server.fail_next = 1
+    assert cache.get() is snapshot
+    assert (cache.errors, cache.stale_served) == (1, 1)
+
+    unreachable = FeedCache(http_fetcher('http://127.0.0.1:9/feed'), serve_stale=True)
+    assert unreachable.get() is None
+    assert unreachable.errors == 1
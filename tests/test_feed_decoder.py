@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from utils.feed_decoder import FeedDecoder
+from utils.models import StationMeasurement
+
+BACKENDS = FeedDecoder.available_backends()
+
+
+@pytest.fixture
+def raw(feed) -> bytes:
+    return json.dumps(feed).encode('utf-8')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_loads_matches_the_standard_library(backend, feed, raw):
+    decoder = FeedDecoder(backend)
+    assert decoder.loads(raw) == feed
+    assert decoder.loads(raw.decode('utf-8')) == feed
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_malformed_document_raises_value_error(backend):
+    with pytest.raises(ValueError):
+        FeedDecoder(backend).loads(b'{"actual": [')
+
+
+def test_unavailable_backend_is_rejected():
+    with pytest.raises(ValueError, match='not available'):
+        FeedDecoder('no-such-backend')
+
+
+def test_default_backend_is_the_fastest_available():
+    assert FeedDecoder().backend == BACKENDS[0]
+    assert BACKENDS[-1] == 'json'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decode_sections_returns_only_the_requested_sections(backend, feed, raw):
+    decoder = FeedDecoder(backend)
+    sections = decoder.decode_sections(raw, ['forecast'])
+    assert sections == {'forecast': feed['forecast']}
+    # Sections absent from the document are left out
+    assert decoder.decode_sections(raw, ('actual', 'missing')) == {'actual': feed['actual']}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decode_stations_matches_parsing_the_dicts(backend, feed, raw):
+    stations = FeedDecoder(backend).decode_stations(raw)
+    expected = [StationMeasurement.from_dict(station) for station in feed['actual']['stationmeasurements']]
+    assert stations == expected
+    assert all(type(station) is StationMeasurement for station in stations)
+    assert stations[0].stationid == 6391
+    assert stations[0].measured_at is not None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decode_stations_coerces_feed_values(backend):
+    raw = json.dumps({'actual': {'stationmeasurements': [
+        {'stationid': 6260, 'temperature': '7.5', 'feeltemperature': 'n/a', 'humidity': None, 'windspeedBft': 3.0, 'extra': [1, 2]},
+    ]}})
+    [station] = FeedDecoder(backend).decode_stations(raw)
+    assert station.stationid == 6260
+    assert station.temperature == 7.5
+    assert station.feeltemperature is None
+    assert station.humidity is None
+    assert station.windspeedBft == 3 and type(station.windspeedBft) is int
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decode_stations_without_actual_section_is_empty(backend):
+    assert FeedDecoder(backend).decode_stations(b'{"forecast": {}}') == []
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_decode_stations_of_malformed_document_raises_value_error(backend):
+    with pytest.raises(ValueError):
+        FeedDecoder(backend).decode_stations(b'{"actual": {"stationmeasurements": [')
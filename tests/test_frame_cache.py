@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.frame_cache import ParsedFrameCache
+
+
+def counting_parser(frame: pd.DataFrame):
+    calls = []
+
+    def parse(path):
+        calls.append(path)
+        return frame.copy()
+    return parse, calls
+
+
+def test_text_columns_round_trip_without_parquet(tmp_path, make_frame, write_csv):
+    frame = make_frame('2001-01-01', periods=6, stations=('260', '240'))
+    frame['STATION'] = frame['STATION'].astype(object)
+    frame.loc[3, 'STATION'] = None
+    frame['NOTE'] = pd.Series(['a', None, 'ccc', '', 'é', 'b'] * 2, dtype='str')
+    path = write_csv(frame)
+    parse, calls = counting_parser(frame)
+
+    cache = ParsedFrameCache(str(tmp_path / 'cache'), use_parquet=False)
+    cache.load(path, parse)
+    cached = ParsedFrameCache(str(tmp_path / 'cache'), use_parquet=False).load(path, parse)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(cached, frame)
+    assert cached.loc[3, 'STATION'] is None
+
+
+def test_other_object_columns_are_not_cached(tmp_path, make_frame, write_csv):
+    frame = make_frame('2001-01-01', periods=3)
+    frame['EXTRA'] = pd.Series([1, 'two', 3.0], dtype=object)
+    path = write_csv(frame)
+    parse, calls = counting_parser(frame)
+    cache = ParsedFrameCache(str(tmp_path / 'cache'), use_parquet=False)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(cache.load(path, parse), frame)
+    assert len(calls) == 2
+    assert not [name for name in os.listdir(tmp_path / 'cache') if name.endswith('.npcols')]
+
+
+def test_entries_follow_the_file_content(tmp_path, make_frame, write_csv):
+    frame = make_frame('2001-01-01', periods=30)
+    path = write_csv(frame)
+    parse, calls = counting_parser(frame)
+    cache = ParsedFrameCache(str(tmp_path / 'cache'), use_parquet=False)
+    cache.load(path, parse)
+    # A new mtime with the same content is recognised by its hash
+    os.utime(path, ns=(0, 10 ** 18))
+    cache.load(path, parse)
+    assert (cache.misses, cache.hits) == (1, 1)
+    # Parsers of the same file are told apart by their variant
+    cache.load(path, parse, variant='other')
+    assert cache.misses == 2
+
+    frame.loc[0, 'TEMP'] = 99.0
+    write_csv(frame)
+    assert cache.load(path, parse)['TEMP'].iloc[0] == 99.0
+    assert cache.misses == 3
+    assert np.array_equal(cache.load(path, parse)['TEMP'].to_numpy(), frame['TEMP'].to_numpy())
@@ -0,0 +1,114 @@
+import pytest
+import requests
+
+from utils.http_session import CircuitBreaker, CircuitOpenError, HTTPClient
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.content = b'{}'
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class FakeSession:
+    """Answers each get() with the next outcome: a status code or an exception"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+    def close(self):
+        pass
+
+
+def make_client(outcomes, clock, **options):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    client = HTTPClient(max_retries=options.pop('max_retries', 0), backoff_base=0, breaker=breaker, **options)
+    client.session = FakeSession(outcomes)
+    return client
+
+
+def test_breaker_opens_after_threshold_and_recovers(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    # Only one trial call at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 15
+    assert not breaker.allow()
+
+
+def test_client_errors_do_not_open_breaker(clock):
+    client = make_client([404, 404, 404], clock)
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            client.get('http://feed')
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.session.calls == 3
+
+
+def test_server_errors_open_breaker(clock):
+    client = make_client([503, 503, 200], clock)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get('http://feed')
+    with pytest.raises(CircuitOpenError):
+        client.get('http://feed')
+    assert client.session.calls == 2
+
+
+def test_retries_transient_errors(clock):
+    client = make_client([requests.ConnectionError('reset'), 500, 200], clock, max_retries=2)
+    assert client.get('http://feed').status_code == 200
+    assert client.total_retries == 2
+    assert client.metrics()['last']['attempts'] == 3
+
+
+def test_unexpected_error_ends_trial(clock):
+    client = make_client([503, 503, requests.TooManyRedirects('loop'), RuntimeError('bug'), 200], clock)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get('http://feed')
+    clock.now = 10
+    # Not retried, and counts as a failed trial
+    with pytest.raises(requests.TooManyRedirects):
+        client.get('http://feed')
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    with pytest.raises(RuntimeError):
+        client.get('http://feed')
+    # The trial flag was released, so the next call may try again
+    assert client.get('http://feed').status_code == 200
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,107 @@
+import pytest
+
+from utils.aggregate_index import AggregateIndex
+from utils.data_processor import KNMIDataProcessor
+from utils.instrumentation import Histogram, Metrics
+from utils.knmi_dataset import KNMIDataset
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Enabled metrics with empty, test-local registries"""
+    monkeypatch.setattr(Metrics, 'enabled', True)
+    for name in ('captures', '_histograms', '_counters', '_capture_ops'):
+        monkeypatch.setattr(Metrics, name, {})
+    return Metrics
+
+
+def test_disabled_metrics_record_nothing(metrics):
+    metrics.disable()
+    first, second = metrics.timer('a'), metrics.timer('b')
+    assert first is second
+    with first:
+        pass
+    metrics.count('events')
+    metrics.timed('c')(lambda: None)()
+    assert metrics.snapshot() == {'timers': {}, 'counters': {}}
+
+
+def test_timers_and_counters(metrics):
+    with metrics.timer('block'):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.timer('block'):
+            raise RuntimeError('still timed')
+
+    @metrics.timed('call')
+    def double(x):
+        return 2 * x
+
+    assert double(4) == 8
+    assert double.__name__ == 'double'
+    metrics.count('events')
+    metrics.count('events', 3)
+
+    snapshot = metrics.snapshot()
+    assert list(snapshot['timers']) == ['block', 'call']
+    assert snapshot['timers']['block']['count'] == 2
+    assert snapshot['timers']['call']['count'] == 1
+    assert snapshot['counters'] == {'events': 4}
+
+
+def test_histogram_buckets():
+    histogram = Histogram()
+    for seconds in (0.0001, 0.003, 0.003, 30.0):
+        histogram.observe(seconds)
+    summary = histogram.as_dict()
+    assert (summary['count'], summary['min'], summary['max']) == (4, 0.0001, 30.0)
+    assert summary['sum'] == pytest.approx(30.0061)
+    assert summary['buckets']['0.0001'] == 1
+    assert summary['buckets']['0.005'] == 2
+    assert summary['buckets']['+Inf'] == 1
+    assert sum(summary['buckets'].values()) == 4
+    assert Histogram().as_dict()['avg'] is None
+
+
+def test_prometheus_export_is_cumulative(metrics):
+    metrics.observe('feed.fetch', 0.003)
+    metrics.observe('feed.fetch', 0.2)
+    metrics.count('feed.errors', 2)
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[0] == '# TYPE weather_app_duration_seconds histogram'
+    assert 'weather_app_duration_seconds_bucket{operation="feed.fetch",le="0.001"} 0' in lines
+    assert 'weather_app_duration_seconds_bucket{operation="feed.fetch",le="0.005"} 1' in lines
+    assert 'weather_app_duration_seconds_bucket{operation="feed.fetch",le="+Inf"} 2' in lines
+    assert 'weather_app_duration_seconds_count{operation="feed.fetch"} 2' in lines
+    assert '# TYPE weather_app_events_total counter' in lines
+    assert lines[-1] == 'weather_app_events_total{event="feed.errors"} 2'
+
+
+@pytest.mark.parametrize('mode', Metrics.CAPTURE_MODES)
+def test_capture_records_a_report(metrics, mode):
+    metrics.capture(['work'], mode)
+    with metrics.timer('work'):
+        [str(k) for k in range(1000)]
+    with metrics.timer('other'):
+        pass
+    assert list(metrics.captures) == ['work']
+    assert metrics.captures['work']
+    metrics.stop_capture()
+
+
+def test_unknown_capture_mode_is_rejected(metrics):
+    with pytest.raises(ValueError, match='Unknown capture mode'):
+        metrics.capture(['work'], 'perf')
+
+
+def test_statistics_timers_have_distinct_names(metrics, make_frame):
+    frame = make_frame('2001-01-01', '2002-12-31')
+    KNMIDataProcessor.calculate_statistics(frame, '2001-03-01', '2001-05-31')
+    timers = metrics.snapshot()['timers']
+    assert timers['stats.calculate']['count'] == 1
+    assert 'stats.index_query' not in timers
+
+    AggregateIndex(KNMIDataset(frame)).query('2001-03-01', '2001-05-31')
+    timers = metrics.snapshot()['timers']
+    assert timers['stats.calculate']['count'] == 1
+    assert timers['stats.index_query']['count'] == 1
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.knmi_dataset import KNMIDataset
+
+
+def test_dates_repeat_across_stations_but_not_within_one(make_frame):
+    frame = make_frame('2001-01-01', periods=5, stations=('260', '240'))
+    repeated = frame.iloc[[2]].assign(TEMP=99.0)
+    dataset = KNMIDataset(pd.concat([frame, repeated], ignore_index=True))
+    assert len(dataset) == 10
+    assert dataset.frame.groupby('STATION').size().tolist() == [5, 5]
+    assert 99.0 not in dataset.frame['TEMP'].tolist()
+
+
+@pytest.mark.parametrize('policy, expected', [('first', 1.0), ('last', 3.0), ('mean', 2.0)])
+def test_duplicate_policies(policy, expected):
+    frame = pd.DataFrame({'DATE': pd.to_datetime(['2001-01-02', '2001-01-01', '2001-01-02']),
+                          'TEMP': [1.0, 5.0, 3.0]})
+    dataset = KNMIDataset(frame, duplicates=policy)
+    assert dataset.frame['DATE'].dt.day.tolist() == [1, 2]
+    assert dataset.frame['TEMP'].tolist() == [5.0, expected]
+
+
+def test_unknown_policy_and_invalid_dates():
+    with pytest.raises(ValueError):
+        KNMIDataset(pd.DataFrame({'DATE': [], 'TEMP': []}), duplicates='max')
+    frame = pd.DataFrame({'DATE': pd.to_datetime(['2001-01-01', None, '2001-01-03']), 'TEMP': [1.0, 2.0, 3.0]})
+    assert KNMIDataset(frame).frame['TEMP'].tolist() == [1.0, 3.0]
+
+
+def test_bounds_cover_whole_end_day(make_frame):
+    dataset = KNMIDataset(make_frame('2001-01-01', periods=72, freq='h'))
+    assert dataset.bounds('2001-01-02', '2001-01-02') == (24, 48)
+    assert dataset.bounds('2001-01-02 12:00', '2001-01-03') == (36, 72)
+    assert dataset.bounds('2002-01-01', '2002-12-31') == (72, 72)
+    i, j = dataset.bounds_many(['2001-01-01', '2001-01-03'], ['2001-01-01', '2001-01-02'])
+    assert i.tolist() == [0, 48] and j.tolist() == [24, 48]
+    assert len(dataset.slice('2001-01-01', '2001-01-02')) == 48
+
+
+def test_multi_station_file_keeps_every_station(make_frame, write_knmi):
+    frame = make_frame('2001-01-01', periods=20, stations=('260', '240', '344'))
+    path = write_knmi(frame)
+    stats, _ = WeatherStatistics(use_cache=False).process_period(path, '2001-01-01', '2001-01-20', save=False)
+    assert stats['avg_temp'] == pytest.approx(frame['TEMP'].mean())
+    assert stats['total_precipitation'] == pytest.approx(frame['PRECIPITATION'].sum())
+    assert np.isclose(stats['std_temp'], frame['TEMP'].std())
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.frame_cache import ParsedFrameCache
+from utils.knmi_reader import KNMIReader
+
+DAILY = """BRON / SOURCE: KONINKLIJK NEDERLANDS METEOROLOGISCH INSTITUUT (KNMI)
+
+STN,YYYYMMDD,   TG,   RH,   PG
+
+  260,20230102,  121,   -1,10132
+  260,20230103,   76,  157,
+  260,20230104,     ,    0, 9987
+"""
+
+
+@pytest.fixture
+def daily_file(tmp_path):
+    path = tmp_path / 'etmgeg_260.txt'
+    path.write_text(DAILY)
+    return str(path)
+
+
+def test_knmi_values_are_exact_float64(daily_file):
+    frame = KNMIReader.read(daily_file)
+    assert frame.columns.tolist() == ['DATE', 'TEMP', 'PRECIPITATION', 'AIRPRESSURE']
+    assert all(frame[column].dtype == np.float64 for column in KNMIReader.VALUE_COLUMNS)
+    assert frame['TEMP'].iloc[0] == 12.1
+    assert np.isnan(frame['TEMP'].iloc[2])
+    # -1 means less than 0.05 mm
+    assert frame['PRECIPITATION'].tolist() == [0.0, 15.7, 0.0]
+    assert frame['AIRPRESSURE'].iloc[0] == 1013.2
+    assert frame['DATE'].dt.strftime('%Y-%m-%d').tolist() == ['2023-01-02', '2023-01-03', '2023-01-04']
+
+
+def test_columns_are_pruned_and_chunks_match(daily_file):
+    frame = KNMIReader.read(daily_file, columns=['TEMP'], include_station=True)
+    assert frame.columns.tolist() == ['DATE', 'TEMP', 'STATION']
+    assert frame['STATION'].tolist() == ['260'] * 3
+    chunks = list(KNMIReader.iter_chunks(daily_file, columns=['TEMP'], chunksize=2, include_station=True))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), frame)
+    assert KNMIReader.has_station(daily_file)
+
+
+def test_hourly_and_csv_layouts(make_frame, write_knmi, write_csv):
+    hourly = make_frame('2020-01-01', periods=30, freq='h')
+    frame = KNMIReader.read(write_knmi(hourly))
+    pd.testing.assert_series_equal(frame['DATE'], hourly['DATE'], check_dtype=False)
+    np.testing.assert_array_equal(frame['TEMP'].to_numpy(), hourly['TEMP'].to_numpy())
+
+    daily = make_frame('2020-01-01', periods=10)
+    path = write_csv(daily)
+    assert not KNMIReader.has_station(path)
+    frame = KNMIReader.read(path)
+    assert frame['TEMP'].dtype == np.float64
+    np.testing.assert_array_equal(frame['AIRPRESSURE'].to_numpy(), daily['AIRPRESSURE'].to_numpy())
+
+
+def test_cached_frames_are_keyed_on_the_parse_version(tmp_path, daily_file, monkeypatch):
+    cache = ParsedFrameCache(str(tmp_path / 'cache'), use_parquet=False)
+    monkeypatch.setattr(WeatherStatistics, '_frame_cache', cache)
+    statistics = WeatherStatistics(use_cache=True)
+    statistics.load_data(daily_file)
+    statistics.load_data(daily_file)
+    assert (cache.misses, cache.hits) == (1, 1)
+    monkeypatch.setattr(WeatherStatistics, 'PARSE_VERSION', WeatherStatistics.PARSE_VERSION + 1)
+    assert statistics.load_data(daily_file)['TEMP'].iloc[0] == 12.1
+    assert cache.misses == 2
@@ -0,0 +1,57 @@
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.models import StationMeasurement
+
+
+def test_feed_values_are_validated():
+    station = StationMeasurement.from_dict({
+        'stationid': '6260', 'stationname': 'Meetstation De Bilt', 'temperature': '7.5',
+        'humidity': 'n/a', 'windspeed': math.inf, 'windspeedBft': 3.0, 'sunpower': True,
+        'visibility': 26965, 'iconurl': 'https://example.invalid/icon.png',
+    })
+    assert station.stationid == 6260
+    assert station.temperature == 7.5
+    assert station.humidity is None
+    assert station.windspeed is None
+    assert station.windspeedBft == 3 and type(station.windspeedBft) is int
+    assert station.sunpower is None
+    assert station.visibility == 26965.0 and type(station.visibility) is float
+    assert station.airpressure is None
+
+
+def test_timestamp_is_parsed_once():
+    assert StationMeasurement(timestamp='2024-11-05T14:50:00').measured_at == datetime(2024, 11, 5, 14, 50)
+    assert StationMeasurement(timestamp='2024-11-05T14:50:00Z').measured_at == datetime(
+        2024, 11, 5, 14, 50, tzinfo=timezone.utc)
+    assert StationMeasurement(timestamp='yesterday').measured_at is None
+    assert StationMeasurement().measured_at is None
+
+
+def test_measurements_are_slotted():
+    station = StationMeasurement(stationid=6391)
+    assert not hasattr(station, '__dict__')
+    with pytest.raises(AttributeError):
+        station.iconurl = 'https://example.invalid/icon.png'
+
+
+def test_constructors_agree(feed):
+    raw = feed['actual']['stationmeasurements'][0]
+    station = StationMeasurement.from_dict(raw)
+    assert StationMeasurement(**raw) == station
+    assert StationMeasurement.from_values(raw.get(name) for name in StationMeasurement.FIELD_NAMES) == station
+    assert station != StationMeasurement.from_dict({**raw, 'temperature': 9.0})
+
+
+def test_dict_style_access(feed):
+    raw = feed['actual']['stationmeasurements'][0]
+    station = StationMeasurement.from_dict({**raw, 'humidity': None})
+    assert station['stationname'] == 'Meetstation Arcen'
+    assert station.get('humidity', 0.0) == 0.0
+    assert station.get('no_such_field') is None
+    with pytest.raises(KeyError):
+        station['measured_at']
+    assert station.as_dict() == {name: station[name] for name in StationMeasurement.FIELD_NAMES}
+    assert 'iconurl' not in station.as_dict()
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from modules.observation_recorder import ObservationRecorder
+from modules.weather_statistics import WeatherStatistics
+from utils.observation_log import ObservationLog
+from utils.snapshot_diff import SnapshotDelta
+
+
+def reading(time: str, temperature, rain_24h, station: int = 6260) -> dict:
+    return {'stationid': station, 'timestamp': time, 'temperature': temperature,
+            'rainFallLast24Hour': rain_24h, 'precipitation': 0.4, 'airpressure': 1012.3}
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    log = ObservationLog(str(tmp_path / 'observations.log'))
+    monkeypatch.setattr(WeatherStatistics, '_observation_log', log)
+    return log
+
+
+def test_log_records_the_24_hour_total(log):
+    log.append(log.records_from_feed([reading('2024-05-01T10:00:00', 12.1, 3.4),
+                                      reading('2024-05-01T11:00:00', None, 'n/a'),
+                                      {'stationid': 6260, 'timestamp': 'not a time'}]))
+    frame = log.read_frame(6260)
+    assert len(frame) == 2
+    assert frame['TEMP'].dtype == np.float64
+    assert frame['TEMP'].iloc[0] == 12.1
+    assert frame['PRECIPITATION'].iloc[0] == 3.4
+    assert frame[['TEMP', 'PRECIPITATION']].iloc[1].isna().all()
+
+
+def test_daily_values_keep_the_last_running_total(log):
+    log.append(log.records_from_feed([reading('2024-05-01T08:00:00', 10.0, 1.0),
+                                      reading('2024-05-01T20:00:00', 14.0, 4.2),
+                                      reading('2024-05-02T09:00:00', 11.0, 0.5)]))
+    daily = WeatherStatistics(use_cache=False).log_daily('6260', '2024-05-01', '2024-05-02')
+    assert daily['DATE'].dt.day.tolist() == [1, 2]
+    assert daily['TEMP'].tolist() == [12.0, 11.0]
+    assert daily['PRECIPITATION'].tolist() == [4.2, 0.5]
+
+    stats, _ = WeatherStatistics(use_cache=False).process_period('log:6260', '2024-05-01', '2024-05-02', save=False)
+    assert stats['total_precipitation'] == pytest.approx(4.7)
+
+
+def test_compaction_keeps_the_last_record_of_a_reading(log):
+    log.append(log.records_from_feed([reading('2024-05-01T10:00:00', 12.1, 3.4),
+                                      reading('2024-05-01T09:00:00', 11.0, 3.0, station=6240)]))
+    log.append(log.records_from_feed([reading('2024-05-01T10:00:00', 12.3, 3.4)]))
+    assert log.compact() == 2
+    assert log.read()['station'].tolist() == [6240, 6260]
+    assert log.read_frame(6260)['TEMP'].tolist() == [12.3]
+    assert log.latest_times() == {6240: ObservationLog.to_seconds('2024-05-01T09:00:00'),
+                                  6260: ObservationLog.to_seconds('2024-05-01T10:00:00')}
+
+    # A torn record at the end is ignored
+    with open(log.path, 'ab') as f:
+        f.write(b'\0' * 5)
+    assert len(log.read()) == 2
+
+
+def delta(*readings) -> SnapshotDelta:
+    delta = SnapshotDelta(version=1)
+    delta.stations = {station['stationid']: station for station in readings}
+    return delta
+
+
+def test_recorder_logs_each_reading_once(log):
+    recorder = ObservationRecorder(log)
+    recorder.on_delta(delta(reading('2024-05-01T10:00:00', 12.1, 3.4)))
+    assert recorder.flush() == 1
+    recorder.on_delta(delta(reading('2024-05-01T10:00:00', 12.1, 3.4)))
+    assert recorder.flush() == 0
+    recorder.on_delta(delta(reading('2024-05-01T10:10:00', 12.2, 3.4),
+                            reading('2024-05-01T10:10:00', 9.0, 0.0, station=6240)))
+    assert recorder.flush() == 2
+    assert len(log.read()) == 3
+    # A new recorder continues from what the log already holds
+    restarted = ObservationRecorder(log)
+    restarted.on_delta(delta(reading('2024-05-01T10:10:00', 12.2, 3.4)))
+    assert restarted.flush() == 0
@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+
+
+@pytest.fixture
+def statistics(tmp_path, monkeypatch):
+    # Results are written to data/output under the working directory
+    monkeypatch.chdir(tmp_path)
+    return WeatherStatistics(use_cache=False)
+
+
+@pytest.fixture
+def data_dir(tmp_path, make_frame, write_csv):
+    os.makedirs(tmp_path / 'files')
+    frames = [make_frame(f'{2001 + k}-01-01', periods=365, seed=k) for k in range(3)]
+    for k, frame in enumerate(frames):
+        write_csv(frame, os.path.join('files', f'part{k}.csv'))
+    return str(tmp_path / 'files'), pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_unreadable_files_are_skipped(statistics, data_dir, workers):
+    path, frame = data_dir
+    with open(os.path.join(path, 'broken.csv'), 'w') as f:
+        f.write("DATE,WIND\n2001-01-01,3\n")
+
+    stats, output = statistics.process_files(path, '2001-01-01', '2003-12-31', workers=workers)
+    assert stats['avg_temp'] == pytest.approx(frame['TEMP'].mean())
+    assert stats['max_temp'] == frame['TEMP'].max()
+    assert stats['total_precipitation'] == pytest.approx(frame['PRECIPITATION'].sum())
+    assert list(statistics.file_errors) == [os.path.join(path, 'broken.csv')]
+    assert os.path.exists(output)
+
+
+def test_every_file_failing_is_an_error(statistics, tmp_path):
+    for k in range(2):
+        with open(tmp_path / f'broken{k}.csv', 'w') as f:
+            f.write("DATE,WIND\n2001-01-01,3\n")
+    stats, error = statistics.process_files(str(tmp_path / 'broken*.csv'), '2001-01-01', '2001-12-31', workers=2)
+    assert stats is None
+    assert error.startswith("None of the 2 files could be read")
+    assert len(statistics.file_errors) == 2
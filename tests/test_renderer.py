@@ -0,0 +1,84 @@
+import json
+from collections import OrderedDict
+
+import pytest
+
+from modules.renderer import WeatherRenderer
+from utils.feed_cache import FeedCache, FeedResponse
+from utils.models import StationMeasurement
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.setattr(WeatherRenderer, '_cache', OrderedDict())
+    monkeypatch.setattr(WeatherRenderer, '_hits', 0)
+    monkeypatch.setattr(WeatherRenderer, '_misses', 0)
+    return WeatherRenderer
+
+
+@pytest.fixture
+def station(feed) -> StationMeasurement:
+    return StationMeasurement.from_dict(feed['actual']['stationmeasurements'][0])
+
+
+@pytest.fixture
+def forecast(feed) -> dict:
+    report = feed['forecast']['weatherreport']
+    return {name: report[name] for name in ('title', 'published', 'text', 'author')}
+
+
+def test_station_output_is_memoized_per_version_and_format(renderer, station):
+    text = renderer.render_station(station, 1)
+    assert 'Meetstation Arcen' in text
+    assert renderer.render_station(station, 1) is text
+    assert renderer.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+    changed = StationMeasurement.from_dict({**station.as_dict(), 'temperature': 12.5})
+    assert renderer.render_station(changed, 2) != text
+    assert json.loads(renderer.render_station(changed, 2, 'json'))['temperature'] == 12.5
+    assert renderer.stats() == {'entries': 3, 'hits': 1, 'misses': 3}
+
+
+def test_forecast_output_is_keyed_on_published(renderer, forecast):
+    text = renderer.render_forecast(forecast)
+    assert renderer.render_forecast(dict(forecast)) is text
+    assert json.loads(renderer.render_forecast(forecast, 'json')) == forecast
+    newer = {**forecast, 'published': '2030-01-01T06:00:00', 'text': 'Nieuw weerbericht'}
+    assert 'Nieuw weerbericht' in renderer.render_forecast(newer)
+    assert renderer.stats()['entries'] == 3
+
+
+def test_forecast_without_published_stamp_is_not_cached(renderer, forecast):
+    undated = {**forecast, 'published': None}
+    assert renderer.render_forecast(undated) == renderer.render_forecast(undated)
+    assert renderer.stats() == {'entries': 0, 'hits': 0, 'misses': 0}
+
+
+def test_cache_evicts_least_recently_used(renderer, station, monkeypatch):
+    monkeypatch.setattr(WeatherRenderer, 'CACHE_SIZE', 2)
+    renderer.render_station(station, 1)
+    renderer.render_station(station, 2)
+    renderer.render_station(station, 1)
+    renderer.render_station(station, 3)
+    assert [key[2] for key in renderer._cache] == [1, 3]
+    renderer.clear()
+    assert renderer.stats()['entries'] == 0
+
+
+def test_unknown_format_is_rejected(renderer, station, forecast):
+    with pytest.raises(ValueError, match='Unknown output format'):
+        renderer.render_station(station, 1, 'xml')
+    with pytest.raises(ValueError, match='Unknown output format'):
+        renderer.render_forecast(forecast, 'xml')
+
+
+def test_versions_of_different_caches_never_collide(feed):
+    # The renderer keys on version alone, so a reconfigured cache must not reuse one
+    fetch = lambda headers: FeedResponse(200, feed)
+    first, second = FeedCache(fetch), FeedCache(fetch)
+    versions = []
+    for cache in (first, second, first, second):
+        cache.get(force=True)
+        versions.append(cache.version)
+    assert len(set(versions)) == 4
+    assert versions == sorted(versions)
@@ -0,0 +1,86 @@
+import copy
+
+from utils.snapshot_diff import diff_snapshots
+from utils.station_snapshot import StationSnapshot
+
+
+def measurements(feed):
+    return feed['actual']['stationmeasurements']
+
+
+def test_first_snapshot_adds_every_station(feed):
+    snapshot = StationSnapshot.from_feed(feed, 1)
+    delta = diff_snapshots(None, snapshot)
+    assert delta.version == 1
+    assert set(delta.added) == set(snapshot.by_key)
+    assert delta.stations == delta.added
+    assert not delta.changed and not delta.removed
+
+
+def test_identical_snapshots_give_an_empty_delta(feed):
+    delta = diff_snapshots(StationSnapshot.from_feed(feed, 1), StationSnapshot.from_feed(copy.deepcopy(feed), 2))
+    assert not delta
+    assert delta.version == 2
+    assert not delta.touches(6391)
+
+
+def test_added_changed_and_removed_stations(feed):
+    old = StationSnapshot.from_feed(feed, 1)
+    newer = copy.deepcopy(feed)
+    stations = measurements(newer)
+    removed = stations.pop(-1)
+    stations[0]['temperature'] = 9.4
+    stations[0]['humidity'] = 70.0
+    added = dict(stations[1], stationid=9999, stationname='Meetstation Nieuw')
+    stations.append(added)
+
+    delta = diff_snapshots(old, StationSnapshot.from_feed(newer, 2))
+    assert delta
+    assert list(delta.added) == [9999]
+    assert list(delta.removed) == [removed['stationid']]
+    assert delta.changed == {6391: {'temperature': (8.6, 9.4), 'humidity': (71.0, 70.0)}}
+    assert set(delta.stations) == {6391, 9999}
+    assert delta.stations[6391].temperature == 9.4
+    assert delta.touches(6391) and delta.touches(removed['stationid']) and delta.touches(9999)
+    assert not delta.touches(measurements(feed)[1]['stationid'])
+
+
+def test_subscribers_get_the_delta_of_each_new_feed_version(feed, feed_server, feed_api):
+    deltas = []
+    feed_api.subscribe(deltas.append)
+
+    first = feed_api.get_snapshot()
+    assert len(deltas) == 1 and len(deltas[0].added) == len(first.stations)
+
+    # The same version again is not a change
+    assert feed_api.get_snapshot() is first
+    assert len(deltas) == 1
+
+    newer = copy.deepcopy(feed)
+    measurements(newer)[0]['temperature'] = 12.5
+    feed_server.set_feed(newer)
+    second = feed_api.get_weather_data(force_refresh=True).snapshot
+    assert feed_api.get_snapshot() is second
+
+    assert len(deltas) == 2
+    assert deltas[1].version == second.version > first.version
+    assert deltas[1].changed == {6391: {'temperature': (8.6, 12.5)}}
+    assert feed_api.get_last_delta() is deltas[1]
+
+    feed_api.unsubscribe(deltas.append)
+    measurements(newer)[0]['temperature'] = 13.0
+    feed_server.set_feed(newer)
+    feed_api.get_weather_data(force_refresh=True)
+    feed_api.get_snapshot()
+    assert len(deltas) == 2
+
+
+def test_failing_subscriber_does_not_stop_the_others(feed_api):
+    def broken(delta):
+        raise RuntimeError('boom')
+
+    deltas = []
+    feed_api.subscribe(broken)
+    feed_api.subscribe(deltas.append)
+    assert feed_api.get_snapshot() is not None
+    assert len(deltas) == 1
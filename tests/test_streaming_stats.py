@@ -0,0 +1,55 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.streaming_stats import drop_duplicates
+
+
+def with_duplicates(frame: pd.DataFrame, lag: int, every: int = 5) -> pd.DataFrame:
+    """Repeats every ``every``-th row ``lag`` rows later, with a different TEMP"""
+    copies = frame.iloc[::every].copy()
+    copies['TEMP'] += 50
+    order = np.r_[np.arange(len(frame)), np.arange(0, len(frame), every) + lag + 0.5]
+    return pd.concat([frame, copies]).iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+
+def streamed_and_loaded(path: str, start: str, end: str, chunksize: int):
+    loaded = WeatherStatistics(use_cache=False, streaming=False)
+    streamed = WeatherStatistics(use_cache=False, streaming=True)
+    streamed.STREAMING_CHUNKSIZE = chunksize
+    return (streamed.process_period(path, start, end, save=False)[0],
+            loaded.process_period(path, start, end, save=False)[0])
+
+
+@pytest.mark.parametrize('chunksize', [13, 64, 100_000])
+def test_streamed_stations_with_duplicates_match_loaded(make_frame, write_knmi, chunksize):
+    frame = make_frame('2000-01-01', '2001-12-31', stations=('260', '240', '344'))
+    path = write_knmi(with_duplicates(frame, lag=10))
+    streamed, loaded = streamed_and_loaded(path, '2000-03-01', '2001-10-31', chunksize)
+    assert streamed == loaded
+    assert loaded['max_temp'] < 50
+
+
+def test_streamed_hourly_file_matches_loaded(make_frame, write_knmi):
+    frame = make_frame('2020-01-01', periods=24 * 60, freq='h')
+    path = write_knmi(with_duplicates(frame, lag=30, every=7))
+    streamed, loaded = streamed_and_loaded(path, '2020-01-05', '2020-02-20', 50)
+    assert streamed == loaded
+    assert loaded['max_temp'] < 50
+
+
+def test_rows_far_out_of_order_are_kept_and_logged(caplog):
+    dates = pd.to_datetime(['2020-01-01', '2020-01-02', '2020-03-01', '2020-01-01', '2020-02-28'])
+    chunks = [pd.DataFrame({'DATE': dates[i:i + 1], 'TEMP': float(i)}) for i in range(len(dates))]
+    with caplog.at_level(logging.WARNING):
+        kept = pd.concat(drop_duplicates(chunks, window_days=7))
+    # 2020-02-28 is within the window of 2020-03-01; the repeated 2020-01-01 is not
+    assert kept['TEMP'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert '1 rows were more than 7 days' in caplog.text
+
+    # Within one chunk every duplicate is found, whatever the order
+    kept = pd.concat(drop_duplicates([pd.DataFrame({'DATE': dates, 'TEMP': np.arange(5.0)})]))
+    assert kept['TEMP'].tolist() == [0.0, 1.0, 2.0, 4.0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.aggregate_index import AggregateIndex
+from utils.knmi_dataset import KNMIDataset
+from utils.temporal_pyramid import TemporalPyramid, bucket_bounds
+
+
+@pytest.fixture
+def dataset(make_frame) -> KNMIDataset:
+    frame = make_frame('1994-03-17', '2004-11-05', seed=11, missing={'TEMP': 0.08, 'PRECIPITATION': 0.025})
+    # Drop a stretch so some buckets are partly or completely empty
+    return KNMIDataset(frame[~frame['DATE'].between('1999-02-10', '1999-05-20')])
+
+
+def random_ranges(count: int, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    first = pd.Timestamp('1993-06-01')
+    for _ in range(count):
+        a, b = sorted(rng.integers(0, 4400, 2))
+        yield first + pd.Timedelta(days=int(a)), first + pd.Timedelta(days=int(b))
+
+
+def assert_same(result, expected):
+    if expected is None:
+        assert result is None
+        return
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), key
+
+
+def test_weeks_start_on_monday():
+    days = pd.to_datetime(['2024-01-01', '2024-01-07', '2024-01-08']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    start, end = bucket_bounds(days, 'week')
+    assert pd.to_datetime(start, unit='D').strftime('%Y-%m-%d').tolist() == ['2024-01-01', '2024-01-01', '2024-01-08']
+    assert (end - start == 7).all()
+
+
+def test_queries_match_aggregate_index(dataset):
+    pyramid = TemporalPyramid.build(dataset)
+    index = AggregateIndex(dataset)
+    for start, end in random_ranges(300):
+        assert_same(pyramid.query(start, end), index.query(start, end))
+
+
+def test_long_ranges_touch_few_values(dataset):
+    pyramid = TemporalPyramid.build(dataset)
+    rows, _, touched = pyramid.aggregate('1994-03-20', '2004-10-30')
+    assert rows > 3500
+    assert touched < 100
+
+
+def test_loaded_pyramid_matches_built_one(tmp_path, dataset):
+    pyramid = TemporalPyramid.build(dataset)
+    path = str(tmp_path / 'pyramid')
+    pyramid.save(path, {'source': 'test'})
+    loaded, meta = TemporalPyramid.load(path)
+    assert meta['source'] == 'test'
+    assert len(loaded) == len(pyramid)
+    for start, end in random_ranges(50, seed=4):
+        assert_same(loaded.query(start, end), pyramid.query(start, end))
+
+    assert TemporalPyramid.load(str(tmp_path / 'missing')) == (None, {})
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.timeseries_store import TimeSeriesStore
+
+
+def test_missing_snapshot_fields_keep_stored_values(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    complete = {'stationid': 6260, 'timestamp': '2024-05-01T10:00:00',
+                'temperature': 14.2, 'rainFallLast24Hour': 3.4, 'airpressure': 1012.3}
+    partial = {'stationid': 6260, 'timestamp': '2024-05-01T11:00:00', 'temperature': 15.1}
+    assert store.ingest_snapshot([complete, partial]) == 2
+
+    day = store.read(260, '2024-05-01', '2024-05-01').iloc[0]
+    assert day['TEMP'] == 15.1
+    assert day['PRECIPITATION'] == 3.4
+    assert day['AIRPRESSURE'] == 1012.3
+
+
+def test_days_without_precipitation_readings_stay_missing(tmp_path, make_frame):
+    frame = make_frame('2020-01-01', periods=72, freq='h')
+    frame.loc[frame['DATE'].dt.day == 2, 'PRECIPITATION'] = np.nan
+    store = TimeSeriesStore(str(tmp_path))
+    assert store.ingest_frame(frame, station=260) == 3
+
+    daily = store.read(260, '2020-01-01', '2020-01-03')
+    sums = frame.groupby(frame['DATE'].dt.day)['PRECIPITATION'].sum()
+    assert np.isnan(daily['PRECIPITATION'].iloc[1])
+    assert daily['PRECIPITATION'].iloc[[0, 2]].tolist() == [round(sums[1], 1), round(sums[3], 1)]
+    assert daily['TEMP'].tolist() == list(frame.groupby(frame['DATE'].dt.day)['TEMP'].mean().round(1))
+
+
+def test_values_are_read_as_rounded_float64(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.write(260, pd.to_datetime(['2023-01-02', '2023-01-03']), {'TEMP': [12.1, -0.3]})
+    frame = store.read(260, '2023-01-02', '2023-01-03', ['TEMP'])
+    assert frame['TEMP'].dtype == np.float64
+    assert frame['TEMP'].tolist() == [12.1, -0.3]
+
+
+def test_earlier_days_move_the_origin_back(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.write(260, pd.to_datetime(['2024-03-01', '2024-03-02']), {'TEMP': [5.0, 6.0]})
+    store.write(240, pd.to_datetime(['2024-03-02']), {'TEMP': [7.0]})
+    assert str(store.origin) == '2024-01-01'
+    store.write(260, pd.to_datetime(['2022-06-30']), {'TEMP': [20.0]})
+    assert str(store.origin) == '2022-01-01'
+
+    reopened = TimeSeriesStore(str(tmp_path))
+    assert str(reopened.origin) == '2022-01-01'
+    assert reopened.read(260, '2024-03-01', '2024-03-02', ['TEMP'])['TEMP'].tolist() == [5.0, 6.0]
+    assert reopened.read(240, '2024-03-02', '2024-03-02', ['TEMP'])['TEMP'].tolist() == [7.0]
+    assert reopened.read(260, '2022-06-29', '2022-06-30', ['TEMP'])['TEMP'].tolist()[1] == 20.0
+    assert np.isnan(reopened.read(260, '2022-06-29', '2022-06-29', ['TEMP'])['TEMP'].iloc[0])
+
+
+def test_ingested_history_gives_file_statistics(tmp_path, make_frame, write_knmi, write_csv, monkeypatch):
+    monkeypatch.setattr(WeatherStatistics, '_store', TimeSeriesStore(str(tmp_path / 'store')))
+    frame = make_frame('2001-01-01', '2002-12-31', stations=('260', '240'))
+    late = write_knmi(frame[frame['DATE'] >= '2002-01-01'], 'late.txt')
+    early = write_knmi(frame[frame['DATE'] < '2002-01-01'], 'early.txt')
+    statistics = WeatherStatistics(use_cache=False)
+    # Later years first, so the earlier ones are back-filled
+    assert statistics.ingest_store(late) == (730, None)
+    assert statistics.ingest_store(early) == (730, None)
+
+    path = write_knmi(frame[frame['STATION'] == '260'], 'station.txt')
+    from_file, _ = statistics.process_period(path, '2001-06-01', '2002-05-31', save=False)
+    from_store, _ = statistics.process_period('store:260', '2001-06-01', '2002-05-31', save=False)
+    assert from_store == pytest.approx(from_file)
+
+    single = write_csv(make_frame('2003-01-01', periods=10), 'single.csv')
+    written, error = statistics.ingest_store(single)
+    assert written is None and 'give a station' in error
+    assert statistics.ingest_store(single, '344') == (10, None)
@@ -0,0 +1,25 @@
+import pytest
+
+from modules.weather_statistics import WeatherStatistics
+from utils.knmi_dataset import KNMIDataset
+
+
+def test_batch_days_count_dates_not_rows(make_frame, write_knmi):
+    frame = make_frame('2020-01-01', '2020-03-31 23:00', freq='h', stations=('260', '240'))
+    path = write_knmi(frame)
+    statistics = WeatherStatistics(use_cache=False)
+    periods = WeatherStatistics.generate_periods('2020-01-10', '2020-03-31', 'month')
+    results, _ = statistics.process_periods(path, periods, save=False)
+    assert results['days'].tolist() == [22, 29, 31]
+
+    extended, _ = statistics.process_periods(path, periods, save=False, extended=True)
+    assert extended['days'].tolist() == [22, 29, 31]
+    for (_, start, end), row in zip(periods, results.itertuples()):
+        single, _ = statistics.process_period(path, start, end, save=False)
+        assert row.avg_temp == pytest.approx(single['avg_temp'])
+        assert row.total_precipitation == pytest.approx(single['total_precipitation'])
+
+
+def test_batch_days_of_a_range_starting_mid_day(make_frame):
+    dataset = KNMIDataset(make_frame('2020-01-01', periods=72, freq='h'))
+    assert dataset.day_counts([0, 5, 30, 72, 10], [72, 25, 31, 72, 10]).tolist() == [3, 2, 1, 0, 0]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import socket
+import threading
+
+import numpy as np
+import pytest
+import requests
+
+from modules.web_service import WeatherService
+from modules.weather_statistics import WeatherStatistics
+from utils.instrumentation import Metrics
+
+
+@pytest.fixture
+def service(tmp_path, feed_api, monkeypatch):
+    """A WeatherService on a free port, reading the stub feed, run on its own event loop"""
+    monkeypatch.setattr(Metrics, 'enabled', True)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = WeatherService(port=0, data_dir=str(tmp_path), statistics=WeatherStatistics(use_cache=False))
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def raw_request(service: WeatherService, request: bytes) -> bytes:
+    with socket.create_connection((service.host, service.port), timeout=5) as connection:
+        connection.sendall(request)
+        chunks = []
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+
+def test_concurrent_identical_requests_are_coalesced(service, feed_server):
+    feed_server.delay = 0.3
+    barrier = threading.Barrier(6)
+    responses = []
+
+    def get():
+        barrier.wait()
+        responses.append(requests.get(f"{service.url}/stations", timeout=10))
+
+    threads = [threading.Thread(target=get) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [response.status_code for response in responses] == [200] * 6
+    assert len({response.content for response in responses}) == 1
+    assert service.coalesced >= 1
+    assert feed_server.requests == 1
+    assert {'name': 'Meetstation Arcen', 'region': 'Venlo'} in responses[0].json()
+
+
+@pytest.mark.parametrize('path', ['../secret.csv', '/etc/passwd', 'sub/../../secret.csv'])
+def test_files_outside_the_data_directory_are_rejected(service, path):
+    response = requests.get(f"{service.url}/statistics",
+                            params={'file': path, 'start': '2001-01-01', 'end': '2001-01-31'}, timeout=5)
+    assert response.status_code == 400
+    assert response.json() == {'error': 'File must be inside the data directory'}
+
+
+def test_missing_statistics_are_sent_as_null(service, make_frame, write_csv):
+    write_csv(make_frame('2001-01-01', periods=10))
+    response = requests.get(f"{service.url}/statistics",
+                            params={'file': 'data.csv', 'start': '2001-01-05', 'end': '2001-01-05'}, timeout=5)
+    assert response.status_code == 200
+    assert b'NaN' not in response.content
+    statistics = response.json()['statistics']
+    # One day has no standard deviation
+    assert statistics['std_temp'] is None
+    assert np.isfinite(statistics['avg_temp'])
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-5', b'1e3'])
+def test_malformed_content_length_is_rejected(service, length):
+    response = raw_request(service, b'GET /metrics HTTP/1.1\r\nHost: x\r\nContent-Length: ' + length + b'\r\n\r\n')
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 400 ')
+    assert b'Connection: close' in head
+    assert json.loads(body) == {'error': 'Malformed Content-Length'}
+
+
+def test_metrics_in_prometheus_format(service):
+    assert requests.get(f"{service.url}/forecast", timeout=5).status_code == 200
+    response = requests.get(f"{service.url}/metrics", params={'format': 'prometheus'}, timeout=5)
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/plain; version=0.0.4'
+    assert 'weather_app_duration_seconds_count{operation="service.request"}' in response.text
+
+    metrics = requests.get(f"{service.url}/metrics", timeout=5).json()
+    assert metrics['server']['responses']['200'] >= 2
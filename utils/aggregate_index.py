@@ -0,0 +1,119 @@
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+
+from utils.instrumentation import Metrics
+from utils.knmi_dataset import DateLike, KNMIDataset
+
+Positions = Union[int, np.ndarray]
+
+
+class RangeAggregates:
+    """Constant-time sum/count/mean/min/max over any [i, j) range of one column.
+
+    Sums and counts come from prefix sums, so NaNs (missing values) simply
+    do not contribute. Minima and maxima come from sparse tables in which
+    NaN is replaced by +inf/-inf; a range with no valid values yields NaN.
+    All query methods accept scalar positions or NumPy arrays of them.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        self.size = len(values)
+        self.prefix_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+        self.prefix_count = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+        # Squares are taken around the overall mean to limit cancellation
+        self._shift = float(np.nanmean(values)) if valid.any() else 0.0
+        shifted = np.where(valid, values - self._shift, 0.0)
+        self.prefix_square = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+        self._min_table = self._sparse_table(np.where(valid, values, np.inf), np.minimum)
+        self._max_table = self._sparse_table(np.where(valid, values, -np.inf), np.maximum)
+
+    @staticmethod
+    def _sparse_table(values: np.ndarray, combine) -> np.ndarray:
+        """Level k holds the combined value of the 2**k elements starting at each position"""
+        levels = max(1, int(np.log2(len(values))) + 1) if len(values) else 1
+        table = np.empty((levels, len(values)), dtype=np.float64)
+        table[0] = values
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            table[k] = table[k - 1]
+            table[k, :-half] = combine(table[k - 1, :-half], table[k - 1, half:])
+        return table
+
+    def count(self, i: Positions, j: Positions):
+        return self.prefix_count[j] - self.prefix_count[i]
+
+    def sum(self, i: Positions, j: Positions):
+        return self.prefix_sum[j] - self.prefix_sum[i]
+
+    def mean(self, i: Positions, j: Positions):
+        count = self.count(i, j)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, self.sum(i, j) / np.maximum(count, 1), np.nan)
+
+    def std(self, i: Positions, j: Positions):
+        """Sample standard deviation (NaN for fewer than two values)"""
+        count = self.count(i, j)
+        shifted_sum = self.sum(i, j) - self._shift * count
+        squares = self.prefix_square[j] - self.prefix_square[i]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (squares - shifted_sum * shifted_sum / np.maximum(count, 1)) / (count - 1)
+            return np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+    def min(self, i: Positions, j: Positions):
+        return self._query(self._min_table, np.minimum, i, j, np.inf)
+
+    def max(self, i: Positions, j: Positions):
+        return self._query(self._max_table, np.maximum, i, j, -np.inf)
+
+    def _query(self, table: np.ndarray, combine, i: Positions, j: Positions, empty: float):
+        i = np.asarray(i)
+        j = np.asarray(j)
+        length = np.maximum(j - i, 1)
+        k = np.floor(np.log2(length)).astype(np.int64)
+        # Clamp positions so empty ranges index safely; they are masked below
+        left = np.minimum(i, self.size - 1)
+        right = np.clip(j - (1 << k), 0, self.size - 1)
+        result = combine(table[k, left], table[k, right])
+        return np.where((j > i) & (result != empty), result, np.nan)
+
+
+class AggregateIndex:
+    """Answers period statistics for a dataset without rescanning its rows.
+
+    Build cost is O(n log n) once per loaded file; each period query then
+    costs two binary searches plus O(1) work per statistic.
+    """
+
+    def __init__(self, dataset: KNMIDataset, columns: Iterable[str] = ('TEMP', 'PRECIPITATION')):
+        self.dataset = dataset
+        with Metrics.timer('stats.index_build'):
+            self.columns: Dict[str, RangeAggregates] = {
+                column: RangeAggregates(dataset.frame[column].to_numpy())
+                for column in columns
+            }
+
+    def __getitem__(self, column: str) -> RangeAggregates:
+        return self.columns[column]
+
+    def query(self, start: DateLike, end: DateLike) -> Optional[Dict]:
+        """Returns the period statistics, or None if no rows fall in the period"""
+        i, j = self.dataset.bounds(start, end)
+        if i == j:
+            return None
+        return self.stats(i, j)
+
+    def stats(self, i: Positions, j: Positions) -> Dict:
+        """Returns the statistics shown in the Statistics tab for rows [i, j)"""
+        temp = self.columns['TEMP']
+        precipitation = self.columns['PRECIPITATION']
+        with Metrics.timer('stats.index_query'):
+            return {
+                'max_temp': temp.max(i, j),
+                'min_temp': temp.min(i, j),
+                'avg_temp': temp.mean(i, j),
+                'total_precipitation': precipitation.sum(i, j),
+                'std_temp': temp.std(i, j),
+            }
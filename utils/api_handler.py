@@ -1,72 +1,209 @@
 import requests
-from typing import Dict, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional
 import logging
+import threading
+from utils.feed_cache import FeedCache, FeedResponse
+from utils.http_session import HTTPClient
+from utils.instrumentation import Metrics
+from utils.feed_decoder import FeedDecoder
+from utils.models import StationMeasurement
+from utils.station_snapshot import StationSnapshot
+from utils.snapshot_diff import SnapshotDelta, diff_snapshots
+
+
+class FeedData(NamedTuple):
+    """The parts of one feed document the application uses.
+
+    The feed cache keeps this instead of the decoded document, so the raw
+    JSON tree is released as soon as it has been parsed.
+    """
+    snapshot: StationSnapshot
+    forecast: Optional[Dict] = None
+
+    @classmethod
+    def from_feed(cls, data: Dict, version: int = 0) -> "FeedData":
+        report = data.get('forecast', {}).get('weatherreport', {})
+        forecast = None
+        if report:
+            forecast = {
+                'title': report.get('title', 'No title available'),
+                'published': report.get('published', 'No date available'),
+                'text': report.get('text', 'No forecast available'),
+                'author': report.get('author', 'Unknown')
+            }
+        return cls(StationSnapshot.from_feed(data, version), forecast)
+
 
 class BuienradarAPI:
     BASE_URL = "https://data.buienradar.nl/2.0/feed/json"
-    
+    CACHE_TTL = 60.0
+    _cache: Optional[FeedCache] = None
+    _http: Optional[HTTPClient] = None
+    _decoder: Optional[FeedDecoder] = None
+    _snapshot: Optional[StationSnapshot] = None
+    _snapshot_lock = threading.Lock()
+    _last_delta: Optional[SnapshotDelta] = None
+    _subscribers: List[Callable[[SnapshotDelta], None]] = []
+
+    @staticmethod
+    def configure_cache(ttl: Optional[float] = None, base_url: Optional[str] = None) -> FeedCache:
+        """Replaces the shared feed cache, e.g. to point it at a local stub server"""
+        if ttl is not None:
+            BuienradarAPI.CACHE_TTL = ttl
+        if base_url is not None:
+            BuienradarAPI.BASE_URL = base_url
+        BuienradarAPI._cache = FeedCache(BuienradarAPI._fetch_feed,
+                                         ttl=BuienradarAPI.CACHE_TTL,
+                                         serve_stale=True,
+                                         parse=BuienradarAPI._parse_feed)
+        return BuienradarAPI._cache
+
+    @staticmethod
+    def configure_http(**options) -> HTTPClient:
+        """Replaces the pooled HTTP client; options are passed to HTTPClient"""
+        if BuienradarAPI._http is not None:
+            BuienradarAPI._http.close()
+        BuienradarAPI._http = HTTPClient(**options)
+        return BuienradarAPI._http
+
+    @staticmethod
+    def get_http_client() -> HTTPClient:
+        """Returns the pooled HTTP client used for feed requests"""
+        if BuienradarAPI._http is None:
+            BuienradarAPI.configure_http()
+        return BuienradarAPI._http
+
+    @staticmethod
+    def get_cache() -> FeedCache:
+        """Returns the feed cache shared by all API consumers"""
+        if BuienradarAPI._cache is None:
+            BuienradarAPI.configure_cache()
+        return BuienradarAPI._cache
+
+    @staticmethod
+    def get_decoder() -> FeedDecoder:
+        """Returns the JSON decoder for feed responses (fastest available backend)"""
+        if BuienradarAPI._decoder is None:
+            BuienradarAPI._decoder = FeedDecoder()
+        return BuienradarAPI._decoder
+
     @staticmethod
-    def get_weather_data() -> Optional[Dict]:
-        """Fetches weather data from Buienradar API"""
+    def _fetch_feed(headers: Dict) -> Optional[FeedResponse]:
+        """Performs one (conditional) request against the Buienradar feed"""
         try:
-            response = requests.get(BuienradarAPI.BASE_URL)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            with Metrics.timer('feed.fetch'):
+                response = BuienradarAPI.get_http_client().get(BuienradarAPI.BASE_URL, headers=headers)
+            if response.status_code == 304:
+                Metrics.count('feed.not_modified')
+                return FeedResponse(304)
+            with Metrics.timer('feed.decode'):
+                data = BuienradarAPI.get_decoder().loads(response.content)
+            return FeedResponse(
+                response.status_code,
+                data,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+        except (requests.RequestException, ValueError) as e:
             logging.error(f"Error fetching weather data: {e}")
+            Metrics.count('feed.errors')
             return None
-    
+
     @staticmethod
-    def get_stations() -> list:
-        """Retrieves list of available weather stations"""
-        data = BuienradarAPI.get_weather_data()
-        if not data:
-            return []
-        
+    def _parse_feed(data: Dict, version: int) -> Optional[FeedData]:
+        """Parses a decoded feed document for the cache; None if it is malformed"""
         try:
-            stations = data['actual']['stationmeasurements']
-            return [(station['stationname'], station['regio']) 
-                   for station in stations]
-        except KeyError as e:
+            with Metrics.timer('feed.parse'):
+                return FeedData.from_feed(data, version)
+        except (KeyError, TypeError, AttributeError) as e:
             logging.error(f"Error parsing stations data: {e}")
-            return []
+            return None
+
+    @staticmethod
+    def get_weather_data(force_refresh: bool = False) -> Optional[FeedData]:
+        """Fetches weather data from Buienradar API, served from the shared cache"""
+        with Metrics.timer('feed.get'):
+            return BuienradarAPI.get_cache().get(force=force_refresh)
     
     @staticmethod
-    def get_station_data(station_name: str) -> Optional[Dict]:
-        """Retrieves data for a specific station"""
+    def get_snapshot() -> Optional[StationSnapshot]:
+        """Returns the indexed station snapshot for the current feed version"""
         data = BuienradarAPI.get_weather_data()
         if not data:
             return None
-        
-        try:
-            stations = data['actual']['stationmeasurements']
-            for station in stations:
-                if station['stationname'].lower() == station_name.lower():
-                    return station
-            logging.warning(f"Station {station_name} not found")
-            return None
-        except KeyError as e:
-            logging.error(f"Error parsing station data: {e}")
+
+        with BuienradarAPI._snapshot_lock:
+            snapshot = BuienradarAPI._snapshot
+            new_snapshot = data.snapshot
+            if snapshot is new_snapshot:
+                return snapshot
+            delta = diff_snapshots(snapshot, new_snapshot)
+            BuienradarAPI._snapshot = new_snapshot
+            BuienradarAPI._last_delta = delta
+            subscribers = list(BuienradarAPI._subscribers)
+
+        # Notify outside the lock so subscribers may call back into the API
+        if delta:
+            for callback in subscribers:
+                try:
+                    callback(delta)
+                except Exception as e:
+                    logging.error(f"Error in snapshot subscriber: {e}")
+        return new_snapshot
+
+    @staticmethod
+    def subscribe(callback: Callable[[SnapshotDelta], None]):
+        """Registers a callback for station changes between feed snapshots.
+
+        The callback receives a SnapshotDelta each time a new feed version
+        changes any station. It runs on whichever thread fetched the feed.
+        """
+        with BuienradarAPI._snapshot_lock:
+            BuienradarAPI._subscribers.append(callback)
+
+    @staticmethod
+    def unsubscribe(callback: Callable[[SnapshotDelta], None]):
+        with BuienradarAPI._snapshot_lock:
+            if callback in BuienradarAPI._subscribers:
+                BuienradarAPI._subscribers.remove(callback)
+
+    @staticmethod
+    def get_last_delta() -> Optional[SnapshotDelta]:
+        """Returns the changes introduced by the current snapshot"""
+        return BuienradarAPI._last_delta
+
+    @staticmethod
+    def get_stations() -> list:
+        """Retrieves list of available weather stations"""
+        snapshot = BuienradarAPI.get_snapshot()
+        if snapshot is None:
+            return []
+        return snapshot.stations
+
+    @staticmethod
+    def get_station_data(station_name: str) -> Optional[StationMeasurement]:
+        """Retrieves data for a specific station"""
+        snapshot = BuienradarAPI.get_snapshot()
+        if snapshot is None:
             return None
-    
+
+        station = snapshot.get(station_name)
+        if station is None:
+            logging.warning(f"Station {station_name} not found")
+        return station
+
+    @staticmethod
+    def get_stations_in_region(region: str) -> list:
+        """Retrieves data for all stations in a region"""
+        snapshot = BuienradarAPI.get_snapshot()
+        if snapshot is None:
+            return []
+        return snapshot.in_region(region)
+
     @staticmethod
     def get_forecast() -> Optional[Dict]:
         """Retrieves weather forecast from Buienradar API"""
-        try:
-            data = BuienradarAPI.get_weather_data()
-            if not data:
-                return None
-            
-            forecast = data.get('forecast', {}).get('weatherreport', {})
-            if not forecast:
-                return None
-            
-            return {
-                'title': forecast.get('title', 'No title available'),
-                'published': forecast.get('published', 'No date available'),
-                'text': forecast.get('text', 'No forecast available'),
-                'author': forecast.get('author', 'Unknown')
-            }
-        except Exception as e:
-            logging.error(f"Error fetching forecast: {e}")
+        data = BuienradarAPI.get_weather_data()
+        if not data or not data.forecast:
             return None
+        return dict(data.forecast)
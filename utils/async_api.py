@@ -0,0 +1,40 @@
+import asyncio
+from typing import Dict, List, Optional
+from utils.api_handler import BuienradarAPI, FeedData
+from utils.models import StationMeasurement
+from utils.station_snapshot import StationSnapshot
+
+
+class AsyncBuienradarAPI:
+    """Asyncio variant of BuienradarAPI.
+
+    Blocking feed requests run in the default executor, so coroutines can be
+    awaited from an event loop without stalling it. All calls share the
+    synchronous client's feed cache, HTTP pool and station snapshot, so
+    concurrent callers still cause at most one upstream request.
+    """
+
+    @staticmethod
+    async def get_weather_data(force_refresh: bool = False) -> Optional[FeedData]:
+        """Fetches weather data from Buienradar API"""
+        return await asyncio.to_thread(BuienradarAPI.get_weather_data, force_refresh)
+
+    @staticmethod
+    async def get_snapshot() -> Optional[StationSnapshot]:
+        """Returns the indexed station snapshot for the current feed version"""
+        return await asyncio.to_thread(BuienradarAPI.get_snapshot)
+
+    @staticmethod
+    async def get_stations() -> List:
+        """Retrieves list of available weather stations"""
+        return await asyncio.to_thread(BuienradarAPI.get_stations)
+
+    @staticmethod
+    async def get_station_data(station_name: str) -> Optional[StationMeasurement]:
+        """Retrieves data for a specific station"""
+        return await asyncio.to_thread(BuienradarAPI.get_station_data, station_name)
+
+    @staticmethod
+    async def get_forecast() -> Optional[Dict]:
+        """Retrieves weather forecast from Buienradar API"""
+        return await asyncio.to_thread(BuienradarAPI.get_forecast)
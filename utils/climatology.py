@@ -0,0 +1,449 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+from utils.knmi_dataset import DateLike
+from utils.knmi_reader import KNMIReader
+from utils.streaming_stats import drop_duplicates
+from utils.timeseries_store import TimeSeriesStore
+
+# Calendar-day slots: Feb 29 has its own slot, so every year maps onto 366
+DAY_SLOTS = 366
+# Slot of March 1st; from here non-leap years skip the Feb 29 slot
+MARCH_FIRST = 60
+
+
+def day_slots(dates) -> np.ndarray:
+    """Calendar-day slot (0..365) of each date, the same in leap and other years"""
+    dates = pd.DatetimeIndex(dates)
+    slots = dates.dayofyear.to_numpy() - 1
+    return slots + ((~dates.is_leap_year) & (slots >= MARCH_FIRST - 1))
+
+
+def daily_values(frame: pd.DataFrame, variables: Iterable[str],
+                 precipitation: str = 'sum') -> pd.DataFrame:
+    """Collapses sub-daily rows to one row per day.
+
+    Temperature and pressure are averaged; precipitation is summed, or the
+    last reading is kept with ``precipitation='last'`` for running 24-hour
+    totals such as the live feed's.
+    """
+    frame = frame.assign(DATE=frame['DATE'].dt.floor('D'))
+    if not frame['DATE'].duplicated().any():
+        return frame
+    grouped = frame.groupby('DATE', sort=True)
+    daily = grouped[[v for v in variables if v != 'PRECIPITATION']].mean()
+    if 'PRECIPITATION' in variables:
+        # A day without readings stays missing instead of becoming dry
+        rain = grouped['PRECIPITATION']
+        daily['PRECIPITATION'] = rain.sum(min_count=1) if precipitation == 'sum' else rain.last()
+    return daily[list(variables)].reset_index()
+
+
+class StationClimatology:
+    """Calendar-day accumulators of one station.
+
+    Per variable and day slot the count, sum, sum of squares, minimum and
+    maximum of the daily values are kept, plus a histogram of daily mean
+    temperatures at ``resolution`` for the percentiles. All of them are
+    sums or extremes, so adding another year is a cheap in-place update.
+    """
+
+    def __init__(self, variables: Iterable[str], bins: int):
+        self.variables = tuple(variables)
+        shape = (len(self.variables), DAY_SLOTS)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.hist = np.zeros((DAY_SLOTS, bins), dtype=np.int32)
+
+    def update(self, slots: np.ndarray, values: Dict[str, np.ndarray], temp_bins: np.ndarray):
+        for k, variable in enumerate(self.variables):
+            column = values.get(variable)
+            if column is None:
+                continue
+            present = ~np.isnan(column)
+            s, v = slots[present], column[present]
+            self.count[k] += np.bincount(s, minlength=DAY_SLOTS)
+            self.sum[k] += np.bincount(s, weights=v, minlength=DAY_SLOTS)
+            self.sumsq[k] += np.bincount(s, weights=v * v, minlength=DAY_SLOTS)
+            np.minimum.at(self.min[k], s, v)
+            np.maximum.at(self.max[k], s, v)
+        if len(temp_bins):
+            bins = self.hist.shape[1]
+            flat = np.bincount(temp_bins, minlength=DAY_SLOTS * bins)
+            self.hist += flat.reshape(DAY_SLOTS, bins).astype(np.int32)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {'count': self.count, 'sum': self.sum, 'sumsq': self.sumsq,
+                'min': self.min, 'max': self.max, 'hist': self.hist}
+
+    @classmethod
+    def from_arrays(cls, variables: Iterable[str], arrays) -> "StationClimatology":
+        table = cls(variables, arrays['hist'].shape[1])
+        for name in ('count', 'sum', 'sumsq', 'min', 'max', 'hist'):
+            setattr(table, name, np.array(arrays[name]))
+        return table
+
+
+class Climatology:
+    """Persistent day-of-year climatology tables per station.
+
+    ``update()`` folds daily observations into per-station calendar-day
+    accumulators (see StationClimatology), which are saved as one
+    ``.npz`` file per station next to a ``meta.json`` recording the date
+    ranges each station covers. Days inside those ranges are skipped, so
+    passing the same history again, appending new years or back-filling
+    older ones never counts a day twice.
+
+    ``normals()`` turns the accumulators into mean/std/min/max and
+    temperature percentiles per calendar day. Statistics are pooled over
+    ``window`` days centred on each calendar day (5 by default, as is
+    usual for daily percentile thresholds), which smooths the ~30 samples
+    a single calendar day has in a 30-year record. ``anomalies()`` compares
+    a period's daily values with the normals of the same calendar days.
+
+    Stations are keyed like TimeSeriesStore (KNMI station numbers; WMO ids
+    are mapped onto them). Frames without a STATION column are stored under
+    ``station`` or DEFAULT_STATION.
+    """
+
+    DEFAULT_PATH = "data/climatology"
+    DEFAULT_STATION = "default"
+    META = "meta.json"
+    VARIABLES = ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')
+    PERCENTILES = (10, 50, 90)
+    # Temperature histogram range and resolution (°C)
+    TEMP_LOW = -40.0
+    TEMP_HIGH = 45.0
+    RESOLUTION = 0.1
+
+    def __init__(self, path: str = DEFAULT_PATH, window: int = 5):
+        if window < 1 or window % 2 == 0:
+            raise ValueError("window must be a positive odd number of days")
+        self.path = path
+        self.window = window
+        self._lock = threading.RLock()
+        self._tables: Dict[str, StationClimatology] = {}
+        self._normals: Dict[str, pd.DataFrame] = {}
+        self.bins = int(round((self.TEMP_HIGH - self.TEMP_LOW) / self.RESOLUTION)) + 1
+
+        meta_path = os.path.join(self.path, self.META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'variables': list(self.VARIABLES), 'low': self.TEMP_LOW,
+                         'resolution': self.RESOLUTION, 'stations': {}}
+
+    @property
+    def stations(self) -> List[str]:
+        return list(self.meta['stations'])
+
+    def coverage(self, station) -> Optional[Dict]:
+        """First and last covered date, number of days and covered date ranges of a station"""
+        covered = self.meta['stations'].get(self.station_key(station))
+        if covered is not None and 'ranges' not in covered:
+            # Tables written before ranges were recorded covered one span
+            covered['ranges'] = [[covered['first'], covered['last']]]
+        return covered
+
+    @staticmethod
+    def station_key(station) -> str:
+        if station is None:
+            return Climatology.DEFAULT_STATION
+        return TimeSeriesStore.station_key(station)
+
+    # Building
+
+    @Metrics.timed('climatology.update')
+    def update(self, frame: pd.DataFrame, station=None, save: bool = True) -> int:
+        """Adds daily observations; returns the number of new station-days.
+
+        Frames with a STATION column are split per station; sub-daily rows
+        are collapsed per day first.
+        """
+        with self._lock:
+            return self._add([frame], station, save)
+
+    def update_from_file(self, file_path: str, station=None, chunksize: int = 500_000,
+                         engine: str = 'c') -> int:
+        """Adds a KNMI/CSV data file chunk by chunk; returns new station-days.
+
+        Duplicate dates are skipped like in streamed statistics (the first
+        row wins, see streaming_stats.drop_duplicates).
+        """
+        chunks = KNMIReader.iter_chunks(file_path, columns=self.meta['variables'], chunksize=chunksize,
+                                        engine=engine, include_station=KNMIReader.has_station(file_path))
+        with self._lock:
+            return self._add(drop_duplicates(chunks), station, save=True)
+
+    def _add(self, frames: Iterable[pd.DataFrame], station, save: bool) -> int:
+        added = 0
+        skipped = 0
+        touched = set()
+        # Rows of each station's latest day are held back until the next
+        # frame, so a day split over two chunks is collapsed as a whole
+        pending: Dict[str, pd.DataFrame] = {}
+        for frame in frames:
+            groups = frame.groupby('STATION', sort=False) if 'STATION' in frame.columns else [(station, frame)]
+            for key, rows in groups:
+                key = self.station_key(key)
+                rows = rows.loc[rows['DATE'].notna()]
+                if key in pending:
+                    rows = pd.concat([pending.pop(key), rows])
+                days = rows['DATE'].dt.floor('D')
+                latest = (days == days.max()).to_numpy()
+                pending[key] = rows.loc[latest]
+                counts = self._add_rows(key, rows.loc[~latest])
+                added, skipped = added + counts[0], skipped + counts[1]
+                if counts[0]:
+                    touched.add(key)
+        for key, rows in pending.items():
+            counts = self._add_rows(key, rows)
+            added, skipped = added + counts[0], skipped + counts[1]
+            if counts[0]:
+                touched.add(key)
+        if save and touched:
+            self.save(touched)
+        if touched:
+            logging.info(f"Climatology updated with {added} station-days ({', '.join(sorted(touched))})")
+        if skipped:
+            logging.info(f"Skipped {skipped} station-days already in the climatology")
+        return added
+
+    def _add_rows(self, key: str, rows: pd.DataFrame) -> Tuple[int, int]:
+        """Folds one station's rows into its table; returns (days added, days skipped)"""
+        variables = [v for v in self.meta['variables'] if v in rows.columns]
+        covered = self.coverage(key)
+        skipped = 0
+        if covered is not None:
+            inside = self._covered(rows['DATE'].to_numpy().astype('datetime64[D]'), covered['ranges'])
+            if inside.any():
+                skipped = int(rows['DATE'][inside].dt.floor('D').nunique())
+                rows = rows.loc[~inside]
+        daily = daily_values(rows, variables).dropna(how='all', subset=variables)
+        if daily.empty:
+            return 0, skipped
+
+        table = self._table(key, create=True)
+        slots = day_slots(daily['DATE'])
+        values = {v: daily[v].to_numpy(dtype=np.float64) for v in variables}
+        table.update(slots, values, self._temp_bins(slots, values.get('TEMP')))
+
+        ranges = self._merge_ranges((covered or {}).get('ranges', []),
+                                    daily['DATE'].to_numpy().astype('datetime64[D]'))
+        self.meta['stations'][key] = {
+            'first': ranges[0][0],
+            'last': ranges[-1][1],
+            'days': (covered or {}).get('days', 0) + len(daily),
+            'ranges': ranges,
+        }
+        self._normals.pop(key, None)
+        return len(daily), skipped
+
+    @staticmethod
+    def _covered(days: np.ndarray, ranges: List[List[str]]) -> np.ndarray:
+        """Mask of the days that fall inside any of the sorted, disjoint inclusive ranges"""
+        if not ranges:
+            return np.zeros(len(days), dtype=bool)
+        starts = np.array([first for first, _ in ranges], dtype='datetime64[D]')
+        ends = np.array([last for _, last in ranges], dtype='datetime64[D]')
+        k = np.searchsorted(starts, days, side='right') - 1
+        return (k >= 0) & (days <= ends[np.maximum(k, 0)])
+
+    @staticmethod
+    def _merge_ranges(ranges: List[List[str]], days: np.ndarray) -> List[List[str]]:
+        """Adds days to a list of inclusive date ranges; adjacent ranges are joined"""
+        days = np.unique(days)
+        # Runs of consecutive days become ranges of their own
+        breaks = np.flatnonzero(np.diff(days) > np.timedelta64(1, 'D')) + 1
+        runs = [(run[0], run[-1]) for run in np.split(days, breaks) if len(run)]
+        spans = sorted([(np.datetime64(first, 'D'), np.datetime64(last, 'D')) for first, last in ranges] + runs)
+        merged = []
+        for first, last in spans:
+            if merged and first <= merged[-1][1] + np.timedelta64(1, 'D'):
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        return [[str(first), str(last)] for first, last in merged]
+
+    def _temp_bins(self, slots: np.ndarray, temps: Optional[np.ndarray]) -> np.ndarray:
+        """Flat histogram indices (slot * bins + temperature bin) of present temperatures"""
+        if temps is None:
+            return np.empty(0, dtype=np.intp)
+        present = ~np.isnan(temps)
+        bins = np.clip(np.rint((temps[present] - self.TEMP_LOW) / self.RESOLUTION), 0, self.bins - 1)
+        return slots[present] * self.bins + bins.astype(np.intp)
+
+    # Persistence
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _table(self, key: str, create: bool = False) -> Optional[StationClimatology]:
+        table = self._tables.get(key)
+        if table is None:
+            if key in self.meta['stations'] and os.path.exists(self._file(key)):
+                with np.load(self._file(key)) as arrays:
+                    table = StationClimatology.from_arrays(self.meta['variables'], arrays)
+            elif create:
+                table = StationClimatology(self.meta['variables'], self.bins)
+            else:
+                return None
+            self._tables[key] = table
+        return table
+
+    def save(self, stations: Optional[Iterable[str]] = None):
+        """Writes the tables of the given (default: all loaded) stations and the metadata"""
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            for key in (stations if stations is not None else list(self._tables)):
+                table = self._tables.get(key)
+                if table is None:
+                    continue
+                tmp_path = self._file(key) + '.tmp.npz'
+                np.savez_compressed(tmp_path, **table.arrays())
+                os.replace(tmp_path, self._file(key))
+            meta_path = os.path.join(self.path, self.META)
+            tmp_path = meta_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.meta, f)
+            os.replace(tmp_path, meta_path)
+
+    # Queries
+
+    def normals(self, station=None) -> Optional[pd.DataFrame]:
+        """Per calendar-day normals of a station (366 rows, Feb 29 at row 59).
+
+        Columns per variable: ``<var>_mean``, ``_std``, ``_min``, ``_max``
+        and ``_count``, plus ``TEMP_p10``/``p50``/``p90``. None when the
+        station has no climatology.
+        """
+        key = self.station_key(station)
+        with self._lock:
+            normals = self._normals.get(key)
+            if normals is not None:
+                return normals
+            table = self._table(key)
+            if table is None:
+                return None
+            with Metrics.timer('climatology.normals'):
+                normals = self._derive(table)
+            self._normals[key] = normals
+            return normals
+
+    def _derive(self, table: StationClimatology) -> pd.DataFrame:
+        count, total, sumsq = (self._pooled(a) for a in (table.count, table.sum, table.sumsq))
+        minimum = self._pooled(table.min, np.min)
+        maximum = self._pooled(table.max, np.max)
+        columns = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / count, np.nan)
+            variance = np.where(count > 1, (sumsq - count * mean ** 2) / (count - 1), np.nan)
+        for k, variable in enumerate(table.variables):
+            columns[f'{variable}_mean'] = mean[k]
+            columns[f'{variable}_std'] = np.sqrt(np.maximum(variance[k], 0))
+            columns[f'{variable}_min'] = np.where(count[k] > 0, minimum[k], np.nan)
+            columns[f'{variable}_max'] = np.where(count[k] > 0, maximum[k], np.nan)
+            columns[f'{variable}_count'] = count[k]
+
+        hist = self._pooled(table.hist.T).T
+        cumulative = np.cumsum(hist, axis=1)
+        n = cumulative[:, -1]
+        for p in self.PERCENTILES:
+            # Bin holding the observation of 1-based rank q * (n - 1) + 1
+            rank = (p / 100) * (n - 1) + 1
+            bins = (cumulative < rank[:, None]).sum(axis=1)
+            columns[f'TEMP_p{p}'] = np.where(n > 0, self.TEMP_LOW + bins * self.RESOLUTION, np.nan)
+        return pd.DataFrame(columns)
+
+    def _pooled(self, array: np.ndarray, reduce=np.sum) -> np.ndarray:
+        """Pools the last (day slot) axis over the centred window, wrapping around the year"""
+        if self.window == 1:
+            return array
+        half = self.window // 2
+        padded = np.concatenate([array[..., -half:], array, array[..., :half]], axis=-1)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.window, axis=-1)
+        return reduce(windows, axis=-1)
+
+    def period_normals(self, start: DateLike, end: DateLike, station=None) -> Optional[Dict]:
+        """Expected values for a period from the table alone"""
+        normals = self.normals(station)
+        if normals is None:
+            return None
+        slots = day_slots(pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()))
+        rows = normals.iloc[slots]
+        return {
+            'days': len(slots),
+            'normal_avg_temp': float(rows['TEMP_mean'].mean()),
+            'normal_min_temp': float(rows['TEMP_min'].min()),
+            'normal_max_temp': float(rows['TEMP_max'].max()),
+            'normal_precipitation': float(rows['PRECIPITATION_mean'].sum()),
+            'normal_avg_pressure': float(rows['AIRPRESSURE_mean'].mean()),
+        }
+
+    def anomalies(self, daily: pd.DataFrame, station=None) -> Optional[Dict]:
+        """Compares daily observations (DATE plus variables) with the normals.
+
+        Differences are taken day by day against the normal of the same
+        calendar day, so a period with missing days is compared with the
+        normals of the days it has. None without a climatology or data.
+        """
+        normals = self.normals(station)
+        if normals is None or daily.empty:
+            return None
+        with Metrics.timer('climatology.anomalies'):
+            rows = normals.iloc[day_slots(daily['DATE'])]
+            result = {'days': int(len(daily))}
+            coverage = self.coverage(station)
+            result['baseline_start'], result['baseline_end'] = coverage['first'], coverage['last']
+
+            temp = daily['TEMP'].to_numpy(dtype=np.float64) if 'TEMP' in daily else np.full(len(daily), np.nan)
+            has_temp = ~np.isnan(temp)
+            normal = rows['TEMP_mean'].to_numpy()[has_temp]
+            std = rows['TEMP_std'].to_numpy()[has_temp]
+            observed = temp[has_temp]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result.update({
+                    'avg_temp': self._mean(observed),
+                    'normal_avg_temp': self._mean(normal),
+                    'temp_anomaly': self._mean(observed - normal),
+                    'temp_anomaly_sd': self._mean(np.where(std > 0, (observed - normal) / std, np.nan)),
+                    'warm_days': int(np.count_nonzero(observed > rows['TEMP_p90'].to_numpy()[has_temp])),
+                    'cold_days': int(np.count_nonzero(observed < rows['TEMP_p10'].to_numpy()[has_temp])),
+                })
+
+            if 'PRECIPITATION' in daily:
+                precipitation = daily['PRECIPITATION'].to_numpy(dtype=np.float64)
+                has_rain = ~np.isnan(precipitation)
+                total = float(precipitation[has_rain].sum())
+                normal_total = float(np.nansum(rows['PRECIPITATION_mean'].to_numpy()[has_rain]))
+                result.update({
+                    'total_precipitation': total,
+                    'normal_precipitation': normal_total,
+                    'precipitation_percent_of_normal': 100 * total / normal_total if normal_total else np.nan,
+                })
+
+            if 'AIRPRESSURE' in daily:
+                pressure = daily['AIRPRESSURE'].to_numpy(dtype=np.float64)
+                has_pressure = ~np.isnan(pressure)
+                normal = rows['AIRPRESSURE_mean'].to_numpy()[has_pressure]
+                result.update({
+                    'avg_pressure': self._mean(pressure[has_pressure]),
+                    'pressure_anomaly': self._mean(pressure[has_pressure] - normal),
+                })
+            return result
+
+    @staticmethod
+    def _mean(values: np.ndarray) -> float:
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else np.nan
@@ -2,40 +2,65 @@ import pandas as pd
 import os
 from datetime import datetime
 import logging
+from typing import Iterable, Optional, Union
+from utils.instrumentation import Metrics
+from utils.knmi_reader import KNMIReader
+from utils.knmi_dataset import KNMIDataset
+from utils.extended_stats import extended_statistics
+from utils.streaming_stats import PeriodAccumulator
 
 class KNMIDataProcessor:
     @staticmethod
-    def read_knmi_file(file_path: str) -> pd.DataFrame:
-        """Reads KNMI data file and returns a pandas DataFrame"""
+    def read_knmi_file(file_path: str, columns: Optional[Iterable[str]] = None,
+                       engine: str = 'c') -> pd.DataFrame:
+        """Reads KNMI data file and returns a pandas DataFrame (with STATION if the file has one)"""
         try:
-            # Read KNMI data file (you might need to adjust the format based on actual file)
-            df = pd.read_csv(file_path, delimiter=',')
+            # Handles both the app's CSV format and the raw KNMI daily layout
+            df = KNMIReader.read(file_path, columns=columns, engine=engine,
+                                 include_station=KNMIReader.has_station(file_path))
             return df
         except Exception as e:
             logging.error(f"Error reading KNMI file: {e}")
             return None
 
     @staticmethod
-    def calculate_statistics(df: pd.DataFrame, start_date: str, end_date: str) -> dict:
-        """Calculates weather statistics for given period"""
+    def load_dataset(file_path: str, engine: str = 'c') -> Optional[KNMIDataset]:
+        """Reads KNMI data file into a date-sorted dataset for repeated queries"""
+        df = KNMIDataProcessor.read_knmi_file(file_path, engine=engine)
+        if df is None:
+            return None
+        return KNMIDataset(df)
+
+    @staticmethod
+    @Metrics.timed('stats.calculate')
+    def calculate_statistics(data: Union[pd.DataFrame, KNMIDataset], start_date: str, end_date: str,
+                             extended: bool = False) -> dict:
+        """Calculates weather statistics for given period.
+
+        Returns max/min/average temperature, total precipitation and the
+        temperature standard deviation, the same keys as
+        WeatherStatistics.process_period(). With ``extended`` the result
+        also holds the extended statistics (percentiles, degree days,
+        dry/wet days, rolling means, air pressure).
+        """
         try:
-            # Filter data for the given period
-            mask = (df['DATE'] >= start_date) & (df['DATE'] <= end_date)
-            period_data = df.loc[mask]
+            # Locate the given period by binary search on the sorted dates
+            dataset = data if isinstance(data, KNMIDataset) else KNMIDataset(data)
+            period_data = dataset.slice(start_date, end_date)
+            if period_data.empty:
+                return None
 
-            # Calculate statistics
-            stats = {
-                'max_temp': period_data['TEMP'].max(),
-                'min_temp': period_data['TEMP'].min(),
-                'avg_temp': period_data['TEMP'].mean(),
-                'total_precipitation': period_data['PRECIPITATION'].sum()
-            }
-            return stats
+            if extended:
+                return extended_statistics(period_data, start_date, end_date)
+            accumulator = PeriodAccumulator()
+            accumulator.update(period_data)
+            return accumulator.result()
         except Exception as e:
             logging.error(f"Error calculating statistics: {e}")
             return None
 
     @staticmethod
+    @Metrics.timed('stats.save')
     def save_statistics(stats: dict, start_date: str, end_date: str) -> str:
         """Saves statistics to a file"""
         try:
@@ -0,0 +1,213 @@
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+from utils.knmi_dataset import ONE_DAY, DateLike
+from utils.streaming_stats import RunningStats
+
+
+class QuantileSketch:
+    """Mergeable, fixed-memory quantile estimate for a stream of values.
+
+    Values are counted in bins of ``resolution`` between ``low`` and
+    ``high`` (values outside are counted in the edge bins). Quantiles
+    follow the 'higher' rank rule (the next observation up, no
+    interpolation), so for data at the sketch's resolution, such as KNMI
+    temperatures at the default 0.1, they equal the exact percentiles.
+    """
+
+    __slots__ = ('low', 'resolution', 'counts')
+
+    def __init__(self, low: float = -60.0, high: float = 60.0, resolution: float = 0.1):
+        self.low = low
+        self.resolution = resolution
+        self.counts = np.zeros(int(round((high - low) / resolution)) + 1, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        bins = np.clip(np.rint((values - self.low) / self.resolution), 0, len(self.counts) - 1)
+        self.counts += np.bincount(bins.astype(np.intp), minlength=len(self.counts))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.counts += other.counts
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        """Returns the estimated quantiles (0..1); NaN when no values were seen"""
+        qs = np.asarray(list(qs), dtype=np.float64)
+        cumulative = np.cumsum(self.counts)
+        total = cumulative[-1] if len(cumulative) else 0
+        if total == 0:
+            return np.full(len(qs), np.nan)
+        # Value of the observation with 1-based rank ceil(q * (n - 1)) + 1
+        bins = np.searchsorted(cumulative, np.ceil(qs * (total - 1)) + 1, side='left')
+        decimals = max(0, int(np.ceil(-np.log10(self.resolution))))
+        return np.round(self.low + bins * self.resolution, decimals)
+
+
+class ExtendedAccumulator:
+    """Extended period statistics, computed in one vectorised pass per chunk.
+
+    Rows are folded into per-day sums and counts covering the period
+    (bincount per column), plus running temperature/pressure statistics
+    and a temperature quantile sketch. Day-based statistics (degree days,
+    dry/wet days, dry spells, rolling means) are derived from the daily
+    values in result(). Memory depends on the length of the period, not
+    on the number of rows, and partial results from chunks or files can be
+    merged.
+
+    Daily values are the mean temperature and pressure and the summed
+    precipitation of the rows of each day, so hourly data works too.
+    """
+
+    COLUMNS = ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')
+    # Degree-day base temperature (°C)
+    DEGREE_DAY_BASE = 18.0
+    # Days with at least this much precipitation (mm) are wet, others dry
+    WET_DAY_THRESHOLD = 1.0
+    PERCENTILES = (10, 50, 90)
+    ROLLING_WINDOWS = (7, 30)
+    # Share of a rolling window that must have data for its mean to count
+    ROLLING_MIN_COVERAGE = 0.8
+
+    def __init__(self, start: DateLike, end: DateLike):
+        self.start = np.datetime64(pd.Timestamp(start).normalize(), 'D')
+        end = np.datetime64(pd.Timestamp(end).normalize(), 'D')
+        self.days = max(int((end - self.start) / np.timedelta64(1, 'D')) + 1, 0)
+        self.sums = np.zeros((len(self.COLUMNS), self.days))
+        self.counts = np.zeros((len(self.COLUMNS), self.days), dtype=np.int64)
+        self.temp = RunningStats()
+        self.pressure = RunningStats()
+        self.sketch = QuantileSketch()
+        self.rows = 0
+
+    def update(self, frame: pd.DataFrame):
+        """Adds rows with a DATE column and any of TEMP, PRECIPITATION, AIRPRESSURE"""
+        with Metrics.timer('stats.extended_update'):
+            day = (frame['DATE'].to_numpy().astype('datetime64[D]') - self.start).astype(np.int64)
+            inside = (day >= 0) & (day < self.days)
+            day = day[inside]
+            self.rows += len(day)
+            for k, column in enumerate(self.COLUMNS):
+                if column not in frame:
+                    continue
+                values = frame[column].to_numpy(dtype=np.float64)[inside]
+                present = ~np.isnan(values)
+                self.sums[k] += np.bincount(day[present], weights=values[present], minlength=self.days)
+                self.counts[k] += np.bincount(day[present], minlength=self.days)
+                if column == 'TEMP':
+                    self.temp.update(values)
+                    self.sketch.update(values)
+                elif column == 'AIRPRESSURE':
+                    self.pressure.update(values)
+
+    def merge(self, other: "ExtendedAccumulator") -> "ExtendedAccumulator":
+        if (other.start, other.days) != (self.start, self.days):
+            raise ValueError("Cannot merge statistics for different periods")
+        self.sums += other.sums
+        self.counts += other.counts
+        self.temp.merge(other.temp)
+        self.pressure.merge(other.pressure)
+        self.sketch.merge(other.sketch)
+        self.rows += other.rows
+        return self
+
+    def result(self, exact_temps: Optional[np.ndarray] = None) -> Optional[Dict]:
+        """Returns the statistics, or None if no rows were seen.
+
+        Percentiles come from the sketch unless the period's temperatures
+        are passed in ``exact_temps``; both use the 'higher' rank rule.
+        """
+        if self.rows == 0:
+            return None
+        with Metrics.timer('stats.extended_result'):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                daily = np.where(self.counts > 0, self.sums / self.counts, np.nan)
+            temp, precipitation = daily[0], np.where(self.counts[1] > 0, self.sums[1], np.nan)
+
+            if exact_temps is not None:
+                exact_temps = np.asarray(exact_temps, dtype=np.float64)
+                exact_temps = exact_temps[~np.isnan(exact_temps)]
+            if exact_temps is not None and len(exact_temps):
+                percentiles = np.percentile(exact_temps, self.PERCENTILES, method='higher')
+            else:
+                percentiles = self.sketch.quantiles(np.array(self.PERCENTILES) / 100)
+
+            temp_days = ~np.isnan(temp)
+            dry = precipitation < self.WET_DAY_THRESHOLD
+            empty = self.temp.count == 0
+            stats = {
+                'max_temp': math.nan if empty else self.temp.maximum,
+                'min_temp': math.nan if empty else self.temp.minimum,
+                'avg_temp': math.nan if empty else self.temp.mean,
+                'std_temp': self.temp.std,
+                'total_precipitation': float(np.nansum(self.sums[1])),
+                'days': int(np.count_nonzero(self.counts.any(axis=0))),
+            }
+            for p, value in zip(self.PERCENTILES, percentiles):
+                stats[f'p{p}_temp'] = float(value)
+            stats.update({
+                'heating_degree_days': float(np.sum(np.maximum(self.DEGREE_DAY_BASE - temp[temp_days], 0))),
+                'cooling_degree_days': float(np.sum(np.maximum(temp[temp_days] - self.DEGREE_DAY_BASE, 0))),
+                'dry_days': int(np.count_nonzero(dry)),
+                'wet_days': int(np.count_nonzero(precipitation >= self.WET_DAY_THRESHOLD)),
+                'longest_dry_spell': self.longest_run(dry),
+            })
+            for window in self.ROLLING_WINDOWS:
+                means = self.rolling_means(temp, window)
+                valid = ~np.isnan(means)
+                stats[f'max_{window}day_mean_temp'] = float(means[valid].max()) if valid.any() else math.nan
+                stats[f'min_{window}day_mean_temp'] = float(means[valid].min()) if valid.any() else math.nan
+            pressure_empty = self.pressure.count == 0
+            stats.update({
+                'avg_pressure': math.nan if pressure_empty else self.pressure.mean,
+                'min_pressure': math.nan if pressure_empty else self.pressure.minimum,
+                'max_pressure': math.nan if pressure_empty else self.pressure.maximum,
+                'std_pressure': self.pressure.std,
+            })
+            return stats
+
+    @staticmethod
+    def longest_run(flags: np.ndarray) -> int:
+        """Length of the longest run of consecutive True values"""
+        padded = np.concatenate(([0], flags.astype(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(padded))
+        if not len(edges):
+            return 0
+        return int((edges[1::2] - edges[::2]).max())
+
+    @staticmethod
+    def rolling_means(daily: np.ndarray, window: int) -> np.ndarray:
+        """Trailing ``window``-day means; NaN where too few days have data"""
+        if len(daily) < window:
+            return np.empty(0)
+        present = ~np.isnan(daily)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(present, daily, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(present)))
+        window_sums = sums[window:] - sums[:-window]
+        window_counts = counts[window:] - counts[:-window]
+        enough = window_counts >= math.ceil(window * ExtendedAccumulator.ROLLING_MIN_COVERAGE)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(enough, window_sums / window_counts, np.nan)
+
+
+def extended_statistics(frame: pd.DataFrame, start: DateLike, end: DateLike) -> Optional[Dict]:
+    """Extended statistics for an in-memory frame's rows in the period, with exact percentiles"""
+    accumulator = ExtendedAccumulator(start, end)
+    accumulator.update(frame)
+    exact = None
+    if 'TEMP' in frame:
+        dates = frame['DATE']
+        in_period = (dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end).normalize() + ONE_DAY)
+        exact = frame['TEMP'].to_numpy()[in_period.to_numpy()]
+    return accumulator.result(exact_temps=exact)
@@ -0,0 +1,180 @@
+import itertools
+import threading
+import time
+import logging
+from types import MappingProxyType
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class FeedResponse(NamedTuple):
+    """Result of a single (possibly conditional) feed request"""
+    status: int
+    data: Optional[Dict] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class _Fetch:
+    """One in-flight refresh; waiting callers read the leader's result from it"""
+
+    __slots__ = ('done', 'result')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class FeedCache:
+    """Keeps one parsed copy of a feed and shares it between all callers.
+
+    A cached snapshot is served as-is while it is younger than ``ttl``
+    seconds. After that the next caller revalidates it with
+    ``If-None-Match``/``If-Modified-Since``; a 304 answer only renews the
+    snapshot's age. Callers arriving while a fetch is in flight wait for
+    that fetch instead of starting their own. With ``serve_stale`` the last
+    good snapshot is returned when a refresh fails.
+
+    ``parse(data, version)`` turns a freshly fetched document into the
+    object that is cached instead, so the raw document can be released as
+    soon as it is parsed; returning None counts as a failed fetch. Without
+    it the document itself is cached. Either way the snapshot is shared by
+    all callers, so a raw document is handed out as a read-only mapping.
+
+    Versions are drawn from one process-wide counter, so snapshots from two
+    different caches (e.g. after the cache is reconfigured) never share a
+    version number and version-keyed caches cannot mix them up.
+    """
+
+    _versions = itertools.count(1)
+
+    def __init__(self, fetcher: Callable[[Dict], Optional[FeedResponse]],
+                 ttl: float = 60.0, clock: Callable[[], float] = time.monotonic,
+                 serve_stale: bool = False,
+                 parse: Optional[Callable[[Dict, int], Any]] = None):
+        self.fetcher = fetcher
+        self.parse = parse
+        self.ttl = ttl
+        self.clock = clock
+        self.serve_stale = serve_stale
+
+        self._lock = threading.Lock()
+        self._inflight: Optional[_Fetch] = None
+        self._data: Any = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._fetched_at: Optional[float] = None
+
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.stale_served = 0
+
+    def get(self, force: bool = False) -> Any:
+        """Returns the cached feed, fetching or revalidating it when stale"""
+        with self._lock:
+            if not force and self._is_fresh():
+                self.hits += 1
+                return self._data
+            if self._inflight is not None:
+                fetch = self._inflight
+                self.coalesced += 1
+                leader = False
+            else:
+                fetch = self._inflight = _Fetch()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            fetch.done.wait()
+            return fetch.result
+
+        try:
+            fetch.result = self._refresh()
+        finally:
+            with self._lock:
+                self._inflight = None
+            fetch.done.set()
+        return fetch.result
+
+    def invalidate(self):
+        """Drops the cached snapshot and its validators"""
+        with self._lock:
+            self._data = None
+            self._etag = None
+            self._last_modified = None
+            self._fetched_at = None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was last fetched or revalidated"""
+        if self._fetched_at is None:
+            return None
+        return self.clock() - self._fetched_at
+
+    def stats(self) -> Dict:
+        """Returns cache counters for logging and diagnostics"""
+        return {
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'stale_served': self.stale_served,
+            'age': self.age(),
+            'ttl': self.ttl,
+        }
+
+    def _is_fresh(self) -> bool:
+        age = self.age()
+        return self._data is not None and age is not None and age < self.ttl
+
+    def _refresh(self) -> Any:
+        headers = {}
+        if self._data is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        response = self.fetcher(headers)
+        if response is None:
+            self.errors += 1
+            return self._stale()
+
+        if response.status == 304 and self._data is not None:
+            with self._lock:
+                self.revalidations += 1
+                self._fetched_at = self.clock()
+                return self._data
+
+        if response.data is None:
+            self.errors += 1
+            logging.error(f"Feed request returned status {response.status} without data")
+            return self._stale()
+
+        version = next(FeedCache._versions)
+        if self.parse is None:
+            data = MappingProxyType(response.data)
+        else:
+            data = self.parse(response.data, version)
+            if data is None:
+                self.errors += 1
+                return self._stale()
+
+        with self._lock:
+            self._data = data
+            self._etag = response.etag
+            self._last_modified = response.last_modified
+            self._fetched_at = self.clock()
+            self.version = version
+            return self._data
+
+    def _stale(self) -> Any:
+        if not self.serve_stale or self._data is None:
+            return None
+        self.stale_served += 1
+        logging.warning(f"Serving stale feed snapshot (age {self.age():.0f}s)")
+        return self._data
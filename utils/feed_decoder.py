@@ -0,0 +1,115 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Union
+
+from utils.models import StationMeasurement
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+Raw = Union[bytes, str]
+
+
+class FeedDecoder:
+    """Pluggable JSON decoder for the Buienradar feed.
+
+    Uses msgspec or orjson when installed and the standard library
+    otherwise. Besides full decoding it can return only selected top-level
+    sections, or decode the station measurements straight into
+    StationMeasurement objects. With msgspec those selective decodes use a
+    schema, so the parser skips everything else in the document without
+    building Python objects for it; the other backends decode the whole
+    document and then pick out the requested parts.
+    """
+
+    BACKENDS = ('msgspec', 'orjson', 'json')
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or self.available_backends()[0]
+        if self.backend not in self.available_backends():
+            raise ValueError(f"JSON backend not available: {self.backend}")
+        self._section_decoders: Dict = {}
+        self._station_decoder = None
+
+    @staticmethod
+    def available_backends() -> List[str]:
+        backends = []
+        if msgspec is not None:
+            backends.append('msgspec')
+        if orjson is not None:
+            backends.append('orjson')
+        backends.append('json')
+        return backends
+
+    def loads(self, raw: Raw) -> Dict:
+        """Decodes a full JSON document into dicts and lists; raises ValueError"""
+        if self.backend == 'msgspec':
+            try:
+                return msgspec.json.decode(raw)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+        if self.backend == 'orjson':
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    def decode_sections(self, raw: Raw, sections: Iterable[str]) -> Dict:
+        """Decodes only the given top-level sections (e.g. 'actual', 'forecast')"""
+        sections = tuple(sections)
+        if self.backend == 'msgspec':
+            decoder = self._section_decoders.get(sections)
+            if decoder is None:
+                schema = msgspec.defstruct('FeedSections',
+                                           [(name, Optional[dict], None) for name in sections])
+                decoder = self._section_decoders[sections] = msgspec.json.Decoder(schema)
+            try:
+                document = decoder.decode(raw)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+            return {name: getattr(document, name) for name in sections
+                    if getattr(document, name) is not None}
+        data = self.loads(raw)
+        return {name: data[name] for name in sections if name in data}
+
+    def decode_stations(self, raw: Raw) -> List[StationMeasurement]:
+        """Decodes ``actual.stationmeasurements`` into StationMeasurement objects"""
+        if self.backend == 'msgspec':
+            if self._station_decoder is None:
+                self._station_decoder = msgspec.json.Decoder(self._station_schema())
+            try:
+                document = self._station_decoder.decode(raw)
+            except msgspec.ValidationError:
+                # Values the schema does not accept (e.g. numbers sent as
+                # strings) are coerced like the other backends do
+                document = None
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+            if document is not None:
+                if document.actual is None:
+                    return []
+                astuple = msgspec.structs.astuple
+                return [StationMeasurement.from_values(astuple(station))
+                        for station in document.actual.stationmeasurements]
+        data = self.loads(raw)
+        try:
+            stations = data['actual']['stationmeasurements']
+        except (KeyError, TypeError) as e:
+            logging.error(f"Error parsing stations data: {e}")
+            return []
+        return [StationMeasurement.from_dict(station) for station in stations]
+
+    @staticmethod
+    def _station_schema():
+        station = msgspec.defstruct(
+            'Station',
+            [(name, Optional[Union[kind, float]] if kind is int else Optional[kind], None)
+             for name, kind in StationMeasurement.FIELDS]
+        )
+        actual = msgspec.defstruct('Actual', [('stationmeasurements', List[station], [])])
+        return msgspec.defstruct('StationFeed', [('actual', Optional[actual], None)])
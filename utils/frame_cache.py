@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the BLAKE2 content hash of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParsedFrameCache:
+    """Persistent cache of parsed data files in a columnar binary format.
+
+    Entries are keyed by the source file's path, size, mtime and content
+    hash. When size and mtime match the manifest the file is not even
+    hashed; when only the mtime changed the hash decides whether the entry
+    can be reused. Frames are stored as Parquet when pyarrow is installed,
+    otherwise as one memory-mappable ``.npy`` file per column. Without
+    Parquet, text columns are stored as fixed-width strings plus a mask of
+    missing values; frames with any other non-numeric column are not
+    cached, since ``.npy`` cannot hold them without pickling.
+    """
+
+    DEFAULT_DIR = "data/cache/frames"
+    MANIFEST = "manifest.json"
+
+    def __init__(self, cache_dir: str = DEFAULT_DIR, use_parquet: Optional[bool] = None):
+        self.cache_dir = cache_dir
+        self.use_parquet = HAS_PYARROW if use_parquet is None else use_parquet
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    def load(self, file_path: str, parser: Callable[[str], pd.DataFrame],
+             variant: str = "") -> pd.DataFrame:
+        """Returns the parsed frame for ``file_path``, parsing it only on a miss.
+
+        ``variant`` distinguishes different parsers of the same file.
+        """
+        source = os.path.abspath(file_path)
+        stat = os.stat(source)
+        manifest_key = f"{source}|{variant}"
+
+        with self._lock:
+            record = self._manifest.get(manifest_key)
+
+        if record is not None:
+            same_stat = record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns
+            if same_stat or (record['size'] == stat.st_size and record['hash'] == file_digest(source)):
+                frame = self._read_entry(record)
+                if frame is not None:
+                    if not same_stat:
+                        self._update_record(manifest_key, dict(record, mtime_ns=stat.st_mtime_ns))
+                    self.hits += 1
+                    return frame
+
+        self.misses += 1
+        content_hash = file_digest(source)
+        frame = parser(file_path)
+        entry = hashlib.sha1(manifest_key.encode('utf-8')).hexdigest()[:16] + '-' + content_hash
+        fmt = self._write_entry(entry, frame)
+        if fmt is not None:
+            if record is not None and record['entry'] != entry:
+                self._remove_entry(record)
+            self._update_record(manifest_key, {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': content_hash,
+                'entry': entry,
+                'format': fmt,
+            })
+        return frame
+
+    def clear(self):
+        """Removes all cached entries"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._manifest = {}
+
+    def _entry_path(self, entry: str, fmt: str) -> str:
+        suffix = '.parquet' if fmt == 'parquet' else '.npcols'
+        return os.path.join(self.cache_dir, entry + suffix)
+
+    def _write_entry(self, entry: str, frame: pd.DataFrame) -> Optional[str]:
+        fmt = 'parquet' if self.use_parquet else 'npy'
+        path = self._entry_path(entry, fmt)
+        try:
+            if fmt == 'parquet':
+                frame.to_parquet(path, index=False)
+            else:
+                columns = []
+                arrays = {}
+                for i, column in enumerate(frame.columns):
+                    values = frame[column].to_numpy()
+                    info = {'name': str(column), 'dtype': str(frame[column].dtype)}
+                    if values.dtype == object:
+                        encoded = self._encode_text(frame[column])
+                        if encoded is None:
+                            logging.debug(f"Not caching {entry}: column {column} is not numeric or text")
+                            return None
+                        values, missing = encoded
+                        if missing is not None:
+                            arrays[f"{i}.missing.npy"] = missing
+                            info['missing'] = True
+                    arrays[f"{i}.npy"] = values
+                    columns.append(info)
+                os.makedirs(path, exist_ok=True)
+                for name, values in arrays.items():
+                    np.save(os.path.join(path, name), values, allow_pickle=False)
+                with open(os.path.join(path, 'columns.json'), 'w') as f:
+                    json.dump(columns, f)
+            return fmt
+        except Exception as e:
+            logging.warning(f"Could not write frame cache entry {path}: {e}")
+            return None
+
+    @staticmethod
+    def _encode_text(column: pd.Series) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Returns (fixed-width strings, missing mask or None) for a text column, None otherwise"""
+        if not (column.dtype == object or pd.api.types.is_string_dtype(column.dtype)):
+            return None
+        values = column.to_numpy(dtype=object)
+        missing = pd.isna(values)
+        present = values[~missing]
+        if not all(isinstance(value, str) for value in present):
+            return None
+        values = np.where(missing, '', values).astype(str) if len(values) else np.array([], dtype='<U1')
+        return values, (missing if missing.any() else None)
+
+    def _read_entry(self, record: Dict) -> Optional[pd.DataFrame]:
+        path = self._entry_path(record['entry'], record['format'])
+        try:
+            if record['format'] == 'parquet':
+                return pd.read_parquet(path)
+            with open(os.path.join(path, 'columns.json')) as f:
+                columns = json.load(f)
+            data = {}
+            for i, info in enumerate(columns):
+                values = np.load(os.path.join(path, f"{i}.npy"), mmap_mode='r')
+                if values.dtype.kind == 'U':
+                    values = values.astype(object)
+                    if info.get('missing'):
+                        values[np.load(os.path.join(path, f"{i}.missing.npy"))] = None
+                    values = pd.Series(values, dtype=object).astype(info['dtype'])
+                data[info['name']] = values
+            return pd.DataFrame(data, copy=False)
+        except Exception as e:
+            logging.warning(f"Discarding unreadable frame cache entry {path}: {e}")
+            return None
+
+    def _remove_entry(self, record: Dict):
+        path = self._entry_path(record['entry'], record['format'])
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.cache_dir, self.MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_record(self, key: str, record: Dict):
+        with self._lock:
+            self._manifest[key] = record
+            path = os.path.join(self.cache_dir, self.MANIFEST)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp_path, path)
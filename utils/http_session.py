@@ -0,0 +1,221 @@
+import random
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _accept_encoding() -> str:
+    """Lists the content codings urllib3 can decode in this environment"""
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+    return ', '.join(encodings)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised when a request is refused because the circuit breaker is open"""
+
+
+class RequestMetrics(NamedTuple):
+    """Outcome of one logical request, including all of its retries"""
+    url: str
+    status: Optional[int]
+    latency: float
+    attempts: int
+    bytes: int
+    error: Optional[str] = None
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    refuses calls for ``reset_timeout`` seconds. The first call after that
+    is let through as a trial; its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Returns True when a call may be made right now"""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.warning(f"Circuit breaker opened after {self.failures} failures")
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+    def release(self):
+        """Ends a call that recorded no outcome, so a later call may be the trial"""
+        with self._lock:
+            self._trial_running = False
+
+
+class HTTPClient:
+    """Pooled, retrying HTTP client with timeouts and a circuit breaker.
+
+    One keep-alive ``requests.Session`` is reused for all calls, with at
+    most ``max_connections_per_host`` open sockets per host. Connection
+    errors, timeouts, 429 and 5xx answers are retried with capped
+    exponential backoff and full jitter. Other 4xx answers are raised
+    straight away and do not count against the breaker: the upstream did
+    answer, the request itself was wrong.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_connections_per_host: int = 4,
+                 breaker: Optional[CircuitBreaker] = None, history_size: int = 100):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=max_connections_per_host,
+                              pool_block=True,
+                              max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = _accept_encoding()
+
+        self.history: Deque[RequestMetrics] = deque(maxlen=history_size)
+        self.total_requests = 0
+        self.total_errors = 0
+        self.total_retries = 0
+        self._metrics_lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based), with full jitter"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def get(self, url: str, headers: Optional[Dict] = None) -> requests.Response:
+        """Performs a GET with retries; raises requests.RequestException on failure"""
+        if not self.breaker.allow():
+            self._record(RequestMetrics(url, None, 0.0, 0, 0, 'circuit open'))
+            raise CircuitOpenError(f"Circuit open for {url}")
+
+        started = time.perf_counter()
+        attempt = 0
+        settled = False
+        try:
+            while True:
+                attempt += 1
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                    if response.status_code in self.RETRY_STATUSES:
+                        raise requests.HTTPError(f"{response.status_code} from {url}", response=response)
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    status = e.response.status_code if e.response is not None else None
+                    retryable = status in self.RETRY_STATUSES or \
+                        (status is None and isinstance(e, self.TRANSIENT_ERRORS))
+                    if retryable and attempt <= self.max_retries:
+                        delay = self.backoff(attempt - 1)
+                        logging.debug(f"Retrying {url} in {delay:.2f}s after: {e}")
+                        with self._metrics_lock:
+                            self.total_retries += 1
+                        time.sleep(delay)
+                        continue
+                    if status is not None and status < 500 and status not in self.RETRY_STATUSES:
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_failure()
+                    settled = True
+                    self._record(RequestMetrics(url, status, time.perf_counter() - started,
+                                                attempt, 0, str(e)))
+                    raise
+
+                self.breaker.record_success()
+                settled = True
+                self._record(RequestMetrics(url, response.status_code, time.perf_counter() - started,
+                                            attempt, len(response.content)))
+                return response
+        finally:
+            # Anything unexpected must not leave a half-open trial running forever
+            if not settled:
+                self.breaker.release()
+
+    @property
+    def last_metrics(self) -> Optional[RequestMetrics]:
+        return self.history[-1] if self.history else None
+
+    def metrics(self) -> Dict:
+        """Returns aggregate request metrics and the breaker state"""
+        with self._metrics_lock:
+            latencies: List[float] = [m.latency for m in self.history if m.attempts]
+            return {
+                'requests': self.total_requests,
+                'errors': self.total_errors,
+                'retries': self.total_retries,
+                'avg_latency': sum(latencies) / len(latencies) if latencies else None,
+                'max_latency': max(latencies) if latencies else None,
+                'breaker_state': self.breaker.state,
+                'last': self.history[-1]._asdict() if self.history else None,
+            }
+
+    def close(self):
+        self.session.close()
+
+    def _record(self, metrics: RequestMetrics):
+        with self._metrics_lock:
+            self.total_requests += 1
+            if metrics.error is not None:
+                self.total_errors += 1
+            self.history.append(metrics)
@@ -0,0 +1,251 @@
+import bisect
+import functools
+import io
+import json
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class Histogram:
+    """Latency histogram with fixed, cumulative-exportable buckets (seconds)"""
+
+    BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.total / self.count if self.count else None,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'buckets': {str(bound): n for bound, n in zip(self.BUCKETS + ('+Inf',), self.counts)},
+        }
+
+
+class _NullTimer:
+    """Timer handed out while instrumentation is disabled; does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 'started', 'capture')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.capture = Metrics._start_capture(name)
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        if self.capture is not None:
+            Metrics._finish_capture(self.name, self.capture)
+        Metrics.observe(self.name, elapsed)
+        return False
+
+
+class Metrics:
+    """Process-wide timers, counters and latency histograms for hot paths.
+
+    Disabled by default: timer() then returns a shared no-op context
+    manager and count() returns immediately, so instrumented code pays one
+    attribute check. enable() turns collection on; snapshot(), to_json()
+    and to_prometheus() export what was collected.
+
+    For a closer look at single operations, capture() records a cProfile
+    or tracemalloc report every time one of the named timers runs; the
+    latest report per operation is kept in ``Metrics.captures``.
+
+    Usage:
+        with Metrics.timer('knmi.read_csv'):
+            ...
+
+        @Metrics.timed('stats.save')
+        def save(...): ...
+    """
+
+    CAPTURE_MODES = ('cprofile', 'tracemalloc')
+
+    enabled = False
+    captures: Dict[str, str] = {}
+    _histograms: Dict[str, Histogram] = {}
+    _counters: Dict[str, int] = {}
+    _capture_ops: Dict[str, str] = {}
+    _capture_lock = threading.Lock()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enable():
+        Metrics.enabled = True
+
+    @staticmethod
+    def disable():
+        Metrics.enabled = False
+
+    @staticmethod
+    def reset():
+        with Metrics._lock:
+            Metrics._histograms.clear()
+            Metrics._counters.clear()
+            Metrics.captures.clear()
+
+    @staticmethod
+    def timer(name: str):
+        """Context manager timing the enclosed block under ``name``"""
+        if not Metrics.enabled:
+            return _NULL_TIMER
+        return _Timer(name)
+
+    @staticmethod
+    def timed(name: str) -> Callable:
+        """Decorator timing every call of the function under ``name``"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not Metrics.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def count(name: str, amount: int = 1):
+        if not Metrics.enabled:
+            return
+        with Metrics._lock:
+            Metrics._counters[name] = Metrics._counters.get(name, 0) + amount
+
+    @staticmethod
+    def observe(name: str, seconds: float):
+        """Records one duration for ``name``"""
+        with Metrics._lock:
+            histogram = Metrics._histograms.get(name)
+            if histogram is None:
+                histogram = Metrics._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @staticmethod
+    def capture(operations: Iterable[str], mode: str = 'cprofile'):
+        """Records a cProfile or tracemalloc report whenever one of ``operations`` runs.
+
+        Captures only happen while instrumentation is enabled. Only one
+        operation is profiled at a time; overlapping runs are timed as usual
+        without a report.
+        """
+        if mode not in Metrics.CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {mode}")
+        for name in operations:
+            Metrics._capture_ops[name] = mode
+
+    @staticmethod
+    def stop_capture():
+        Metrics._capture_ops.clear()
+
+    @staticmethod
+    def snapshot() -> Dict:
+        with Metrics._lock:
+            return {
+                'timers': {name: h.as_dict() for name, h in sorted(Metrics._histograms.items())},
+                'counters': dict(sorted(Metrics._counters.items())),
+            }
+
+    @staticmethod
+    def to_json(indent: Optional[int] = 2) -> str:
+        return json.dumps(Metrics.snapshot(), indent=indent)
+
+    @staticmethod
+    def to_prometheus(prefix: str = 'weather_app') -> str:
+        """Returns the metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with Metrics._lock:
+            if Metrics._histograms:
+                lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+            for name, histogram in sorted(Metrics._histograms.items()):
+                label = f'operation="{name}"'
+                cumulative = 0
+                for bound, n in zip(Histogram.BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_duration_seconds_sum{{{label}}} {histogram.total}')
+                lines.append(f'{prefix}_duration_seconds_count{{{label}}} {histogram.count}')
+            if Metrics._counters:
+                lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(Metrics._counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _start_capture(name: str):
+        mode = Metrics._capture_ops.get(name)
+        if mode is None or not Metrics._capture_lock.acquire(blocking=False):
+            return None
+        if mode == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. cli.py --profile) is already active
+                Metrics._capture_lock.release()
+                return None
+            return profiler
+
+        import tracemalloc
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return (tracemalloc.take_snapshot(), already_tracing)
+
+    @staticmethod
+    def _finish_capture(name: str, capture):
+        try:
+            if isinstance(capture, tuple):
+                import tracemalloc
+                before, already_tracing = capture
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                if not already_tracing:
+                    tracemalloc.stop()
+                top = after.compare_to(before, 'lineno')[:15]
+                report = f"peak: {peak / 1024:.1f} KiB\n" + "\n".join(str(stat) for stat in top)
+            else:
+                import pstats
+                capture.disable()
+                stream = io.StringIO()
+                pstats.Stats(capture, stream=stream).sort_stats('cumulative').print_stats(20)
+                report = stream.getvalue()
+            Metrics.captures[name] = report
+        finally:
+            Metrics._capture_lock.release()
@@ -0,0 +1,22 @@
+import math
+from typing import Any
+
+import numpy as np
+
+
+def json_safe(value: Any) -> Any:
+    """Returns ``value`` with NaN and infinite floats replaced by None.
+
+    JSON has no NaN or Infinity, and ``json.dumps`` would otherwise write
+    them as bare tokens that strict parsers reject. Dicts, lists and tuples
+    are converted recursively; NumPy scalars become Python numbers.
+    """
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
@@ -0,0 +1,104 @@
+import logging
+from typing import Iterable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+ONE_DAY = pd.Timedelta(days=1)
+
+
+class KNMIDataset:
+    """A loaded data file kept sorted by DATE for binary-search range queries.
+
+    Ordering problems are fixed once here: rows with an unparseable date
+    are dropped, unsorted files are sorted (stably) and duplicate dates are
+    collapsed according to ``duplicates`` ('first', 'last' or 'mean').
+    Frames with a STATION column may hold several stations: a date is then
+    a duplicate only within its station, and all stations' rows are kept.
+    Afterwards a date range is located with two ``searchsorted`` calls and
+    returned as a positional slice of the frame.
+
+    The default 'first' is also the rule streamed files follow (see
+    streaming_stats.drop_duplicates), so both give the same statistics.
+    """
+
+    DUPLICATE_POLICIES = ('first', 'last', 'mean')
+
+    def __init__(self, frame: pd.DataFrame, duplicates: str = 'first'):
+        if duplicates not in self.DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy: {duplicates}")
+        self.frame = self.normalize(frame, duplicates)
+        self.dates = self.frame['DATE'].to_numpy()
+        # Prefix count of rows that start a new calendar day, built on first use
+        self._day_starts = None
+
+    @staticmethod
+    def normalize(frame: pd.DataFrame, duplicates: str = 'first') -> pd.DataFrame:
+        """Returns the frame sorted by DATE with unique dates per station (no copy if already so)"""
+        dates = frame['DATE'].to_numpy()
+        if len(dates) and np.isnat(dates).any():
+            logging.warning(f"Dropping {int(np.isnat(dates).sum())} rows without a valid date")
+            frame = frame.loc[~np.isnat(dates)]
+            dates = frame['DATE'].to_numpy()
+
+        if len(dates) < 2 or bool((dates[1:] > dates[:-1]).all()):
+            return frame.reset_index(drop=True) if not isinstance(frame.index, pd.RangeIndex) else frame
+
+        if not bool((dates[1:] >= dates[:-1]).all()):
+            logging.info("Data file is not sorted by date; sorting once at load time")
+            frame = frame.sort_values('DATE', kind='mergesort')
+
+        keys = ['DATE', 'STATION'] if 'STATION' in frame.columns else ['DATE']
+        duplicated = frame.duplicated(keys, keep=False)
+        if duplicated.any():
+            logging.warning(f"Collapsing {int(duplicated.sum())} rows with duplicate dates ({duplicates})")
+            if duplicates == 'mean':
+                frame = frame.groupby(keys, as_index=False, sort=True).mean(numeric_only=True)
+            else:
+                frame = frame.drop_duplicates(keys, keep=duplicates)
+        return frame.reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def bounds(self, start: DateLike, end: DateLike) -> Tuple[int, int]:
+        """Returns the [i, j) row positions of the inclusive date range.
+
+        The end date includes its whole day, so hourly rows are covered too.
+        """
+        with Metrics.timer('dataset.filter'):
+            start = pd.Timestamp(start).to_datetime64().astype(self.dates.dtype)
+            stop = (pd.Timestamp(end).normalize() + ONE_DAY).to_datetime64().astype(self.dates.dtype)
+            i = int(np.searchsorted(self.dates, start, side='left'))
+            j = int(np.searchsorted(self.dates, stop, side='left'))
+            return i, max(i, j)
+
+    def bounds_many(self, starts: Iterable[DateLike], ends: Iterable[DateLike]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorised bounds(): row positions for many inclusive date ranges at once"""
+        with Metrics.timer('dataset.filter_many'):
+            starts = pd.to_datetime(pd.Index(starts)).to_numpy().astype(self.dates.dtype)
+            stops = (pd.to_datetime(pd.Index(ends)).normalize() + ONE_DAY).to_numpy().astype(self.dates.dtype)
+            i = np.searchsorted(self.dates, starts, side='left')
+            j = np.searchsorted(self.dates, stops, side='left')
+            return i, np.maximum(i, j)
+
+    def day_counts(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Number of distinct calendar days among the rows [i, j) of each range"""
+        if self._day_starts is None:
+            days = self.dates.astype('datetime64[D]')
+            starts = np.ones(len(days), dtype=bool)
+            starts[1:] = days[1:] != days[:-1]
+            self._day_starts = np.concatenate(([0], np.cumsum(starts)))
+        i, j = np.asarray(i), np.asarray(j)
+        counts = self._day_starts[j] - self._day_starts[i]
+        # A range beginning in the middle of a day also counts that day
+        mid_day = (j > i) & (self._day_starts[np.minimum(i + 1, len(self.dates))] == self._day_starts[i])
+        return counts + mid_day
+
+    def slice(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """Returns the rows between start and end (inclusive) as a slice"""
+        i, j = self.bounds(start, end)
+        return self.frame.iloc[i:j]
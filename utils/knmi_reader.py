@@ -0,0 +1,166 @@
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+
+
+class KNMIReader:
+    """Typed, column-pruned reader for KNMI data files.
+
+    Two layouts are supported:
+
+    * ``csv``: the application's own format with ``DATE`` (YYYY-MM-DD),
+      ``TEMP``, ``PRECIPITATION`` and ``AIRPRESSURE`` columns.
+    * ``knmi``: the KNMI daily-data download (``etmgeg_*.txt`` / the
+      daggegevens script output), with a ``#`` comment header, a
+      ``STN,YYYYMMDD,...`` column line and values in tenths of a unit.
+      Hourly files (``uurgeg_*.txt``, with an ``HH`` column) are read the
+      same way, with the hour added to DATE.
+
+    Both are returned in the ``csv`` shape with float64 value columns and a
+    ``datetime64`` DATE column.
+    """
+
+    VALUE_COLUMNS = ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')
+    VALUE_DTYPE = np.float64
+    DATE_FORMAT = '%Y-%m-%d'
+    ENGINES = ('c', 'python', 'pyarrow')
+
+    # KNMI daily field -> application column; all are stored in tenths
+    KNMI_FIELDS = {
+        'TG': 'TEMP',           # daily mean temperature, 0.1 °C
+        'RH': 'PRECIPITATION',  # daily precipitation, 0.1 mm (-1 means < 0.05 mm)
+        'PG': 'AIRPRESSURE',    # daily mean sea-level pressure, 0.1 hPa
+    }
+    # Same for the hourly layout (uurgeg_*.txt), recognised by its HH column
+    KNMI_HOURLY_FIELDS = {
+        'T': 'TEMP',            # temperature, 0.1 °C
+        'RH': 'PRECIPITATION',  # hourly precipitation, 0.1 mm (-1 means < 0.05 mm)
+        'P': 'AIRPRESSURE',     # sea-level pressure, 0.1 hPa
+    }
+    KNMI_DATE_FORMAT = '%Y%m%d'
+    HEADER_SCAN_LINES = 200
+
+    @staticmethod
+    def read(file_path: str, columns: Optional[Iterable[str]] = None,
+             engine: str = 'c', layout: Optional[str] = None,
+             include_station: bool = False) -> pd.DataFrame:
+        """Reads DATE plus the requested value columns (all of them by default)"""
+        options, convert = KNMIReader._prepare(file_path, columns, engine, layout, include_station)
+        with Metrics.timer('knmi.read_csv'):
+            return convert(pd.read_csv(file_path, **options))
+
+    @staticmethod
+    def iter_chunks(file_path: str, columns: Optional[Iterable[str]] = None,
+                    chunksize: int = 500_000, engine: str = 'c', layout: Optional[str] = None,
+                    include_station: bool = False) -> Iterator[pd.DataFrame]:
+        """Yields the file as typed frames of at most ``chunksize`` rows"""
+        options, convert = KNMIReader._prepare(file_path, columns, engine, layout, include_station)
+        if options['engine'] == 'pyarrow':
+            # The pyarrow engine cannot read in chunks
+            options['engine'] = 'c'
+        with pd.read_csv(file_path, chunksize=chunksize, **options) as reader:
+            while True:
+                with Metrics.timer('knmi.read_chunk'):
+                    chunk = next(reader, None)
+                    if chunk is None:
+                        return
+                    chunk = convert(chunk)
+                yield chunk
+
+    @staticmethod
+    def detect_layout(file_path: str) -> Tuple[str, int, List[str]]:
+        """Returns (layout, header line number, header fields) for a file"""
+        with open(file_path, encoding='latin-1') as f:
+            for line_no, line in enumerate(f):
+                if line_no >= KNMIReader.HEADER_SCAN_LINES:
+                    break
+                stripped = line.lstrip('#').strip()
+                fields = [field.strip() for field in stripped.split(',')]
+                if 'YYYYMMDD' in fields:
+                    return 'knmi', line_no, fields
+                if 'DATE' in fields:
+                    return 'csv', line_no, fields
+        return 'csv', 0, []
+
+    @staticmethod
+    def has_station(file_path: str) -> bool:
+        """Returns True if the file has a station column (STN, or STATION in the csv layout)"""
+        layout, _, fields = KNMIReader.detect_layout(file_path)
+        return ('STN' if layout == 'knmi' else 'STATION') in fields
+
+    @staticmethod
+    def _prepare(file_path: str, columns: Optional[Iterable[str]], engine: str,
+                 layout: Optional[str], include_station: bool) -> Tuple[Dict, Callable]:
+        """Returns read_csv options and the conversion to apply to what it returns"""
+        if engine not in KNMIReader.ENGINES:
+            raise ValueError(f"Unknown parser engine: {engine}")
+        columns = list(columns) if columns is not None else list(KNMIReader.VALUE_COLUMNS)
+        detected, header_line, fields = KNMIReader.detect_layout(file_path)
+        if (layout or detected) == 'knmi':
+            return KNMIReader._knmi_options(columns, engine, header_line, fields, include_station)
+        return KNMIReader._csv_options(columns, engine, include_station)
+
+    @staticmethod
+    def _csv_options(columns: List[str], engine: str,
+                     include_station: bool) -> Tuple[Dict, Callable]:
+        usecols = ['DATE'] + columns
+        if include_station:
+            usecols.append('STATION')
+        options = {
+            'usecols': usecols,
+            'dtype': {column: KNMIReader.VALUE_DTYPE for column in columns},
+            'parse_dates': ['DATE'],
+            'date_format': KNMIReader.DATE_FORMAT,
+            'engine': engine,
+        }
+        return options, lambda df: df[usecols]
+
+    @staticmethod
+    def _knmi_options(columns: List[str], engine: str, header_line: int,
+                      fields: List[str], include_station: bool) -> Tuple[Dict, Callable]:
+        hourly = 'HH' in fields
+        field_map = KNMIReader.KNMI_HOURLY_FIELDS if hourly else KNMIReader.KNMI_FIELDS
+        sources = {target: source for source, target in field_map.items()}
+        missing = [sources[c] for c in columns if sources.get(c) not in fields]
+        if missing:
+            raise ValueError(f"KNMI file lacks fields: {', '.join(missing)}")
+
+        if engine == 'pyarrow':
+            # Padded fixed-width values are not accepted by the pyarrow parser
+            logging.debug("pyarrow engine does not support the KNMI layout, using 'c'")
+            engine = 'c'
+
+        usecols = ['YYYYMMDD'] + (['HH'] if hourly else []) + [sources[c] for c in columns]
+        if include_station:
+            usecols.append('STN')
+        options = {
+            'skiprows': header_line + 1,
+            'header': None,
+            'names': fields,
+            'usecols': usecols,
+            'dtype': {field: KNMIReader.VALUE_DTYPE for field in usecols if field not in ('YYYYMMDD', 'HH', 'STN')},
+            'skipinitialspace': True,
+            'comment': '#',
+            'engine': engine,
+        }
+
+        def convert(raw: pd.DataFrame) -> pd.DataFrame:
+            dates = pd.to_datetime(raw['YYYYMMDD'].astype(str), format=KNMIReader.KNMI_DATE_FORMAT)
+            if hourly:
+                # HH runs 1..24 and labels the hour ending at HH:00 UT
+                dates = dates + pd.to_timedelta(raw['HH'].to_numpy() - 1, unit='h')
+            df = pd.DataFrame({'DATE': dates})
+            for column in columns:
+                values = raw[sources[column]].to_numpy(dtype=KNMIReader.VALUE_DTYPE)
+                if column == 'PRECIPITATION':
+                    values = np.where(values == -1, 0, values)
+                df[column] = (values / 10).astype(KNMIReader.VALUE_DTYPE)
+            if include_station:
+                df['STATION'] = raw['STN'].astype(str).str.strip()
+            return df
+
+        return options, convert
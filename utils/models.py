@@ -0,0 +1,120 @@
+import math
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+
+class StationMeasurement:
+    """One ``stationmeasurements`` entry as a compact, slotted object.
+
+    Built once when a feed is ingested: numeric fields are validated
+    (unreadable or non-finite values become None) and the timestamp is
+    parsed into ``measured_at``, so readers never have to coerce or parse
+    the raw feed values again.
+    """
+
+    # (field, type) pairs, in feed order; every field may be missing (None)
+    FIELDS = (
+        ('stationid', int),
+        ('stationname', str),
+        ('regio', str),
+        ('lat', float),
+        ('lon', float),
+        ('timestamp', str),
+        ('weatherdescription', str),
+        ('winddirection', str),
+        ('temperature', float),
+        ('groundtemperature', float),
+        ('feeltemperature', float),
+        ('windspeed', float),
+        ('windspeedBft', int),
+        ('windgusts', float),
+        ('humidity', float),
+        ('precipitation', float),
+        ('rainFallLastHour', float),
+        ('rainFallLast24Hour', float),
+        ('sunpower', float),
+        ('airpressure', float),
+        ('visibility', float),
+    )
+    FIELD_NAMES = tuple(name for name, _ in FIELDS)
+    __slots__ = FIELD_NAMES + ('measured_at',)
+
+    def __init__(self, **values):
+        self._fill(values.get(name) for name in self.FIELD_NAMES)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StationMeasurement":
+        record = cls.__new__(cls)
+        record._fill(data.get(name) for name in cls.FIELD_NAMES)
+        return record
+
+    @classmethod
+    def from_values(cls, values: Iterable) -> "StationMeasurement":
+        """Builds a measurement from field values given in FIELDS order"""
+        record = cls.__new__(cls)
+        record._fill(values)
+        return record
+
+    def _fill(self, values: Iterable):
+        for (name, kind), value in zip(self.FIELDS, values):
+            # Ints and strings of the right type are kept; floats still need the finiteness check
+            if value is not None and (type(value) is not kind or kind is float):
+                value = _COERCE[kind](value)
+            setattr(self, name, value)
+        self.measured_at = self.parse_timestamp(self.timestamp)
+
+    @staticmethod
+    def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+        """Parses a feed timestamp, or returns None if it is missing or unreadable"""
+        if not timestamp:
+            return None
+        try:
+            return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    def get(self, name: str, default=None):
+        """dict-style access, so measurements can stand in for raw station dicts"""
+        value = getattr(self, name, None)
+        return default if value is None else value
+
+    def __getitem__(self, name: str):
+        if name not in self.FIELD_NAMES:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def as_dict(self) -> Dict:
+        """Returns the feed fields as a plain dict (as in the feed, without measured_at)"""
+        return {name: getattr(self, name) for name in self.FIELD_NAMES}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, StationMeasurement):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELD_NAMES)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StationMeasurement({self.stationname!r}, stationid={self.stationid!r})"
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _to_str(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+_COERCE = {float: _to_float, int: _to_int, str: _to_str}
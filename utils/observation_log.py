@@ -0,0 +1,166 @@
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.knmi_dataset import ONE_DAY, DateLike
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class ObservationLog:
+    """Compact append-only log of live station readings.
+
+    Every reading is one fixed-size binary record (station id, timestamp,
+    temperature, precipitation, air pressure; 24 bytes), appended to a
+    single file. Reads load the file with one ``np.fromfile`` call.
+    compact() rewrites the log sorted by station and time with duplicate
+    readings removed; it runs automatically once ``compact_every`` records
+    have been appended since the last compaction.
+
+    Timestamps are stored as they appear in the feed (Dutch local time,
+    without time zone) in seconds since 1970-01-01. PRECIPITATION is the
+    feed's ``rainFallLast24Hour`` running total, as in the time-series
+    store, so the last reading of a day is that day's precipitation. Values are stored as
+    float32 and read back as float64 rounded to DECIMALS.
+    """
+
+    DEFAULT_PATH = "data/observations.log"
+    RECORD = np.dtype([
+        ('station', '<i4'),
+        ('time', '<i8'),
+        ('TEMP', '<f4'),
+        ('PRECIPITATION', '<f4'),
+        ('AIRPRESSURE', '<f4'),
+    ])
+    VARIABLES = ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')
+    DECIMALS = 1
+
+    # Buienradar feed field -> log column
+    FEED_FIELDS = {
+        'temperature': 'TEMP',
+        'rainFallLast24Hour': 'PRECIPITATION',
+        'airpressure': 'AIRPRESSURE',
+    }
+
+    def __init__(self, path: str = DEFAULT_PATH, compact_every: int = 50_000):
+        self.path = path
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._appended = 0
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    @staticmethod
+    def to_seconds(timestamp: Union[str, datetime, None]) -> Optional[int]:
+        """Converts a feed timestamp to log time, or None if it is unreadable"""
+        if isinstance(timestamp, datetime):
+            moment = timestamp
+        else:
+            try:
+                moment = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        return int((moment.replace(tzinfo=None) - EPOCH).total_seconds())
+
+    @staticmethod
+    def _number(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def records_from_feed(self, stations: Iterable) -> np.ndarray:
+        """Converts feed stations (measurements or dicts) to log records, skipping unusable ones"""
+        rows = []
+        for station in stations:
+            station_id = station.get('stationid')
+            measured_at = getattr(station, 'measured_at', None)
+            seconds = self.to_seconds(measured_at or station.get('timestamp'))
+            if station_id is None or seconds is None:
+                continue
+            rows.append((int(station_id), seconds) +
+                        tuple(self._number(station.get(field)) for field in self.FEED_FIELDS))
+        return np.array(rows, dtype=self.RECORD)
+
+    def append(self, records: np.ndarray) -> int:
+        """Appends records to the log; returns how many were written"""
+        if not len(records):
+            return 0
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                records.astype(self.RECORD, copy=False).tofile(f)
+            self._appended += len(records)
+            compact = self._appended >= self.compact_every
+        if compact:
+            self.compact()
+        return len(records)
+
+    def read(self) -> np.ndarray:
+        """Returns all records in the log"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return np.empty(0, dtype=self.RECORD)
+            size = os.path.getsize(self.path)
+            # A torn last record (e.g. after a crash) is ignored
+            count = size // self.RECORD.itemsize
+            return np.fromfile(self.path, dtype=self.RECORD, count=count)
+
+    def latest_times(self) -> Dict[int, int]:
+        """Returns the newest logged timestamp per station"""
+        records = self.read()
+        latest: Dict[int, int] = {}
+        if len(records):
+            order = np.lexsort((records['time'], records['station']))
+            last = order[np.r_[records['station'][order][1:] != records['station'][order][:-1], True]]
+            latest = dict(zip(records['station'][last].tolist(), records['time'][last].tolist()))
+        return latest
+
+    def compact(self) -> int:
+        """Sorts the log by station and time and drops duplicate readings"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return 0
+            count = os.path.getsize(self.path) // self.RECORD.itemsize
+            records = np.fromfile(self.path, dtype=self.RECORD, count=count)
+            order = np.lexsort((records['time'], records['station']))
+            records = records[order]
+            if len(records):
+                # Keep the last written record for each (station, time)
+                keep = np.r_[(records['station'][1:] != records['station'][:-1]) |
+                             (records['time'][1:] != records['time'][:-1]), True]
+                records = records[keep]
+            tmp_path = self.path + '.tmp'
+            records.tofile(tmp_path)
+            os.replace(tmp_path, self.path)
+            self._appended = 0
+            logging.info(f"Compacted observation log to {len(records)} records")
+            return len(records)
+
+    def read_frame(self, station=None, start: Optional[DateLike] = None,
+                   end: Optional[DateLike] = None) -> pd.DataFrame:
+        """Returns readings as DATE/TEMP/PRECIPITATION/AIRPRESSURE sorted by DATE.
+
+        ``station`` is a Buienradar station id; ``end`` includes its whole day.
+        """
+        records = self.read()
+        mask = np.ones(len(records), dtype=bool)
+        if station is not None:
+            mask &= records['station'] == int(station)
+        if start is not None:
+            mask &= records['time'] >= self.to_seconds(pd.Timestamp(start).isoformat())
+        if end is not None:
+            stop = pd.Timestamp(end).normalize() + ONE_DAY
+            mask &= records['time'] < self.to_seconds(stop.isoformat())
+        records = records[mask]
+        records = records[np.argsort(records['time'], kind='stable')]
+
+        frame = pd.DataFrame({'DATE': pd.to_datetime(records['time'], unit='s')})
+        if station is None:
+            frame['STATION'] = records['station']
+        for variable in self.VARIABLES:
+            frame[variable] = records[variable].astype(np.float64).round(self.DECIMALS)
+        return frame
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional, Tuple
+
+from utils.models import StationMeasurement
+from utils.station_snapshot import StationSnapshot
+
+
+class SnapshotDelta:
+    """Per-station differences between two consecutive feed snapshots.
+
+    ``added`` and ``removed`` map station keys to StationMeasurement
+    objects; ``changed`` maps station keys to ``{field: (old, new)}``.
+    ``stations`` holds the new measurement for every added or changed
+    station.
+    """
+
+    __slots__ = ('version', 'added', 'removed', 'changed', 'stations')
+
+    def __init__(self, version: int):
+        self.version = version
+        self.added: Dict[Any, StationMeasurement] = {}
+        self.removed: Dict[Any, StationMeasurement] = {}
+        self.changed: Dict[Any, Dict[str, Tuple[Any, Any]]] = {}
+        self.stations: Dict[Any, StationMeasurement] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (f"SnapshotDelta(version={self.version}, added={len(self.added)}, "
+                f"removed={len(self.removed)}, changed={len(self.changed)})")
+
+    def touches(self, key) -> bool:
+        """Returns True if the station with this key was added, changed or removed"""
+        return key in self.stations or key in self.removed
+
+
+def diff_snapshots(old: Optional[StationSnapshot], new: StationSnapshot) -> SnapshotDelta:
+    """Computes the per-station delta from ``old`` to ``new``.
+
+    Unchanged stations cost one field-by-field comparison each; field-level
+    differences are only worked out for stations that did change.
+    """
+    delta = SnapshotDelta(new.version)
+    previous = old.by_key if old is not None else {}
+
+    for key, station in new.by_key.items():
+        before = previous.get(key)
+        if before is None:
+            delta.added[key] = station
+            delta.stations[key] = station
+        elif before != station:
+            fields = {}
+            for field in StationMeasurement.FIELD_NAMES:
+                old_value = getattr(before, field)
+                new_value = getattr(station, field)
+                if old_value != new_value:
+                    fields[field] = (old_value, new_value)
+            delta.changed[key] = fields
+            delta.stations[key] = station
+
+    for key, station in previous.items():
+        if key not in new.by_key:
+            delta.removed[key] = station
+    return delta
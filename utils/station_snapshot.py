@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.models import StationMeasurement
+
+
+class StationSnapshot:
+    """Indexed view of one version of the ``stationmeasurements`` feed section.
+
+    Stations are held as StationMeasurement objects; raw feed dicts are
+    converted once here. All indexes are built once in the constructor, so
+    lookups by name, id, region or combobox display name are plain dict
+    reads.
+    """
+
+    def __init__(self, stations: Iterable, version: int = 0):
+        self.version = version
+        self.measurements: List[StationMeasurement] = [
+            station if isinstance(station, StationMeasurement) else StationMeasurement.from_dict(station)
+            for station in stations
+        ]
+        self.stations: List[Tuple[str, str]] = []
+        self.display_names: List[str] = []
+        self._by_name: Dict[str, StationMeasurement] = {}
+        self._by_id: Dict[int, StationMeasurement] = {}
+        self._by_region: Dict[str, List[StationMeasurement]] = {}
+        self._by_display: Dict[str, StationMeasurement] = {}
+        # Station id, or name for stations without one; used for diffing
+        self.by_key: Dict = {}
+
+        for station in self.measurements:
+            name = station.stationname
+            region = station.regio
+            display_name = f"{name} ({region})"
+
+            self.stations.append((name, region))
+            self.display_names.append(display_name)
+            self._by_name.setdefault(name.lower(), station)
+            self._by_display.setdefault(display_name, station)
+            self._by_region.setdefault(region.lower(), []).append(station)
+            if station.stationid is not None:
+                self._by_id[station.stationid] = station
+            self.by_key[self.station_key(station)] = station
+
+    @classmethod
+    def from_feed(cls, data: Dict, version: int = 0) -> "StationSnapshot":
+        """Builds a snapshot from a full Buienradar feed document"""
+        return cls(data['actual']['stationmeasurements'], version)
+
+    @staticmethod
+    def station_key(station):
+        """Returns the key identifying a station across snapshots"""
+        station_id = station.get('stationid')
+        return station_id if station_id is not None else station['stationname']
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def get(self, station_name: str) -> Optional[StationMeasurement]:
+        """Returns a station by name (case-insensitive)"""
+        return self._by_name.get(station_name.lower())
+
+    def get_by_id(self, station_id: int) -> Optional[StationMeasurement]:
+        """Returns a station by its Buienradar station id"""
+        return self._by_id.get(station_id)
+
+    def get_by_display_name(self, display_name: str) -> Optional[StationMeasurement]:
+        """Returns a station by the "name (region)" label shown in the GUI"""
+        return self._by_display.get(display_name)
+
+    def in_region(self, region: str) -> List[StationMeasurement]:
+        """Returns all stations in a region (case-insensitive)"""
+        return list(self._by_region.get(region.lower(), ()))
+
+    def regions(self) -> List[str]:
+        """Returns the region names present in this snapshot"""
+        return [stations[0].regio for stations in self._by_region.values()]
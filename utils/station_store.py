@@ -0,0 +1,37 @@
+import json
+import os
+import logging
+from typing import List, Tuple
+
+
+class StationListStore:
+    """Persists the last known station list so the GUI can start without the network"""
+
+    DEFAULT_PATH = "data/cache/stations.json"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+
+    def load(self) -> List[Tuple[str, str]]:
+        """Returns the saved (stationname, regio) pairs, or [] if none are stored"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return [(name, region) for name, region in json.load(f)]
+        except FileNotFoundError:
+            return []
+        except (ValueError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable station list {self.path}: {e}")
+            return []
+
+    def save(self, stations: List[Tuple[str, str]]) -> bool:
+        """Atomically replaces the saved station list"""
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([list(station) for station in stations], f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logging.error(f"Error saving station list: {e}")
+            return False
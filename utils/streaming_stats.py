@@ -0,0 +1,193 @@
+import logging
+import math
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+from utils.knmi_dataset import ONE_DAY, DateLike
+
+# drop_duplicates() remembers the dates up to this many days behind each
+# station's latest one
+DUPLICATE_WINDOW_DAYS = 7
+
+
+class RunningStats:
+    """Count, sum, min, max, mean and variance of a stream of values.
+
+    Memory use is constant. Values are added a chunk at a time: each chunk's
+    own count/mean/M2 is computed with NumPy and folded in with the
+    pairwise form of Welford's update (Chan et al.), which is also what
+    merge() uses to combine partial results. NaNs are ignored.
+    """
+
+    __slots__ = ('count', 'total', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        chunk = RunningStats()
+        chunk.count = len(values)
+        chunk.total = float(values.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Folds another partial result into this one"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (NaN for fewer than two values)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    def as_dict(self) -> Dict:
+        empty = self.count == 0
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': math.nan if empty else self.mean,
+            'min': math.nan if empty else self.minimum,
+            'max': math.nan if empty else self.maximum,
+            'std': self.std,
+        }
+
+
+class PeriodAccumulator:
+    """Running statistics for the Statistics tab columns over one period"""
+
+    def __init__(self, columns: Iterable[str] = ('TEMP', 'PRECIPITATION')):
+        self.columns: Dict[str, RunningStats] = {column: RunningStats() for column in columns}
+        self.rows = 0
+
+    def update(self, frame: pd.DataFrame):
+        self.rows += len(frame)
+        with Metrics.timer('stats.accumulate'):
+            for column, stats in self.columns.items():
+                stats.update(frame[column].to_numpy())
+
+    def merge(self, other: "PeriodAccumulator") -> "PeriodAccumulator":
+        self.rows += other.rows
+        for column, stats in self.columns.items():
+            stats.merge(other.columns[column])
+        return self
+
+    def result(self) -> Optional[Dict]:
+        """Returns the period statistics, or None if no rows were seen"""
+        if self.rows == 0:
+            return None
+        temp = self.columns['TEMP']
+        precipitation = self.columns['PRECIPITATION']
+        empty = temp.count == 0
+        return {
+            'max_temp': math.nan if empty else temp.maximum,
+            'min_temp': math.nan if empty else temp.minimum,
+            'avg_temp': math.nan if empty else temp.mean,
+            'total_precipitation': precipitation.total,
+            'std_temp': temp.std,
+        }
+
+
+def filter_period(chunks: Iterable[pd.DataFrame], start: DateLike, end: DateLike,
+                  sorted_input: bool = False) -> Iterator[pd.DataFrame]:
+    """Yields the rows of each chunk that fall in the inclusive date range.
+
+    With ``sorted_input`` the stream is abandoned at the first row past the
+    end date, so the rest of the file is never read.
+    """
+    start = pd.Timestamp(start)
+    stop = pd.Timestamp(end).normalize() + ONE_DAY
+    for chunk in chunks:
+        with Metrics.timer('dataset.filter_chunk'):
+            dates = chunk['DATE']
+            if sorted_input and len(chunk) and dates.iloc[-1] < start:
+                continue
+            in_range = chunk[(dates >= start) & (dates < stop)]
+            past_end = sorted_input and len(chunk) and dates.iloc[-1] >= stop
+        if len(in_range):
+            yield in_range
+        if past_end:
+            return
+
+
+def drop_duplicates(chunks: Iterable[pd.DataFrame],
+                    window_days: int = DUPLICATE_WINDOW_DAYS) -> Iterator[pd.DataFrame]:
+    """Yields each chunk without the rows whose date was already seen for their station.
+
+    The first row of a date wins, as with KNMIDataset's default policy, so
+    a streamed file gives the same statistics as a loaded one. Without a
+    STATION column the file is one station. Per station only the dates
+    within ``window_days`` of its latest date are remembered, so memory stays
+    bounded and time linear however long the file is. Date-sorted files
+    (per station) are deduplicated exactly; a row arriving more than
+    ``window_days`` behind its station's latest date cannot be checked and is
+    kept, which is logged.
+    """
+    window = window_days * ONE_DAY.value
+    recent: Dict = {}
+    dropped = unchecked = 0
+    for chunk in chunks:
+        with Metrics.timer('dataset.dedupe_chunk'):
+            has_station = 'STATION' in chunk.columns
+            keep = ~chunk.duplicated(['DATE', 'STATION'] if has_station else ['DATE']).to_numpy()
+            dates = chunk['DATE'].to_numpy().astype('datetime64[ns]').view(np.int64)
+            if has_station:
+                groups = chunk.groupby('STATION', sort=False).indices
+            else:
+                groups = {None: np.arange(len(chunk))}
+            for station, rows in groups.items():
+                rows = rows[keep[rows]]
+                stamps = dates[rows]
+                known = recent.get(station)
+                if known is not None:
+                    seen = np.isin(stamps, known)
+                    keep[rows[seen]] = False
+                    unchecked += int(np.count_nonzero(stamps < known[-1] - window))
+                    stamps = np.union1d(known, stamps[~seen])
+                else:
+                    stamps = np.unique(stamps)
+                if len(stamps):
+                    # Sorted, so the dates still inside the window are a suffix
+                    recent[station] = stamps[stamps.searchsorted(stamps[-1] - window):]
+        dropped += len(chunk) - int(keep.sum())
+        if keep.all():
+            yield chunk
+        elif keep.any():
+            yield chunk[keep]
+    if dropped:
+        logging.warning(f"Skipped {dropped} rows with duplicate dates (first)")
+    if unchecked:
+        logging.warning(f"{unchecked} rows were more than {window_days} days out of date order; "
+                        f"duplicates among them were kept")
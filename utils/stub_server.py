@@ -0,0 +1,101 @@
+import json
+import hashlib
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StubFeedServer:
+    """Local stand-in for the Buienradar feed, used for testing and benchmarks.
+
+    Serves a fixed JSON document on every path, honours ``If-None-Match``
+    and ``If-Modified-Since`` and counts the requests it receives.
+
+    Usage:
+        with StubFeedServer(feed) as server:
+            BuienradarAPI.configure_cache(base_url=server.url)
+    """
+
+    def __init__(self, feed: Dict, host: str = "127.0.0.1", port: int = 0):
+        self.requests = 0
+        self.not_modified = 0
+        self.delay = 0.0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+        self.set_feed(feed)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/2.0/feed/json"
+
+    def set_feed(self, feed: Dict):
+        """Publishes a new feed version"""
+        body = json.dumps(feed).encode('utf-8')
+        with self._lock:
+            self._body = body
+            self._etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._last_modified = formatdate(usegmt=True)
+
+    def start(self) -> "StubFeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubFeedServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        if self.delay:
+            threading.Event().wait(self.delay)
+        with self._lock:
+            self.requests += 1
+            body, etag, last_modified = self._body, self._etag, self._last_modified
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                handler.send_response(503)
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+
+        if_none_match = handler.headers.get('If-None-Match')
+        if if_none_match is not None:
+            not_modified = if_none_match == etag
+        else:
+            not_modified = handler.headers.get('If-Modified-Since') == last_modified
+        if not_modified:
+            with self._lock:
+                self.not_modified += 1
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', etag)
+        handler.send_header('Last-Modified', last_modified)
+        handler.end_headers()
+        handler.wfile.write(body)
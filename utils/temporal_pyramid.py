@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import Metrics
+from utils.knmi_dataset import DateLike, KNMIDataset
+
+DAY_NS = 86_400 * 10 ** 9
+# 1970-01-01 is a Thursday; shifting by 3 days makes weeks start on Monday
+WEEK_OFFSET = 3
+
+
+def bucket_bounds(days: np.ndarray, level: str) -> Tuple[np.ndarray, np.ndarray]:
+    """First day and first day after the bucket (days since 1970) of each day"""
+    if level == 'week':
+        start = (days + WEEK_OFFSET) // 7 * 7 - WEEK_OFFSET
+        return start, start + 7
+    unit = {'month': 'M', 'year': 'Y'}[level]
+    periods = days.astype('datetime64[D]').astype(f'datetime64[{unit}]')
+    return (periods.astype('datetime64[D]').astype(np.int64),
+            (periods + 1).astype('datetime64[D]').astype(np.int64))
+
+
+class TemporalPyramid:
+    """Pre-aggregated yearly, monthly and weekly buckets over a date-sorted series.
+
+    Each bucket holds, per column, the count, sum, sum of squares, minimum
+    and maximum of its rows (NaNs do not count). A query covers the range
+    with the whole years inside it, then whole months and (ISO) weeks in
+    the remaining edges, and only the rows left over at the very edges are
+    read individually, so a multi-decade range combines a few hundred
+    values at most.
+
+    ``save()`` writes the pyramid as ``.npy`` files; ``load()`` maps the
+    rows memory-mapped, so a query on a loaded pyramid reads only the edge
+    rows it needs from disk.
+    """
+
+    LEVELS = ('year', 'month', 'week')
+    STATS = ('count', 'sum', 'square', 'min', 'max')
+    META = "meta.json"
+
+    def __init__(self, columns: Iterable[str], dates: np.ndarray, values: np.ndarray,
+                 shifts: np.ndarray, levels: Dict[str, Dict[str, np.ndarray]]):
+        self.columns = list(columns)
+        # Rows: timestamps in ns and values as [column][row]
+        self.dates = dates
+        self.values = values
+        # Squares are taken around each column's mean to limit cancellation
+        self.shifts = shifts
+        self.levels = levels
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def build(cls, dataset: KNMIDataset, columns: Iterable[str] = ('TEMP', 'PRECIPITATION')) -> "TemporalPyramid":
+        columns = list(columns)
+        with Metrics.timer('pyramid.build'):
+            dates = dataset.dates.astype('datetime64[ns]').astype(np.int64)
+            values = np.vstack([dataset.frame[column].to_numpy(dtype=np.float64) for column in columns]) \
+                if columns else np.empty((0, len(dates)))
+            valid = ~np.isnan(values)
+            shifts = np.array([values[k][valid[k]].mean() if valid[k].any() else 0.0
+                               for k in range(len(columns))])
+            shifted = values - shifts[:, None]
+            per_row = {
+                'count': valid.astype(np.float64),
+                'sum': np.where(valid, values, 0.0),
+                'square': np.where(valid, shifted * shifted, 0.0),
+                'min': np.where(valid, values, np.inf),
+                'max': np.where(valid, values, -np.inf),
+            }
+
+            days = dates // DAY_NS
+            levels = {}
+            for level in cls.LEVELS:
+                start, end = bucket_bounds(days, level)
+                # Rows are sorted by date, so each bucket is a run of rows
+                first = np.flatnonzero(np.diff(start, prepend=start[:1] - 1))
+                stats = np.empty((len(columns), len(cls.STATS), len(first)))
+                for s, name in enumerate(cls.STATS):
+                    reduce = {'min': np.minimum, 'max': np.maximum}.get(name, np.add)
+                    if len(first):
+                        stats[:, s] = reduce.reduceat(per_row[name], first, axis=1)
+                levels[level] = {'start': start[first], 'end': end[first], 'stats': stats}
+        return cls(columns, dates, values, shifts, levels)
+
+    # Queries
+
+    def cover(self, start_day: int, stop_day: int) -> List[Tuple[str, int, int]]:
+        """Splits the days [start_day, stop_day) into (level, first, last) bucket
+        ranges, coarsest first, and ('rows', i, j) row ranges at the edges"""
+        parts = []
+        self._cover(start_day, stop_day, 0, parts)
+        return parts
+
+    def _cover(self, a: int, b: int, depth: int, parts: list):
+        if a >= b:
+            return
+        if depth == len(self.LEVELS):
+            i, j = self.dates.searchsorted([a * DAY_NS, b * DAY_NS])
+            if j > i:
+                parts.append(('rows', int(i), int(j)))
+            return
+        level = self.levels[self.LEVELS[depth]]
+        # Buckets p..q-1 lie completely inside [a, b)
+        p = int(level['start'].searchsorted(a))
+        q = int(level['end'].searchsorted(b, side='right'))
+        if p >= q:
+            self._cover(a, b, depth + 1, parts)
+            return
+        parts.append((self.LEVELS[depth], p, q))
+        self._cover(a, int(level['start'][p]), depth + 1, parts)
+        self._cover(int(level['end'][q - 1]), b, depth + 1, parts)
+
+    def aggregate(self, start: DateLike, end: DateLike) -> Tuple[int, np.ndarray, int]:
+        """Returns (rows, [column][stat] aggregates, values touched) for an inclusive date range"""
+        start_day = int(pd.Timestamp(start).normalize().value // DAY_NS)
+        stop_day = int(pd.Timestamp(end).normalize().value // DAY_NS) + 1
+        first, last = self.dates.searchsorted([start_day * DAY_NS, stop_day * DAY_NS])
+        pieces = [self._row_stats(i, j) if level == 'rows' else self.levels[level]['stats'][:, :, i:j]
+                  for level, i, j in self.cover(start_day, stop_day)]
+        if not pieces:
+            return 0, self._row_stats(0, 0)[:, :, 0], 0
+        stats = np.concatenate(pieces, axis=2)
+        totals = np.concatenate([stats[:, :3].sum(axis=2),
+                                 stats[:, 3:4].min(axis=2),
+                                 stats[:, 4:5].max(axis=2)], axis=1)
+        touched = stats.shape[2]
+        Metrics.count('pyramid.values_touched', touched)
+        return int(last - first), totals, touched
+
+    def _row_stats(self, i: int, j: int) -> np.ndarray:
+        """Per-row [column][stat][row] aggregates of rows [i, j), or one empty bucket"""
+        values = np.asarray(self.values[:, i:j]) if j > i else np.full((len(self.columns), 1), np.nan)
+        valid = ~np.isnan(values)
+        shifted = values - self.shifts[:, None]
+        return np.stack([valid,
+                         np.where(valid, values, 0.0),
+                         np.where(valid, shifted * shifted, 0.0),
+                         np.where(valid, values, np.inf),
+                         np.where(valid, values, -np.inf)], axis=1)
+
+    def column_stats(self, totals: np.ndarray, column: str) -> Dict[str, float]:
+        """count/sum/mean/std/min/max of one column from aggregate()'s totals"""
+        k = self.columns.index(column)
+        count, total, square, minimum, maximum = totals[k]
+        shifted_sum = total - self.shifts[k] * count
+        mean = total / count if count else np.nan
+        std = np.nan
+        if count > 1:
+            std = float(np.sqrt(max((square - shifted_sum * shifted_sum / count) / (count - 1), 0.0)))
+        return {
+            'count': int(count),
+            'sum': float(total),
+            'mean': float(mean),
+            'std': std,
+            'min': float(minimum) if count else np.nan,
+            'max': float(maximum) if count else np.nan,
+        }
+
+    def query(self, start: DateLike, end: DateLike) -> Optional[Dict]:
+        """Returns the same statistics as AggregateIndex.query(), or None if no rows fall in the period"""
+        with Metrics.timer('pyramid.query'):
+            rows, totals, _ = self.aggregate(start, end)
+            if rows == 0:
+                return None
+            temp = self.column_stats(totals, 'TEMP')
+            precipitation = self.column_stats(totals, 'PRECIPITATION')
+            return {
+                'max_temp': temp['max'],
+                'min_temp': temp['min'],
+                'avg_temp': temp['mean'],
+                'total_precipitation': precipitation['sum'],
+                'std_temp': temp['std'],
+            }
+
+    # Persistence
+
+    def save(self, path: str, meta: Optional[Dict] = None):
+        """Writes the pyramid to directory ``path``; ``meta`` is stored alongside"""
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'dates.npy'), self.dates)
+        np.save(os.path.join(tmp_path, 'values.npy'), self.values)
+        for level, arrays in self.levels.items():
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f'{level}.{name}.npy'), array)
+        with open(os.path.join(tmp_path, self.META), 'w') as f:
+            json.dump({**(meta or {}), 'columns': self.columns, 'shifts': self.shifts.tolist(),
+                       'rows': len(self.dates)}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional["TemporalPyramid"], Dict]:
+        """Returns (pyramid, stored meta), or (None, {}) if ``path`` holds no readable pyramid"""
+        try:
+            with open(os.path.join(path, cls.META)) as f:
+                meta = json.load(f)
+            levels = {level: {name: np.load(os.path.join(path, f'{level}.{name}.npy'))
+                              for name in ('start', 'end', 'stats')}
+                      for level in cls.LEVELS}
+            dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+            values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+            return cls(meta['columns'], dates, values, np.array(meta['shifts']), levels), meta
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path):
+                logging.warning(f"Discarding unreadable pyramid {path}: {e}")
+            return None, {}
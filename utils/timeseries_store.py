@@ -0,0 +1,294 @@
+import json
+import os
+import shutil
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.knmi_dataset import DateLike
+
+
+class TimeSeriesStore:
+    """Persistent station-by-day archive of observations in memory-mapped arrays.
+
+    Each variable lives in its own file of float32 values laid out as
+    ``[day][station slot]``: day ``d`` of slot ``s`` is at a fixed offset,
+    so reading any station/date range is a strided view with no parsing.
+    Missing values are NaN. New days are appended to the end of the files,
+    so the archive grows without rewriting existing data. Days before the
+    origin move the origin back to January 1st of their year; that rewrites
+    the files once, with the new days put in front. The number of station
+    slots is fixed when the store is created. Values are returned
+    as float64 rounded to DECIMALS, the resolution of the sources, so the
+    float32 storage does not show up in results.
+
+    Stations are keyed by KNMI station number. Buienradar station ids are
+    the WMO numbers (06 + KNMI number, e.g. 6260 for De Bilt) and are
+    mapped onto the same keys by station_key().
+    """
+
+    DEFAULT_PATH = "data/store"
+    META = "meta.json"
+    DTYPE = np.float32
+    DECIMALS = 1
+    VARIABLES = ('TEMP', 'PRECIPITATION', 'AIRPRESSURE')
+
+    # Buienradar feed field -> store variable
+    FEED_FIELDS = {
+        'temperature': 'TEMP',
+        'rainFallLast24Hour': 'PRECIPITATION',
+        'airpressure': 'AIRPRESSURE',
+    }
+
+    def __init__(self, path: str = DEFAULT_PATH, station_capacity: int = 64,
+                 origin: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._maps: Dict[str, np.memmap] = {}
+        os.makedirs(self.path, exist_ok=True)
+
+        meta_path = os.path.join(self.path, self.META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {
+                'origin': origin,
+                'station_capacity': station_capacity,
+                'days': 0,
+                'variables': list(self.VARIABLES),
+                'stations': {},
+            }
+            self._save_meta()
+        # Without an explicit origin the store starts on January 1st of the
+        # first year written
+        self.origin = np.datetime64(self.meta['origin'], 'D') if self.meta['origin'] else None
+
+    @property
+    def days(self) -> int:
+        return self.meta['days']
+
+    @property
+    def capacity(self) -> int:
+        return self.meta['station_capacity']
+
+    @property
+    def stations(self) -> List[str]:
+        return list(self.meta['stations'])
+
+    @staticmethod
+    def station_key(station) -> str:
+        """Normalises a KNMI station number or Buienradar/WMO station id"""
+        key = str(station).strip()
+        if key.isdigit() and 6000 <= int(key) < 7000:
+            return str(int(key) - 6000)
+        return key
+
+    def slot(self, station, create: bool = False) -> Optional[int]:
+        """Returns the column slot of a station, allocating one if asked"""
+        key = self.station_key(station)
+        with self._lock:
+            slot = self.meta['stations'].get(key)
+            if slot is None and create:
+                slot = len(self.meta['stations'])
+                if slot >= self.capacity:
+                    raise ValueError(f"Store is full ({self.capacity} stations)")
+                self.meta['stations'][key] = slot
+                self._save_meta()
+            return slot
+
+    def day_offset(self, date: DateLike) -> int:
+        """Day number of a date relative to the store origin"""
+        if self.origin is None:
+            return 0
+        return int((np.datetime64(pd.Timestamp(date).date(), 'D') - self.origin).astype(np.int64))
+
+    def _day_offsets(self, dates: Iterable) -> np.ndarray:
+        days = pd.DatetimeIndex(dates).to_numpy().astype('datetime64[D]')
+        return (days - self.origin).astype(np.int64)
+
+    def write(self, station, dates: Iterable, values: Dict[str, Iterable]):
+        """Writes daily values for one station; grows the archive if needed.
+
+        NaN values are not written, so a missing reading never erases a
+        value already stored for that day.
+        """
+        dates = pd.DatetimeIndex(dates)
+        if not len(dates):
+            return
+        with self._lock:
+            first_year = np.datetime64(f"{dates.min().year:04d}-01-01", 'D')
+            if self.origin is None:
+                self.meta['origin'] = str(first_year)
+                self.origin = first_year
+                self._save_meta()
+            elif first_year < self.origin:
+                self._prepend_days(first_year)
+            offsets = self._day_offsets(dates)
+            slot = self.slot(station, create=True)
+            self._ensure_days(int(offsets.max()) + 1)
+            for variable, column in values.items():
+                column = np.asarray(column, dtype=self.DTYPE)
+                present = ~np.isnan(column)
+                array = self._map(variable)
+                array[offsets[present], slot] = column[present]
+
+    def read(self, station, start: DateLike, end: DateLike,
+             variables: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Returns DATE plus the requested variables for an inclusive date range"""
+        variables = list(variables) if variables is not None else self.meta['variables']
+        slot = self.slot(station)
+        first = max(self.day_offset(start), 0)
+        last = min(self.day_offset(end) + 1, self.days)
+        last = max(first, last)
+
+        origin = self.origin if self.origin is not None else np.datetime64(pd.Timestamp(start).date(), 'D')
+        if self.origin is None:
+            first = last = 0
+        dates = origin + np.arange(first, last)
+        frame = pd.DataFrame({'DATE': dates.astype('datetime64[ns]')})
+        for variable in variables:
+            if slot is None or first == last:
+                frame[variable] = np.full(last - first, np.nan)
+            else:
+                values = np.asarray(self._map(variable)[first:last, slot], dtype=np.float64)
+                frame[variable] = values.round(self.DECIMALS)
+        return frame
+
+    def ingest_frame(self, frame: pd.DataFrame, station=None) -> int:
+        """Stores a KNMIDataProcessor.read_knmi_file frame; returns rows written.
+
+        Frames with a STATION column are split per station, otherwise
+        ``station`` must be given. Sub-daily rows are averaged per day
+        (precipitation is summed); a day without readings stays missing.
+        """
+        if 'STATION' in frame.columns:
+            groups = frame.groupby('STATION', sort=False)
+        elif station is not None:
+            groups = [(station, frame)]
+        else:
+            raise ValueError("A station is required for frames without a STATION column")
+
+        written = 0
+        variables = [v for v in self.meta['variables'] if v in frame.columns]
+        for key, rows in groups:
+            daily = rows.assign(DATE=rows['DATE'].dt.floor('D'))
+            if daily['DATE'].duplicated().any():
+                grouped = daily.groupby('DATE')
+                daily = grouped[[v for v in variables if v != 'PRECIPITATION']].mean()
+                if 'PRECIPITATION' in variables:
+                    daily['PRECIPITATION'] = grouped['PRECIPITATION'].sum(min_count=1)
+                daily = daily.reset_index()
+            self.write(key, daily['DATE'], {v: daily[v].to_numpy() for v in variables})
+            written += len(daily)
+        self.flush()
+        return written
+
+    def ingest_snapshot(self, stations: Iterable) -> int:
+        """Stores one ``stationmeasurements`` snapshot; returns stations written.
+
+        Each reading lands on the day of its timestamp, so the last snapshot
+        of a day is what the archive keeps for that day.
+        """
+        written = 0
+        for station in stations:
+            station_id = station.get('stationid')
+            measured_at = getattr(station, 'measured_at', None)
+            if measured_at is None:
+                timestamp = station.get('timestamp')
+                if not timestamp:
+                    continue
+                try:
+                    measured_at = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+                except ValueError:
+                    continue
+            if station_id is None:
+                continue
+            day = measured_at.date()
+            values = {variable: [self._number(station.get(field))]
+                      for field, variable in self.FEED_FIELDS.items()}
+            self.write(station_id, [day], values)
+            written += 1
+        self.flush()
+        return written
+
+    def flush(self):
+        """Writes pending changes of the mapped files to disk"""
+        with self._lock:
+            for array in self._maps.values():
+                array.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._maps.clear()
+
+    @staticmethod
+    def _number(value) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def _file(self, variable: str) -> str:
+        return os.path.join(self.path, f"{variable}.f4")
+
+    def _map(self, variable: str) -> np.memmap:
+        array = self._maps.get(variable)
+        if array is None or array.shape[0] != self.days:
+            if self.days == 0:
+                raise ValueError("Store is empty")
+            array = np.memmap(self._file(variable), dtype=self.DTYPE, mode='r+',
+                              shape=(self.days, self.capacity))
+            self._maps[variable] = array
+        return array
+
+    def _ensure_days(self, days: int):
+        """Appends NaN-filled days to every variable file"""
+        if days <= self.days:
+            return
+        extra = np.full((days - self.days, self.capacity), np.nan, dtype=self.DTYPE)
+        for variable in self.meta['variables']:
+            old = self._maps.pop(variable, None)
+            if old is not None:
+                old.flush()
+                del old
+            with open(self._file(variable), 'ab') as f:
+                extra.tofile(f)
+        logging.debug(f"Time-series store grown from {self.days} to {days} days")
+        self.meta['days'] = days
+        self._save_meta()
+
+    def _prepend_days(self, origin: np.datetime64):
+        """Moves the origin back to ``origin``, putting NaN-filled days in front of every file"""
+        extra = int((self.origin - origin).astype(np.int64))
+        if self.days:
+            padding = np.full((extra, self.capacity), np.nan, dtype=self.DTYPE)
+            for variable in self.meta['variables']:
+                old = self._maps.pop(variable, None)
+                if old is not None:
+                    old.flush()
+                    del old
+                path = self._file(variable)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as out:
+                    padding.tofile(out)
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, out, 1 << 20)
+                os.replace(tmp_path, path)
+            self.meta['days'] += extra
+        logging.info(f"Time-series store origin moved from {self.origin} to {origin}")
+        self.meta['origin'] = str(origin)
+        self.origin = origin
+        self._save_meta()
+
+    def _save_meta(self):
+        meta_path = os.path.join(self.path, self.META)
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, meta_path)